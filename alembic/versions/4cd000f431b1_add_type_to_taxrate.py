@@ -22,12 +22,14 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     """Upgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column("tax_rates", sa.Column("type", sa.String(length=100), nullable=False))
+    with op.batch_alter_table("tax_rates") as batch_op:
+        batch_op.add_column(sa.Column("type", sa.String(length=100), nullable=False))
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_column("tax_rates", "type")
+    with op.batch_alter_table("tax_rates") as batch_op:
+        batch_op.drop_column("type")
     # ### end Alembic commands ###
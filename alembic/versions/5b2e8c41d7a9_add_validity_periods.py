@@ -0,0 +1,47 @@
+"""add validity periods to tax rates and exemptions
+
+Revision ID: 5b2e8c41d7a9
+Revises: aef4491a4587
+Create Date: 2026-10-18 11:02:14.381560
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2e8c41d7a9"
+down_revision: Union[str, None] = "aef4491a4587"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("tax_rates", "tax_exemptions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("valid_from", sa.Date(), nullable=True))
+            batch_op.add_column(sa.Column("valid_to", sa.Date(), nullable=True))
+            # Codes are unique per validity period instead of overall
+            batch_op.drop_index(batch_op.f(f"ix_{table}_code"))
+            batch_op.create_index(
+                batch_op.f(f"ix_{table}_code"), ["code"], unique=False
+            )
+            batch_op.create_unique_constraint(
+                batch_op.f(f"uq_{table}_code"), ["code", "valid_from"]
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if a code has more than one version
+    for table in ("tax_rates", "tax_exemptions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(batch_op.f(f"uq_{table}_code"), type_="unique")
+            batch_op.drop_index(batch_op.f(f"ix_{table}_code"))
+            batch_op.create_index(batch_op.f(f"ix_{table}_code"), ["code"], unique=True)
+            batch_op.drop_column("valid_to")
+            batch_op.drop_column("valid_from")
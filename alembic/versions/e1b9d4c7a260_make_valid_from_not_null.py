@@ -0,0 +1,48 @@
+"""make valid_from not null
+
+Revision ID: e1b9d4c7a260
+Revises: c4e7b2a9f513
+Create Date: 2026-10-18 16:48:30.772415
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1b9d4c7a260"
+down_revision: Union[str, None] = "c4e7b2a9f513"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Stored for an unset `valid_from`, see `src.core.models.mixins.EVER_SINCE`
+EVER_SINCE = "1000-01-01"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fails if a code has more than one version without `valid_from`, which
+    # the unique index didn't prevent while they were NULL
+    for table in ("tax_rates", "tax_exemptions"):
+        op.execute(
+            sa.text(
+                f"UPDATE {table} SET valid_from = :ever_since WHERE valid_from IS NULL"
+            ).bindparams(ever_since=EVER_SINCE)
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column("valid_from", existing_type=sa.Date(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("tax_rates", "tax_exemptions"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column("valid_from", existing_type=sa.Date(), nullable=True)
+        op.execute(
+            sa.text(
+                f"UPDATE {table} SET valid_from = NULL WHERE valid_from = :ever_since"
+            ).bindparams(ever_since=EVER_SINCE)
+        )
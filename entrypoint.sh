@@ -1,8 +1,9 @@
 #!/bin/sh
 set -e
 
-echo "Run alembic migrations..."
-poetry run alembic upgrade head
-
 echo "App start..."
-poetry run python main.py
\ No newline at end of file
+# main.py migrates the database first, see DB_MIGRATE_ON_START; a single
+# interpreter skips a second round of imports, and exec passes SIGTERM on to
+# uvicorn for a graceful shutdown
+export DB_MIGRATE_ON_START="${DB_MIGRATE_ON_START:-true}"
+exec python main.py
\ No newline at end of file
@@ -1,8 +1,12 @@
 import logging
 import uvicorn
 from src.app import app
+from src.core.config import settings
+from src.core.migrations import upgrade_schema
 
 logging.basicConfig(level=logging.INFO)
 
 if __name__ == "__main__":
+    if settings.db.migrate_on_start:
+        upgrade_schema()
     uvicorn.run(app=app, host="0.0.0.0", port=8000)
@@ -3,9 +3,13 @@ from fastapi import APIRouter
 from .salary.router import router as salary_router
 from .taxes.router import router as taxes_router
 from .exemptions.router import router as exemptions_router
+from .jobs.router import router as jobs_router
+from .internal.router import router as internal_router
 
 router = APIRouter(prefix="/v1")
 
 router.include_router(salary_router)
 router.include_router(taxes_router)
 router.include_router(exemptions_router)
+router.include_router(jobs_router)
+router.include_router(internal_router)
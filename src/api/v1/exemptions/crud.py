@@ -1,8 +1,31 @@
-from sqlalchemy import select
+from datetime import date
+from typing import Iterable, Sequence
+
+from sqlalchemy import Date, Select, bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.v1.exemptions.schemas import TaxExemptionCreate, TaxExemptionUpdate
+from src.core.config import settings
+from src.core.listing import keyset_query
+from src.core.models.mixins import PERIOD_FIELDS
 from src.core.models.tax_exemption import TaxExemption
+from src.core.tax_snapshot import tax_snapshot_cache
+from src.core.upsert import UpsertStatus, upsert_effective_dated
+
+# Lookups run on every request are built once; their compiled form is then
+# found in the engine's statement cache without rebuilding the construct
+_TAX_EXEMPTION_BY_ID = select(TaxExemption).where(
+    TaxExemption.id == bindparam("tax_exemption_id")
+)
+_TAX_EXEMPTION_BY_CODE = (
+    select(TaxExemption)
+    .where(
+        TaxExemption.code == bindparam("code"),
+        TaxExemption.in_force(bindparam("as_of", type_=Date)),
+    )
+    .order_by(TaxExemption.valid_from.desc())
+    .limit(1)
+)
 
 
 async def create_tax_exemption(
@@ -21,21 +44,32 @@ async def create_tax_exemption(
     db_tax_exemption = TaxExemption(**tax_exemption.model_dump())
     session.add(db_tax_exemption)
     await session.commit()
+    tax_snapshot_cache.invalidate()
     return db_tax_exemption
 
 
-async def get_tax_exemptions(session: AsyncSession) -> list[TaxExemption]:
+def get_tax_exemptions_query(
+    as_of: date | None = None,
+    fields: Iterable[str] | None = None,
+    after: int | None = None,
+    limit: int = settings.db.page_size,
+) -> Select:
     """
-    Get all tax exemptions.
+    Build the query of one page of tax exemptions, ordered by ID.
 
     Args:
-        session: Database session
+        as_of: Only get the tax exemptions in force on this day
+        fields: Names of the columns to select, all by default
+        after: ID of the last tax exemption of the previous page
+        limit: Maximum number of tax exemptions
 
     Returns:
-        list of tax exemptions
+        Query of the tax exemption rows
     """
-    result = await session.execute(select(TaxExemption))
-    return list(result.scalars().all())
+    query = keyset_query(TaxExemption, fields, after, limit)
+    if as_of is not None:
+        query = query.where(TaxExemption.in_force(as_of))
+    return query
 
 
 async def get_tax_exemption_by_id(
@@ -52,13 +86,13 @@ async def get_tax_exemption_by_id(
         Tax exemption if found, None otherwise
     """
     result = await session.execute(
-        select(TaxExemption).where(TaxExemption.id == tax_exemption_id)
+        _TAX_EXEMPTION_BY_ID, {"tax_exemption_id": tax_exemption_id}
     )
     return result.scalar_one_or_none()
 
 
 async def get_tax_exemption_by_code(
-    session: AsyncSession, code: str
+    session: AsyncSession, code: str, as_of: date | None = None
 ) -> TaxExemption | None:
     """
     Get a tax exemption by code.
@@ -66,16 +100,85 @@ async def get_tax_exemption_by_code(
     Args:
         session: Database session
         code: Tax exemption code
+        as_of: Day the tax exemption is in force, today by default
 
     Returns:
         Tax exemption if found, None otherwise
     """
     result = await session.execute(
-        select(TaxExemption).where(TaxExemption.code == code)
+        _TAX_EXEMPTION_BY_CODE, {"code": code, "as_of": as_of or date.today()}
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_overlapping_tax_exemption(
+    session: AsyncSession,
+    code: str,
+    valid_from: date | None,
+    valid_to: date | None,
+    exclude_id: int | None = None,
+) -> TaxExemption | None:
+    """
+    Get a tax exemption with the given code whose validity period overlaps the
+    given one.
+
+    Args:
+        session: Database session
+        code: Tax exemption code
+        valid_from: Start of the validity period
+        valid_to: End of the validity period
+        exclude_id: ID of a tax exemption to ignore
+
+    The rows of the code are locked until the transaction ends, so that
+    concurrent writes of the same code are checked one after the other.
+
+    Returns:
+        Overlapping tax exemption if any, None otherwise
+    """
+    await session.execute(
+        select(TaxExemption.id).where(TaxExemption.code == code).with_for_update()
     )
+    query = select(TaxExemption).where(
+        TaxExemption.code == code, TaxExemption.overlapping(valid_from, valid_to)
+    )
+    if exclude_id is not None:
+        query = query.where(TaxExemption.id != exclude_id)
+    result = await session.execute(query.limit(1))
     return result.scalar_one_or_none()
 
 
+async def upsert_tax_exemptions(
+    session: AsyncSession, tax_exemptions: Sequence[tuple[int, TaxExemptionCreate]]
+) -> tuple[dict[int, tuple[UpsertStatus, TaxExemption]], dict[int, str]]:
+    """
+    Create or update many tax exemptions in one transaction.
+
+    A tax exemption updates the one with the same code and `valid_from`, and is
+    created otherwise.
+
+    Args:
+        session: Database session
+        tax_exemptions: Tax exemption data by item index
+
+    Returns:
+        Status and tax exemption by index of the applied items, and errors by
+        index of the others
+    """
+    applied, errors = await upsert_effective_dated(
+        session,
+        TaxExemption,
+        [
+            (index, tax_exemption.model_dump())
+            for index, tax_exemption in tax_exemptions
+        ],
+        "Tax exemption",
+    )
+    await session.commit()
+    if applied:
+        tax_snapshot_cache.invalidate()
+    return applied, errors
+
+
 async def update_tax_exemption(
     session: AsyncSession,
     tax_exemption: TaxExemption,
@@ -92,10 +195,13 @@ async def update_tax_exemption(
     Returns:
         Updated tax exemption if found, None otherwise
     """
-    update_data = tax_exemption_update.model_dump(
-        exclude_unset=True,
-        exclude_none=True,
-    )
+    # An explicit null clears a bound of the validity period, and is ignored
+    # for the other fields, which are required
+    update_data = {
+        key: value
+        for key, value in tax_exemption_update.model_dump(exclude_unset=True).items()
+        if value is not None or key in PERIOD_FIELDS
+    }
 
     if not update_data:
         return tax_exemption
@@ -103,6 +209,7 @@ async def update_tax_exemption(
     for key, value in update_data.items():
         setattr(tax_exemption, key, value)
     await session.commit()
+    tax_snapshot_cache.invalidate()
     await session.refresh(tax_exemption)
 
     return tax_exemption
@@ -123,3 +230,4 @@ async def delete_tax_exemption(
     """
     await session.delete(tax_exemption)
     await session.commit()
+    tax_snapshot_cache.invalidate()
@@ -1,15 +1,16 @@
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.v1.exemptions import crud
-from src.core.database import DbSessionDep
+from src.core.database import DbReadSessionDep, DbSessionDep
 from src.core.models.tax_exemption import TaxExemption
 
 
-async def get_tax_exemption_by_id(
+async def _get_tax_exemption_by_id(
     tax_exemption_id: int,
-    session: DbSessionDep,
+    session: AsyncSession,
 ) -> TaxExemption:
     """
     Get a tax exemption by ID.
@@ -34,4 +35,19 @@ async def get_tax_exemption_by_id(
     return tax_exemption
 
 
+async def get_tax_exemption_by_id(
+    tax_exemption_id: int,
+    session: DbSessionDep,
+) -> TaxExemption:
+    return await _get_tax_exemption_by_id(tax_exemption_id, session)
+
+
+# Loaded from a read replica; only for routes that don't write
+async def read_tax_exemption_by_id(
+    tax_exemption_id: int,
+    session: DbReadSessionDep,
+) -> TaxExemption:
+    return await _get_tax_exemption_by_id(tax_exemption_id, session)
+
+
 TaxExemptionByIdDep = Annotated[TaxExemption, Depends(get_tax_exemption_by_id)]
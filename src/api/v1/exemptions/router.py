@@ -1,17 +1,54 @@
-from fastapi import APIRouter, HTTPException, status
+from datetime import date
+from operator import itemgetter
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.v1.exemptions import crud
-from src.api.v1.exemptions.dependencies import TaxExemptionByIdDep
+from src.api.v1.exemptions.dependencies import (
+    TaxExemptionByIdDep,
+    read_tax_exemption_by_id,
+)
 from src.api.v1.exemptions.schemas import (
     TaxExemptionCreate,
+    TaxExemptionBulkRequest,
+    TaxExemptionBulkResponse,
+    TaxExemptionField,
+    TaxExemptionListItem,
     TaxExemptionUpdate,
     TaxExemptionResponse,
 )
-from src.core.database import DbSessionDep
+from src.core.config import settings
+from src.core.database import DbReadSessionDep, DbSessionDep
+from src.core.http_cache import TaxExemptionsCacheDep
+from src.core.validation import validate_items
 
 router = APIRouter(prefix="/exemptions", tags=["exemptions"])
 
 
+async def _check_validity_period(
+    session: AsyncSession,
+    code: str,
+    valid_from: date | None,
+    valid_to: date | None,
+    tax_exemption_id: int | None = None,
+) -> None:
+    if valid_from is not None and valid_to is not None and valid_to < valid_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="valid_to must not be before valid_from",
+        )
+    overlapping_tax_exemption = await crud.get_overlapping_tax_exemption(
+        session, code, valid_from, valid_to, exclude_id=tax_exemption_id
+    )
+    if overlapping_tax_exemption:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tax exemption with code '{code}' already exists for an overlapping period",
+        )
+
+
 @router.post(
     "/", response_model=TaxExemptionResponse, status_code=status.HTTP_201_CREATED
 )
@@ -27,37 +64,92 @@ async def create_tax_exemption(
     - **annual_amount**: Annual exemption amount (required)
     - **monthly_amount**: Monthly exemption amount (required)
     - **description**: Optional description
+    - **valid_from**: First day the exemption is in force (optional, ever since if unset)
+    - **valid_to**: Last day the exemption is in force (optional, from then on if unset)
+
+    A code may have several exemptions as long as their validity periods don't
+    overlap.
 
     Returns the created tax exemption.
     """
-    # Check if tax exemption with the same code already exists
-    existing_tax_exemption = await crud.get_tax_exemption_by_code(
-        session, tax_exemption.code
+    await _check_validity_period(
+        session, tax_exemption.code, tax_exemption.valid_from, tax_exemption.valid_to
     )
-    if existing_tax_exemption:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Tax exemption with code '{tax_exemption.code}' already exists",
-        )
 
     return await crud.create_tax_exemption(session, tax_exemption)
 
 
-@router.get("/", response_model=list[TaxExemptionResponse])
-async def get_tax_exemptions(
+@router.post("/bulk", response_model=TaxExemptionBulkResponse)
+async def upsert_tax_exemptions(
+    bulk: TaxExemptionBulkRequest,
     session: DbSessionDep,
 ):
     """
-    Get all tax exemptions.
+    Create or update many tax exemptions at once.
+
+    - **items**: List of tax exemptions, each with the same fields as for
+      `POST /`
+
+    A tax exemption updates the one with the same **code** and **valid_from**,
+    and is created otherwise. All tax exemptions are written in one
+    transaction, and tax exemptions cached for calculations are reloaded once
+    afterwards.
 
-    Returns a list of tax exemptions.
+    Returns one result per item in input order, with its **status**
+    (`created` or `updated`); items that fail validation or overlap another
+    period of their code get an **error** instead and are not saved.
     """
-    return await crud.get_tax_exemptions(session)
+    indexes, tax_exemptions, errors = validate_items(bulk.items, TaxExemptionCreate)
+    applied, upsert_errors = await crud.upsert_tax_exemptions(
+        session, list(zip(indexes, tax_exemptions))
+    )
+    errors.update(upsert_errors)
+
+    results = [{"index": index, "error": error} for index, error in errors.items()]
+    results.extend(
+        {"index": index, "status": status, "result": tax_exemption}
+        for index, (status, tax_exemption) in applied.items()
+    )
+    results.sort(key=itemgetter("index"))
+    return {"results": results}
+
+
+@router.get("/", response_model=list[TaxExemptionListItem])
+async def get_tax_exemptions(
+    cache: TaxExemptionsCacheDep,
+    as_of: date | None = None,
+    fields: Annotated[list[TaxExemptionField] | None, Query()] = None,
+    after: int | None = None,
+    limit: Annotated[int, Query(ge=1, le=settings.db.page_max_size)] = (
+        settings.db.page_size
+    ),
+):
+    """
+    Get a page of tax exemptions, ordered by ID.
+
+    - **as_of**: Only get the tax exemptions in force on this day (optional)
+    - **fields**: Only get these fields, and always the **id** (optional,
+      repeatable, all fields by default)
+    - **after**: ID of the last tax exemption of the previous page (optional, from
+      the first tax exemption by default)
+    - **limit**: Maximum number of tax exemptions (optional)
+
+    Returns a list of tax exemptions. Fewer than **limit** tax exemptions means there
+    are no more; otherwise request the next page with **after** set to the
+    **id** of the last one.
+    """
+    if (response := cache.cached_response()) is not None:
+        return response
+    return cache.streaming_response(
+        crud.get_tax_exemptions_query(as_of, fields, after, limit)
+    )
 
 
 @router.get("/{tax_exemption_id}", response_model=TaxExemptionResponse)
 async def get_tax_exemption(
-    tax_exemption: TaxExemptionByIdDep,
+    cache: TaxExemptionsCacheDep,
+    session: DbReadSessionDep,
+    tax_exemption_id: int,
 ):
     """
     Get a tax exemption by ID.
@@ -66,29 +158,44 @@ async def get_tax_exemption(
 
     Returns the tax exemption if found.
     """
-    return tax_exemption
+    if (response := cache.cached_response()) is not None:
+        return response
+
+    async def read() -> TaxExemptionResponse:
+        tax_exemption = await read_tax_exemption_by_id(tax_exemption_id, session)
+        return TaxExemptionResponse.model_validate(tax_exemption)
+
+    return await cache.json_response(session, read)
 
 
 @router.get("/code/{code}", response_model=TaxExemptionResponse)
 async def get_tax_exemption_by_code(
+    cache: TaxExemptionsCacheDep,
     code: str,
-    session: DbSessionDep,
+    session: DbReadSessionDep,
+    as_of: date | None = None,
 ):
     """
     Get a tax exemption by code.
 
     - **code**: Tax exemption code (required)
+    - **as_of**: Day the tax exemption is in force (optional, today by default)
 
     Returns the tax exemption if found.
     """
-    tax_exemption = await crud.get_tax_exemption_by_code(session, code)
-    if not tax_exemption:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Tax exemption with code '{code}' not found",
-        )
+    if (response := cache.cached_response()) is not None:
+        return response
 
-    return tax_exemption
+    async def read() -> TaxExemptionResponse:
+        tax_exemption = await crud.get_tax_exemption_by_code(session, code, as_of)
+        if not tax_exemption:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Tax exemption with code '{code}' not found",
+            )
+        return TaxExemptionResponse.model_validate(tax_exemption)
+
+    return await cache.json_response(session, read)
 
 
 @router.put("/{tax_exemption_id}", response_model=TaxExemptionResponse)
@@ -106,9 +213,25 @@ async def update_tax_exemption(
     - **annual_amount**: New annual exemption amount (optional)
     - **monthly_amount**: New monthly exemption amount (optional)
     - **description**: New description (optional)
+    - **valid_from**: New first day the exemption is in force (optional, `null`
+      for ever since)
+    - **valid_to**: New last day the exemption is in force (optional, `null` for
+      from then on)
 
     Returns the updated tax exemption if found.
     """
+    await _check_validity_period(
+        session,
+        tax_exemption_update.code or tax_exemption.code,
+        # An explicit null clears a bound of the validity period
+        tax_exemption_update.valid_from
+        if "valid_from" in tax_exemption_update.model_fields_set
+        else tax_exemption.valid_from,
+        tax_exemption_update.valid_to
+        if "valid_to" in tax_exemption_update.model_fields_set
+        else tax_exemption.valid_to,
+        tax_exemption.id,
+    )
     updated_tax_exemption = await crud.update_tax_exemption(
         session, tax_exemption, tax_exemption_update
     )
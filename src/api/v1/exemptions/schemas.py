@@ -1,7 +1,12 @@
 from enum import StrEnum
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any
+
 from pydantic import BaseModel, Field, ConfigDict
 
+from src.core.config import settings
+from src.core.upsert import UpsertStatus
+
 
 class TaxExemptionType(StrEnum):
     personal = "personal"
@@ -18,6 +23,8 @@ class TaxExemptionCreate(BaseModel):
     annual_amount: float = Field(..., ge=0)
     monthly_amount: float = Field(..., ge=0)
     description: str | None = Field(None, max_length=255)
+    valid_from: date | None = None
+    valid_to: date | None = None
 
 
 class TaxExemptionUpdate(BaseModel):
@@ -26,6 +33,8 @@ class TaxExemptionUpdate(BaseModel):
     annual_amount: float | None = Field(None, ge=0)
     monthly_amount: float | None = Field(None, ge=0)
     description: str | None = Field(None, max_length=255)
+    valid_from: date | None = None
+    valid_to: date | None = None
 
 
 class TaxExemptionResponse(BaseModel):
@@ -37,5 +46,49 @@ class TaxExemptionResponse(BaseModel):
     annual_amount: float = Field(..., ge=0)
     monthly_amount: float = Field(..., ge=0)
     description: str | None = Field(None, max_length=255)
+    valid_from: date | None = None
+    valid_to: date | None = None
     created_at: datetime
     updated_at: datetime
+
+
+class TaxExemptionListItem(BaseModel):
+    # A tax exemption in a list, with only the fields selected with `fields`
+    id: int
+    name: str | None = None
+    code: str | None = None
+    annual_amount: float | None = None
+    monthly_amount: float | None = None
+    description: str | None = None
+    valid_from: date | None = None
+    valid_to: date | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+# Fields that can be selected in lists of tax exemptions
+TaxExemptionField = StrEnum(
+    "TaxExemptionField", [(name, name) for name in TaxExemptionResponse.model_fields]
+)
+
+
+class TaxExemptionBulkRequest(BaseModel):
+    # Items are validated one by one so that a single malformed row is
+    # reported in its own result instead of rejecting the whole batch.
+    items: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.db.bulk_max_items,
+        description="List of TaxExemptionCreate objects",
+    )
+
+
+class TaxExemptionBulkItemResult(BaseModel):
+    index: int
+    status: UpsertStatus | None = None
+    result: TaxExemptionResponse | None = None
+    error: str | None = None
+
+
+class TaxExemptionBulkResponse(BaseModel):
+    results: list[TaxExemptionBulkItemResult]
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Request, status
+
+from src.api.v1.internal.schemas import DbPoolStats, ProbeStatus
+from src.core.database import db
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/live", response_model=ProbeStatus)
+async def get_liveness():
+    """
+    Liveness probe: succeeds as long as the worker answers requests.
+    """
+    return {"status": "live"}
+
+
+@router.get("/ready", response_model=ProbeStatus)
+async def get_readiness(request: Request):
+    """
+    Readiness probe: succeeds once the worker has connected to the database and
+    loaded the tax rates and exemptions, and fails again once it shuts down.
+    """
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Not ready"
+        )
+    return {"status": "ready"}
+
+
+@router.get("/db-pool", response_model=DbPoolStats)
+async def get_db_pool_stats():
+    """
+    Get statistics of the database connection pool of this worker.
+
+    Returns the connections checked out, idle and in overflow right now, and
+    checkout, timeout and connection counters with histograms of checkout wait
+    times, checkout hold times and connection lifetimes since the worker
+    started.
+    """
+    return db.pool_monitor.stats()
+
+
+@router.get("/db-pool/replicas", response_model=list[DbPoolStats])
+async def get_db_replica_pool_stats():
+    """
+    Get statistics of the connection pools of the read replicas of this worker.
+
+    Returns the same statistics as `/db-pool` for each replica, in the order of
+    `DB_REPLICA_URLS`.
+    """
+    return [monitor.stats() for monitor in db.replica_pool_monitors]
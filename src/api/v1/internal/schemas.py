@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field
+
+
+class HistogramBucket(BaseModel):
+    le: float | None = Field(
+        ..., description="Upper bound in seconds, null for the overflow bucket"
+    )
+    count: int
+
+
+class Histogram(BaseModel):
+    count: int
+    sum: float
+    buckets: list[HistogramBucket]
+
+
+class DbPoolStats(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int = Field(..., description="Overflow connections in use")
+    max_checked_out: int = Field(
+        ..., description="Most connections checked out at once so far"
+    )
+    checkouts: int
+    checkout_timeouts: int
+    connections_opened: int
+    connections_closed: int
+    invalidations: int
+    checkout_wait: Histogram = Field(
+        ..., description="Seconds waited for a connection per checkout"
+    )
+    checkout_hold: Histogram = Field(
+        ..., description="Seconds a connection was checked out before its checkin"
+    )
+    connection_lifetime: Histogram = Field(
+        ..., description="Seconds a connection was open before it was closed"
+    )
+
+
+class ProbeStatus(BaseModel):
+    status: str
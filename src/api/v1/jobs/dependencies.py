@@ -0,0 +1,17 @@
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Path
+
+from src.api.v1.jobs.manager import job_manager
+from src.core.models import PayrollJob
+
+
+async def get_job_by_id(job_id: Annotated[str, Path]) -> PayrollJob:
+    job = await job_manager.get(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+JobByIdDep = Annotated[PayrollJob, Depends(get_job_by_id)]
@@ -0,0 +1,358 @@
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from typing import Any, AsyncIterator, Callable
+
+from pydantic_core import to_json
+from sqlalchemy import ColumnElement, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.jobs.schemas import JobState
+from src.api.v1.salary.calculator import calculate_batch
+from src.api.v1.salary.offload import calculation_pool
+from src.api.v1.salary.schemas import CalculationEngine
+from src.core.config import settings
+from src.core.database import db
+from src.core.models import PayrollJob, PayrollJobResult
+from src.core.tax_snapshot import tax_snapshot_cache
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATES = frozenset({JobState.succeeded, JobState.failed, JobState.cancelled})
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+def _now() -> datetime:
+    # Stored without time zone, as DATETIME columns are
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def job_status(job: PayrollJob) -> dict[str, Any]:
+    def utc(value: datetime | None) -> datetime | None:
+        return value.replace(tzinfo=UTC) if value is not None else None
+
+    return {
+        "id": job.id,
+        "state": job.state,
+        "total": job.total,
+        "processed": job.processed,
+        "created_at": utc(job.created_at),
+        "started_at": utc(job.started_at),
+        "finished_at": utc(job.finished_at),
+        "error": job.error,
+    }
+
+
+@dataclass(eq=False, slots=True)
+class _LocalJob:
+    """
+    What only the worker running a job has: its items and its task.
+    """
+
+    items: list[dict[str, Any]]
+    engine: CalculationEngine
+    task: asyncio.Task[None] | None = None
+    # Set and replaced on every change, see `JobManager.updated`
+    updated: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def notify(self) -> None:
+        self.updated.set()
+        self.updated = asyncio.Event()
+
+
+class JobManager:
+    """
+    Runs payroll jobs in the background of this process, and keeps their
+    state and results in the database, so that any worker can report on
+    them and serve their results.
+
+    At most `max_concurrent` jobs run at once and at most `max_queued` more
+    wait in submission order; their items stay in the memory of this process
+    until they finish. Jobs open a database session only to load the tax
+    policy and to save their progress after each chunk, so no connection is
+    held while they calculate. Finished jobs are kept for `retention` seconds
+    for their results to be downloaded. Expired jobs are hidden right away,
+    and deleted when the next job is submitted, so that reading jobs never
+    writes.
+
+    Jobs are read from the primary, not from replicas: their state and the
+    results it announces are written by whichever worker runs them, so a
+    replica may not have the results of a job it reports as finished.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_concurrent: int,
+        max_queued: int,
+        chunk_size: int,
+        retention: float,
+    ):
+        self.session_factory = session_factory
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.chunk_size = chunk_size
+        self.retention = retention
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Queued and running jobs of this process
+        self._local: dict[str, _LocalJob] = {}
+
+    async def submit(
+        self,
+        items: list[dict[str, Any]],
+        engine: CalculationEngine = CalculationEngine.float,
+    ) -> PayrollJob:
+        """
+        Queue a payroll job in this process.
+
+        Raises:
+            JobQueueFullError: If this process has as many jobs as it may run
+                and queue
+        """
+        if len(self._local) >= self.max_concurrent + self.max_queued:
+            raise JobQueueFullError("Too many payroll jobs are queued")
+
+        await self._prune()
+        job = PayrollJob(
+            id=uuid.uuid4().hex,
+            state=JobState.queued,
+            engine=engine,
+            total=len(items),
+            processed=0,
+            cancel_requested=False,
+            created_at=_now(),
+        )
+        async with self.session_factory() as session:
+            session.add(job)
+            await session.commit()
+
+        local = self._local[job.id] = _LocalJob(items=items, engine=engine)
+        local.task = asyncio.create_task(
+            self._run(job.id, local), name=f"payroll-job-{job.id}"
+        )
+        # Also reached by jobs cancelled before they started running
+        local.task.add_done_callback(lambda _: self._local.pop(job.id, None))
+        return job
+
+    async def get(self, job_id: str) -> PayrollJob | None:
+        async with self.session_factory() as session:
+            return await session.scalar(
+                select(PayrollJob).where(PayrollJob.id == job_id, self._unexpired())
+            )
+
+    async def list(self) -> list[PayrollJob]:
+        async with self.session_factory() as session:
+            jobs = await session.scalars(
+                select(PayrollJob)
+                .where(self._unexpired())
+                .order_by(PayrollJob.created_at)
+            )
+            return list(jobs)
+
+    def updated(self, job_id: str) -> asyncio.Event | None:
+        """
+        Event set on the next change of a job running in this process, None
+        for jobs of other processes, which have to be polled. Take it before
+        reading the job state, so that no change between reading and waiting
+        is missed.
+        """
+        local = self._local.get(job_id)
+        return local.updated if local is not None else None
+
+    async def results(self, job_id: str) -> AsyncIterator[bytes]:
+        """
+        Encode the results of a job as a `SalaryBatchResponse`, chunk by
+        chunk as they are read.
+        """
+        async with self.session_factory() as session:
+            chunks = await session.stream_scalars(
+                select(PayrollJobResult.data)
+                .where(PayrollJobResult.job_id == job_id)
+                .order_by(PayrollJobResult.chunk)
+                .execution_options(yield_per=1)
+            )
+            separator = b'{"results":['
+            async for data in chunks:
+                # Every chunk is a non-empty list
+                yield separator + data[1:-1]
+                separator = b","
+            yield b"]}" if separator == b"," else b'{"results":[]}'
+
+    async def cancel(self, job: PayrollJob) -> PayrollJob:
+        """
+        Cancel a queued job right away, and a running job, which may run in
+        another process, after its current chunk.
+
+        Returns:
+            The job as it is after the cancellation
+        """
+        async with self.session_factory() as session:
+            await session.execute(
+                update(PayrollJob)
+                .where(PayrollJob.id == job.id, PayrollJob.state == JobState.queued)
+                .values(self._finished_values(JobState.cancelled))
+            )
+            await session.execute(
+                update(PayrollJob)
+                .where(PayrollJob.id == job.id, PayrollJob.state == JobState.running)
+                .values(cancel_requested=True)
+            )
+            await session.commit()
+            cancelled = await session.get(PayrollJob, job.id, populate_existing=True)
+        local = self._local.get(job.id)
+        if local is not None:
+            local.notify()
+        return cancelled or job
+
+    async def discard(self, job: PayrollJob) -> None:
+        await self.cancel(job)
+        async with self.session_factory() as session:
+            await self._delete(session, PayrollJob.id == job.id)
+            await session.commit()
+
+    async def shutdown(self) -> None:
+        tasks = [local.task for local in self._local.values() if local.task is not None]
+        job_ids = list(self._local)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if not job_ids:
+            return
+        # Nothing else will run these jobs
+        async with self.session_factory() as session:
+            await session.execute(
+                update(PayrollJob)
+                .where(
+                    PayrollJob.id.in_(job_ids),
+                    PayrollJob.state.in_((JobState.queued, JobState.running)),
+                )
+                .values(
+                    self._finished_values(
+                        JobState.failed, "The worker running the job was stopped"
+                    )
+                )
+            )
+            await session.commit()
+
+    @staticmethod
+    def _unexpired() -> ColumnElement[bool]:
+        return or_(PayrollJob.expires_at.is_(None), PayrollJob.expires_at > _now())
+
+    def _finished_values(
+        self, state: JobState, error: str | None = None
+    ) -> dict[str, Any]:
+        now = _now()
+        return {
+            "state": state,
+            "error": error,
+            "finished_at": now,
+            "expires_at": now + timedelta(seconds=self.retention),
+        }
+
+    @staticmethod
+    async def _delete(session: AsyncSession, condition: ColumnElement[bool]) -> None:
+        # Results are deleted explicitly, since SQLite ignores the cascade
+        # unless foreign keys are enabled
+        job_ids = select(PayrollJob.id).where(condition).scalar_subquery()
+        await session.execute(
+            delete(PayrollJobResult).where(PayrollJobResult.job_id.in_(job_ids))
+        )
+        await session.execute(delete(PayrollJob).where(condition))
+
+    async def _prune(self) -> None:
+        async with self.session_factory() as session:
+            await self._delete(session, PayrollJob.expires_at <= _now())
+            await session.commit()
+
+    async def _finish(
+        self, job_id: str, state: JobState, error: str | None = None
+    ) -> None:
+        async with self.session_factory() as session:
+            if state != JobState.succeeded:
+                await session.execute(
+                    delete(PayrollJobResult).where(PayrollJobResult.job_id == job_id)
+                )
+            await session.execute(
+                update(PayrollJob)
+                .where(PayrollJob.id == job_id)
+                .values(self._finished_values(state, error))
+            )
+            await session.commit()
+
+    async def _run(self, job_id: str, local: _LocalJob) -> None:
+        try:
+            async with self._semaphore:
+                async with self.session_factory() as session:
+                    started = await session.execute(
+                        update(PayrollJob)
+                        .where(
+                            PayrollJob.id == job_id,
+                            PayrollJob.state == JobState.queued,
+                        )
+                        .values(state=JobState.running, started_at=_now())
+                    )
+                    await session.commit()
+                    # Cancelled or discarded while it was queued
+                    if started.rowcount == 0:
+                        return
+                    local.notify()
+
+                    policy = (await tax_snapshot_cache.get(session)).policy
+
+                total = len(local.items)
+                for chunk_index, start in enumerate(range(0, total, self.chunk_size)):
+                    chunk = await calculation_pool.run_batch(
+                        policy,
+                        partial(calculate_batch, engine=local.engine),
+                        local.items[start : start + self.chunk_size],
+                    )
+                    for result in chunk:
+                        result["index"] += start
+                        result.setdefault("result", None)
+                        result.setdefault("error", None)
+
+                    async with self.session_factory() as session:
+                        session.add(
+                            PayrollJobResult(
+                                job_id=job_id, chunk=chunk_index, data=to_json(chunk)
+                            )
+                        )
+                        progressed = await session.execute(
+                            update(PayrollJob)
+                            .where(
+                                PayrollJob.id == job_id,
+                                PayrollJob.state == JobState.running,
+                                PayrollJob.cancel_requested.is_(False),
+                            )
+                            .values(processed=start + len(chunk))
+                        )
+                        if progressed.rowcount == 0:
+                            await session.rollback()
+                            await self._finish(job_id, JobState.cancelled)
+                            return
+                        await session.commit()
+                    local.notify()
+                    # Let requests in between chunks calculated in-process
+                    await asyncio.sleep(0)
+
+                await self._finish(job_id, JobState.succeeded)
+        except Exception as e:
+            logger.exception("Payroll job %s failed.", job_id)
+            await self._finish(job_id, JobState.failed, str(e))
+        finally:
+            local.notify()
+
+
+job_manager = JobManager(
+    session_factory=db.session_factory,
+    max_concurrent=settings.jobs.max_concurrent,
+    max_queued=settings.jobs.max_queued,
+    chunk_size=settings.jobs.chunk_size,
+    retention=settings.jobs.retention,
+)
@@ -0,0 +1,165 @@
+import asyncio
+import time
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, status
+from starlette.responses import StreamingResponse
+
+from src.api.v1.jobs.dependencies import JobByIdDep
+from src.api.v1.jobs.manager import (
+    FINISHED_STATES,
+    JobQueueFullError,
+    job_manager,
+    job_status,
+)
+from src.api.v1.jobs.schemas import JobState, PayrollJobRequest, PayrollJobStatus
+from src.api.v1.salary.schemas import SalaryBatchResponse
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Seconds between repeated progress events while a job makes no progress
+EVENTS_KEEPALIVE = 15.0
+# Seconds between reads of the progress of a job running in another worker
+EVENTS_POLL_INTERVAL = 1.0
+
+
+@router.post(
+    "/payroll",
+    response_model=PayrollJobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_payroll_job(
+    job_request: PayrollJobRequest,
+):
+    """
+    Submit a payroll to be calculated in the background.
+
+    - **items**: List of employees, each with the same fields as the query
+      parameters of `/salary/calculate` (**gross_salary** is required)
+    - **engine**: Calculation engine, as for `/salary/calculate`
+
+    Returns the queued job; follow its progress at `/jobs/{job_id}` or
+    `/jobs/{job_id}/events` and download its results from `/jobs/{job_id}/results`,
+    through any worker. Answers `503 Service Unavailable` while this worker has
+    as many jobs queued as it may.
+    """
+    try:
+        job = await job_manager.submit(job_request.items, job_request.engine)
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "60"},
+        )
+    return job_status(job)
+
+
+@router.get("/", response_model=list[PayrollJobStatus])
+async def get_jobs():
+    """
+    Get all jobs that are running, queued or not yet expired, of all workers.
+
+    Returns a list of job statuses.
+    """
+    return [job_status(job) for job in await job_manager.list()]
+
+
+@router.get("/{job_id}", response_model=PayrollJobStatus)
+async def get_job(
+    job: JobByIdDep,
+):
+    """
+    Get the status of a job.
+
+    - **job_id**: Job ID (required)
+
+    Returns the job state and the number of processed items.
+    """
+    return job_status(job)
+
+
+async def _job_events(job_id: str) -> AsyncIterator[str]:
+    sent: str | None = None
+    sent_at = 0.0
+    while True:
+        updated = job_manager.updated(job_id)
+        job = await job_manager.get(job_id)
+        if job is None:
+            return
+        data = PayrollJobStatus.model_validate(job_status(job)).model_dump_json()
+        if data != sent or time.monotonic() - sent_at >= EVENTS_KEEPALIVE:
+            yield f"event: {job.state}\ndata: {data}\n\n"
+            sent, sent_at = data, time.monotonic()
+        if job.state in FINISHED_STATES:
+            return
+        if updated is None:
+            # Run by another worker
+            await asyncio.sleep(EVENTS_POLL_INTERVAL)
+            continue
+        try:
+            await asyncio.wait_for(updated.wait(), EVENTS_KEEPALIVE)
+        except TimeoutError:
+            pass
+
+
+@router.get(
+    "/{job_id}/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def get_job_events(
+    job: JobByIdDep,
+):
+    """
+    Follow the progress of a job as Server-Sent Events.
+
+    - **job_id**: Job ID (required)
+
+    Sends the job status, named after the job state, whenever it changes and
+    at least every 15 seconds, until the job is finished. Progress of a job
+    run by another worker is read every second.
+    """
+    return StreamingResponse(
+        _job_events(job.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{job_id}/results", response_model=SalaryBatchResponse)
+async def get_job_results(
+    job: JobByIdDep,
+):
+    """
+    Download the results of a succeeded job.
+
+    - **job_id**: Job ID (required)
+
+    Returns one result per item in input order; items that fail validation get
+    an **error** instead of a **result**.
+    """
+    if job.state != JobState.succeeded:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.state}",
+        )
+
+    return StreamingResponse(job_manager.results(job.id), media_type="application/json")
+
+
+@router.delete("/{job_id}", response_model=PayrollJobStatus)
+async def delete_job(
+    job: JobByIdDep,
+):
+    """
+    Cancel a queued or running job, or discard a finished job and its results.
+
+    - **job_id**: Job ID (required)
+
+    Returns the job status; a cancelled job is kept until it expires. A running
+    job stops after the chunk it is calculating.
+    """
+    if job.state in FINISHED_STATES:
+        await job_manager.discard(job)
+        return job_status(job)
+    return job_status(await job_manager.cancel(job))
@@ -0,0 +1,37 @@
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from src.api.v1.salary.schemas import DEFAULT_ENGINE, CalculationEngine
+from src.core.config import settings
+
+
+class JobState(StrEnum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class PayrollJobRequest(BaseModel):
+    items: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.jobs.max_items,
+        description="List of SalaryCalculationRequest objects",
+    )
+    engine: CalculationEngine = DEFAULT_ENGINE
+
+
+class PayrollJobStatus(BaseModel):
+    id: str
+    state: JobState
+    total: int
+    processed: int
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
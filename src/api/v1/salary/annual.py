@@ -0,0 +1,154 @@
+from datetime import date
+from operator import itemgetter
+from typing import Any, Sequence
+
+import numpy as np
+
+from src.api.v1.salary.calculator import (
+    build_columns,
+    exemption_amounts,
+)
+from src.api.v1.salary.kernel import (
+    RESULT_FIELDS,
+    SalaryColumns,
+    calculate_columns,
+    round_money,
+)
+from src.api.v1.salary.schemas import SalaryAnnualRequest
+from src.core.tax_policy import TaxPolicy
+from src.core.validation import validate_items
+
+MONTHS = 12
+
+
+def calculate_annual(
+    policy: TaxPolicy, rows: Sequence[SalaryAnnualRequest]
+) -> list[dict[str, Any]]:
+    """
+    Calculate a year of salaries per employee and reconcile the income tax.
+
+    All months of all employees are calculated at once as 12 x N matrices.
+    Each month is calculated like a single `/calculate`, with the exemptions
+    in force in that month, giving the income tax withheld. The income tax due
+    for the year is then calculated from the annual totals, with a twelfth of
+    the annual exemption amounts in force for every month with a salary.
+    Rates and exemptions are the ones in force on the employee's `as_of`.
+
+    Args:
+        policy: Tax policy
+        rows: Annual calculation parameters
+
+    Returns:
+        Monthly results and annual totals per employee
+    """
+    if not rows:
+        return []
+
+    count = len(rows)
+    gross_salary = np.array(
+        [row.monthly_gross_salary for row in rows], dtype=np.float64
+    ).T
+
+    # Number the exemption parameters in force from month 1 and from each change
+    # on; the segment of every later month is the last one started so far.
+    segments: list[Any] = []
+    segment_days: list[date | None] = []
+    segment_months: list[int] = []
+    segment_employees: list[int] = []
+    for employee, row in enumerate(rows):
+        for parameters in (row, *row.exemption_changes):
+            segment_months.append(getattr(parameters, "month", 1) - 1)
+            segment_employees.append(employee)
+            segment_days.append(row.as_of)
+            segments.append(parameters)
+    starts = np.full((MONTHS, count), -1)
+    starts[segment_months, segment_employees] = np.arange(len(segments))
+    segment = np.maximum.accumulate(starts, axis=0)
+
+    employed = gross_salary > 0
+    monthly_exemptions = np.where(
+        employed, exemption_amounts(policy, segments, segment_days)[segment], 0.0
+    )
+    annual_exemptions = np.where(
+        employed,
+        exemption_amounts(policy, segments, segment_days, annual=True)[segment],
+        0.0,
+    )
+
+    rates = build_columns(policy, rows, gross_salary=np.zeros(count))
+    months = calculate_columns(
+        SalaryColumns(
+            gross_salary=gross_salary,
+            social_fund_rate=rates.social_fund_rate,
+            medical_insurance_rate=rates.medical_insurance_rate,
+            income_tax_rate=rates.income_tax_rate,
+            tax_exemptions=monthly_exemptions,
+        )
+    )
+
+    annual_gross_salary = round_money(months["gross_salary"].sum(axis=0))
+    social_fund = round_money(months["social_fund"].sum(axis=0))
+    medical_insurance = round_money(months["medical_insurance"].sum(axis=0))
+    income_tax_withheld = round_money(months["income_tax"].sum(axis=0))
+    tax_exemptions = round_money(annual_exemptions.sum(axis=0) / MONTHS)
+
+    taxable_income = round_money(
+        np.maximum(0.0, annual_gross_salary - medical_insurance - tax_exemptions)
+    )
+    income_tax = round_money(taxable_income * rates.income_tax_rate)
+    totals = {
+        "gross_salary": annual_gross_salary,
+        "social_fund": social_fund,
+        "medical_insurance": medical_insurance,
+        "tax_exemptions": tax_exemptions,
+        "taxable_income": taxable_income,
+        "income_tax": income_tax,
+        "income_tax_withheld": income_tax_withheld,
+        "income_tax_difference": round_money(income_tax - income_tax_withheld),
+        "net_salary": round_money(annual_gross_salary - medical_insurance - income_tax),
+        "total_salary": round_money(annual_gross_salary + social_fund),
+    }
+
+    # Months of each employee in a row, with the month number in front
+    month_keys = ("month", *RESULT_FIELDS)
+    month_columns = [
+        list(range(1, MONTHS + 1)) * count,
+        *(months[field].T.ravel().tolist() for field in RESULT_FIELDS),
+    ]
+    month_records = [dict(zip(month_keys, values)) for values in zip(*month_columns)]
+    total_keys = tuple(totals)
+    total_records = zip(*(values.tolist() for values in totals.values()))
+    return [
+        {
+            "months": month_records[employee * MONTHS : (employee + 1) * MONTHS],
+            **dict(zip(total_keys, values)),
+        }
+        for employee, values in enumerate(total_records)
+    ]
+
+
+def calculate_annual_batch(
+    policy: TaxPolicy, items: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Calculate and reconcile a year of salaries for a list of employees.
+
+    Args:
+        policy: Tax policy
+        items: Raw annual calculation parameters, validated one by one
+
+    Returns:
+        Per-item results in input order, each holding either a result or an error
+    """
+    indexes, rows, errors = validate_items(items, SalaryAnnualRequest)
+
+    results: list[dict[str, Any]] = [
+        {"index": index, "error": error} for index, error in errors.items()
+    ]
+    results.extend(
+        {"index": index, "result": record}
+        for index, record in zip(indexes, calculate_annual(policy, rows))
+    )
+    if errors:
+        results.sort(key=itemgetter("index"))
+    return results
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from src.core.config import settings
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of calculation results.
+
+    Entries belong to the tax policy version they were calculated with; the
+    cache is emptied as soon as it sees another version, so results never
+    outlive a change of tax rates or exemptions.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._version: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _switch_version(self, version: int) -> None:
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, version: int, key: Hashable) -> Any | None:
+        self._switch_version(version)
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, version: int, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._switch_version(version)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int | None]:
+        return {
+            "version": self._version,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+result_cache = ResultCache(maxsize=settings.salary.result_cache_size)
@@ -0,0 +1,336 @@
+from datetime import date
+from operator import itemgetter
+from typing import Any, Callable, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from src.api.v1.salary.cache import result_cache
+from src.api.v1.salary.cents import (
+    OVERFLOW_MESSAGE,
+    calculate_columns_in_cents,
+    overflows_cents,
+)
+from src.api.v1.salary.kernel import (
+    FloatArray,
+    SalaryColumns,
+    calculate_columns,
+    to_records,
+)
+from src.api.v1.salary.schemas import (
+    CalculationEngine,
+    SalaryCalculationRequest,
+    SalaryParameters,
+)
+from src.core.responses import TrustedJSONResponse
+from src.core.tax_policy import TaxPolicy
+from src.core.validation import validate_items
+
+
+def calculate(policy: TaxPolicy, params: SalaryCalculationRequest) -> dict:
+    """
+    Calculate taxes and net salary for a single employee.
+
+    Args:
+        policy: Tax policy
+        params: Calculation parameters
+
+    Returns:
+        Calculated taxes and net salary
+    """
+    policy = policy.at(params.as_of)
+    gross_salary = params.gross_salary
+
+    social_fund = gross_salary * policy.social_fund_rate(params.social_rate_id)
+    medical_insurance = gross_salary * policy.medical_insurance(
+        params.custom_medical_insurance_rate
+    )
+    total_exemption_amount = policy.exemption_amount(params)
+
+    # Taxable income after deductions and exemptions
+    taxable_income = max(0.0, gross_salary - medical_insurance - total_exemption_amount)
+
+    # Calculate income tax
+    income_tax = taxable_income * policy.income_tax_rate
+
+    # Calculate net salary
+    net_salary = gross_salary - medical_insurance - income_tax
+
+    # Calculate total salary
+    total_salary = gross_salary + social_fund
+
+    return {
+        "gross_salary": round(gross_salary, 2),
+        "social_fund": round(social_fund, 2),
+        "medical_insurance": round(medical_insurance, 2),
+        "income_tax": round(income_tax, 2),
+        "tax_exemptions": round(total_exemption_amount, 2),
+        "net_salary": round(net_salary, 2),
+        "total_salary": round(total_salary, 2),
+    }
+
+
+def parameters_key(params: BaseModel) -> tuple:
+    """
+    Key identifying validated parameters, for caching and deduplication.
+
+    Validation already normalizes types and fills in defaults, so equal
+    parameters give equal keys.
+    """
+    return tuple(params.__dict__.values())
+
+
+def calculate_cached(
+    policy: TaxPolicy,
+    params: SalaryCalculationRequest,
+    engine: CalculationEngine = CalculationEngine.float,
+) -> dict:
+    """
+    Calculate taxes and net salary for a single employee, reusing earlier
+    results for the same parameters, engine and tax policy version.
+    """
+    key = (engine, *parameters_key(params))
+    result = result_cache.get(policy.version, key)
+    if result is None:
+        if engine == CalculationEngine.float:
+            result = calculate(policy, params)
+        else:
+            [result] = calculate_rows(policy, [params], engine)
+        result_cache.put(policy.version, key, result)
+    return result
+
+
+def engine_kernel(
+    engine: CalculationEngine,
+) -> Callable[[SalaryColumns], dict[str, FloatArray]]:
+    """
+    Get the vectorized kernel of a calculation engine.
+    """
+    if engine == CalculationEngine.cents:
+        return calculate_columns_in_cents
+    return calculate_columns
+
+
+def reject_uncalculable[RowT: SalaryCalculationRequest](
+    indexes: list[int],
+    rows: list[RowT],
+    errors: dict[int, str],
+    engine: CalculationEngine,
+) -> tuple[list[int], list[RowT]]:
+    """
+    Move the rows `engine` cannot calculate to the errors.
+
+    The cents engine calculates in int64 bani, which very large gross salaries
+    overflow; the float engine calculates every row.
+
+    Args:
+        indexes: Indexes of the valid rows
+        rows: Valid rows
+        errors: Errors by index, updated in place
+        engine: Calculation engine
+
+    Returns:
+        Indexes of the rows left to calculate, and these rows
+    """
+    if engine != CalculationEngine.cents or not rows:
+        return indexes, rows
+    overflow = overflows_cents(
+        np.fromiter((row.gross_salary for row in rows), np.float64, len(rows))
+    )
+    if not overflow.any():
+        return indexes, rows
+
+    kept_indexes: list[int] = []
+    kept_rows: list[RowT] = []
+    for index, row, rejected in zip(indexes, rows, overflow.tolist()):
+        if rejected:
+            errors[index] = OVERFLOW_MESSAGE
+        else:
+            kept_indexes.append(index)
+            kept_rows.append(row)
+    return kept_indexes, kept_rows
+
+
+def deduplicate[RowT: BaseModel](rows: Sequence[RowT]) -> tuple[list[RowT], list[int]]:
+    """
+    Drop repeated parameters.
+
+    Args:
+        rows: Parameters
+
+    Returns:
+        The distinct parameters, and for each row its position among them
+    """
+    positions: dict[tuple, int] = {}
+    unique: list[RowT] = []
+    mapping: list[int] = []
+    for row in rows:
+        key = parameters_key(row)
+        position = positions.get(key)
+        if position is None:
+            position = positions[key] = len(unique)
+            unique.append(row)
+        mapping.append(position)
+    return unique, mapping
+
+
+def calculate_rows(
+    policy: TaxPolicy,
+    rows: Sequence[SalaryCalculationRequest],
+    engine: CalculationEngine = CalculationEngine.float,
+) -> list[dict[str, float]]:
+    """
+    Calculate taxes and net salary for many employees with the vectorized
+    kernel of `engine`, calculating repeated parameters only once.
+    """
+    unique, mapping = deduplicate(rows)
+    kernel = engine_kernel(engine)
+    records = to_records(kernel(build_columns(policy, unique)))
+    return [records[position] for position in mapping]
+
+
+def exemption_amounts(
+    policy: TaxPolicy,
+    rows: Sequence[Any],
+    days: Sequence[date | None] | None = None,
+    annual: bool = False,
+) -> FloatArray:
+    """
+    Sum up the exemptions of many calculation parameters, each with the
+    exemptions in force on its day.
+
+    Args:
+        policy: Tax policy
+        rows: Calculation parameters
+        days: Day of each row, the `as_of` of the rows by default
+        annual: Sum up the annual amounts instead of the monthly ones
+
+    Returns:
+        Exemption amount per row
+    """
+    if days is None:
+        days = [row.as_of for row in rows]
+    groups: dict[date | None, list[int]] = {}
+    for position, day in enumerate(days):
+        groups.setdefault(day, []).append(position)
+    if len(groups) <= 1:
+        return policy.at(days[0] if days else None).exemption_amounts(rows, annual)
+
+    total = np.zeros(len(rows))
+    for day, positions in groups.items():
+        total[positions] = policy.at(day).exemption_amounts(
+            [rows[position] for position in positions], annual
+        )
+    return total
+
+
+def build_columns(
+    policy: TaxPolicy,
+    rows: Sequence[SalaryParameters],
+    gross_salary: FloatArray | None = None,
+) -> SalaryColumns:
+    """
+    Resolve rates and exemptions for many employees into calculation columns,
+    each with the rates and exemptions in force on its `as_of`.
+
+    Args:
+        policy: Tax policy
+        rows: Calculation parameters
+        gross_salary: Gross salaries to use instead of the ones in `rows`
+
+    Returns:
+        Columns for the calculation kernel
+    """
+    policies = {day: policy.at(day) for day in {row.as_of for row in rows}}
+    social_fund_rates = {
+        (day, social_rate_id): policies[day].social_fund_rate(social_rate_id)
+        for day, social_rate_id in {(row.as_of, row.social_rate_id) for row in rows}
+    }
+    medical_insurance_rates = {
+        (day, custom_rate): policies[day].medical_insurance(custom_rate)
+        for day, custom_rate in {
+            (row.as_of, row.custom_medical_insurance_rate) for row in rows
+        }
+    }
+    income_tax_rate: FloatArray | float
+    if len(policies) > 1:
+        income_tax_rate = np.fromiter(
+            (policies[row.as_of].income_tax_rate for row in rows),
+            np.float64,
+            len(rows),
+        )
+    else:
+        income_tax_rate = policy.at(rows[0].as_of if rows else None).income_tax_rate
+
+    if gross_salary is None:
+        gross_salary = np.fromiter(
+            (row.gross_salary for row in rows),  # type: ignore[attr-defined]
+            np.float64,
+            len(rows),
+        )
+
+    return SalaryColumns(
+        gross_salary=gross_salary,
+        social_fund_rate=np.fromiter(
+            (social_fund_rates[row.as_of, row.social_rate_id] for row in rows),
+            np.float64,
+            len(rows),
+        ),
+        medical_insurance_rate=np.fromiter(
+            (
+                medical_insurance_rates[row.as_of, row.custom_medical_insurance_rate]
+                for row in rows
+            ),
+            np.float64,
+            len(rows),
+        ),
+        income_tax_rate=income_tax_rate,
+        tax_exemptions=exemption_amounts(policy, rows),
+    )
+
+
+def calculate_batch(
+    policy: TaxPolicy,
+    items: list[dict[str, Any]],
+    engine: CalculationEngine = CalculationEngine.float,
+) -> list[dict[str, Any]]:
+    """
+    Calculate taxes and net salary for a list of employees.
+
+    Args:
+        policy: Tax policy
+        items: Raw calculation parameters, validated one by one
+        engine: Calculation engine
+
+    Returns:
+        Per-item results in input order, each holding either a result or an
+        error; items that fail validation or that `engine` cannot calculate get
+        an error
+    """
+    indexes, rows, errors = validate_items(items, SalaryCalculationRequest)
+    indexes, rows = reject_uncalculable(indexes, rows, errors, engine)
+
+    results: list[dict[str, Any]] = [
+        {"index": index, "error": error} for index, error in errors.items()
+    ]
+    if rows:
+        records = calculate_rows(policy, rows, engine)
+        results.extend(
+            {"index": index, "result": record}
+            for index, record in zip(indexes, records)
+        )
+    if errors:
+        results.sort(key=itemgetter("index"))
+    return results
+
+
+def batch_response(results: list[dict[str, Any]]) -> TrustedJSONResponse:
+    """
+    Encode batch results as a `SalaryBatchResponse`, without validating them.
+
+    Items get the field they lack set to None, as the response model would.
+    """
+    for item in results:
+        item.setdefault("result", None)
+        item.setdefault("error", None)
+    return TrustedJSONResponse({"results": results})
@@ -0,0 +1,110 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.api.v1.salary.kernel import FloatArray, SalaryColumns
+
+IntArray = NDArray[np.int64]
+
+# Rates are applied as integer parts per million
+RATE_SCALE = 1_000_000
+
+# Largest amount in bani whose product with a rate still fits into int64
+MAX_CENTS = np.iinfo(np.int64).max // RATE_SCALE
+
+OVERFLOW_MESSAGE = "Gross salary is too large for the cents engine"
+
+
+def to_cents(amounts: FloatArray | float) -> IntArray:
+    """
+    Convert money amounts to whole bani, rounding halves up.
+
+    Amounts are rounded as the decimal numbers they are written as, e.g.
+    `1.005` becomes 101 bani although the nearest float is slightly below
+    1.005; amounts close to half a ban are converted through `Decimal`.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    scaled = amounts * 100
+    cents = np.floor(scaled + 0.5)
+    distance_to_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+    near_tie = np.flatnonzero(distance_to_tie <= 1e-9 + np.abs(scaled) * 1e-15)
+    for index in near_tie:
+        amount = Decimal(repr(float(amounts.flat[index])))
+        cents.flat[index] = float(amount.scaleb(2).quantize(1, ROUND_HALF_UP))
+    return cents.astype(np.int64)
+
+
+def overflows_cents(gross_salary: FloatArray) -> NDArray[np.bool_]:
+    """
+    Find the gross salaries too large for int64 arithmetic in bani.
+    """
+    return ~(np.abs(gross_salary) * 100 <= MAX_CENTS)
+
+
+def to_ppm(rates: FloatArray | float) -> IntArray:
+    """
+    Convert rates to whole parts per million.
+    """
+    return np.rint(np.multiply(rates, RATE_SCALE)).astype(np.int64)
+
+
+def apply_rate(cents: IntArray, ppm: IntArray) -> IntArray:
+    """
+    Multiply amounts in bani by rates in parts per million, rounding each
+    result to a whole ban with halves rounded up.
+    """
+    return (cents * ppm + RATE_SCALE // 2) // RATE_SCALE
+
+
+def calculate_cents(columns: SalaryColumns) -> dict[str, IntArray]:
+    """
+    Calculate taxes and net salary for many employees in integer bani.
+
+    Every line item is rounded to a whole ban as soon as it is calculated, and
+    later items are calculated from the rounded ones: the taxable income is
+    the gross salary minus the rounded medical insurance and the exemptions.
+    Results are therefore exact and do not depend on floating point order.
+
+    Args:
+        columns: Resolved calculation inputs
+
+    Returns:
+        Result arrays in bani by field name
+
+    Raises:
+        OverflowError: If a gross salary is too large for int64 arithmetic
+    """
+    if np.any(overflows_cents(columns.gross_salary)):
+        raise OverflowError(OVERFLOW_MESSAGE)
+
+    gross_salary = to_cents(columns.gross_salary)
+
+    social_fund = apply_rate(gross_salary, to_ppm(columns.social_fund_rate))
+    medical_insurance = apply_rate(gross_salary, to_ppm(columns.medical_insurance_rate))
+    tax_exemptions = to_cents(columns.tax_exemptions)
+
+    taxable_income = np.maximum(0, gross_salary - medical_insurance - tax_exemptions)
+    income_tax = apply_rate(taxable_income, to_ppm(columns.income_tax_rate))
+    net_salary = gross_salary - medical_insurance - income_tax
+    total_salary = gross_salary + social_fund
+
+    return {
+        "gross_salary": gross_salary,
+        "social_fund": social_fund,
+        "medical_insurance": medical_insurance,
+        "income_tax": income_tax,
+        "tax_exemptions": tax_exemptions,
+        "net_salary": net_salary,
+        "total_salary": total_salary,
+    }
+
+
+def calculate_columns_in_cents(columns: SalaryColumns) -> dict[str, FloatArray]:
+    """
+    Calculate like `kernel.calculate_columns`, but with the integer engine.
+
+    Returns:
+        Result arrays as money amounts, each the float closest to its bani value
+    """
+    return {field: values / 100 for field, values in calculate_cents(columns).items()}
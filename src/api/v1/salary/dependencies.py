@@ -0,0 +1,24 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.core.database import DbReadSessionDep
+from src.core.tax_policy import TaxPolicy
+from src.core.tax_snapshot import tax_snapshot_cache
+
+
+async def get_tax_policy(session: DbReadSessionDep) -> TaxPolicy:
+    """
+    Get the current tax policy, loading it from the database if needed.
+
+    Args:
+        session: Database session
+
+    Returns:
+        Tax policy
+    """
+    snapshot = await tax_snapshot_cache.get(session)
+    return snapshot.policy
+
+
+TaxPolicyDep = Annotated[TaxPolicy, Depends(get_tax_policy)]
@@ -0,0 +1,151 @@
+from dataclasses import replace
+from operator import itemgetter
+from typing import Any, Sequence
+
+import numpy as np
+
+from src.api.v1.salary.calculator import build_columns, deduplicate
+from src.api.v1.salary.kernel import (
+    FloatArray,
+    SalaryColumns,
+    calculate_columns,
+    round_money,
+    to_records,
+)
+from src.api.v1.salary.schemas import InverseTarget, SalaryInverseRequest
+from src.core.tax_policy import TaxPolicy
+from src.core.validation import validate_items
+
+# Cent offsets tried around the rounded analytic solution, in order of preference
+_CENT_OFFSETS = (0.0, -0.01, 0.01)
+
+
+def solve_gross(
+    columns: SalaryColumns, target: InverseTarget, amount: FloatArray
+) -> FloatArray:
+    """
+    Solve the gross salary that yields `amount` as `target`, before rounding.
+
+    Net salary is piecewise linear in gross salary:
+
+        net = gross * (1 - m)                                 while gross * (1 - m) <= E
+        net = gross * (1 - m) * (1 - r) + r * E               otherwise
+
+    where m is the medical insurance rate, r the income tax rate and E the
+    total exemption amount, so the net salary at the clamp point is E. Total
+    salary is gross * (1 + s) for social fund rate s.
+
+    Args:
+        columns: Resolved calculation inputs; gross salaries are ignored
+        target: Which result `amount` refers to
+        amount: Target amounts
+
+    Returns:
+        Gross salaries, NaN where no positive gross salary yields the target
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if target == InverseTarget.total_salary:
+            gross = amount / (1 + columns.social_fund_rate)
+        else:
+            exemptions = columns.tax_exemptions
+            after_medical = 1 - np.broadcast_to(
+                columns.medical_insurance_rate, amount.shape
+            )
+            income_tax_rate = columns.income_tax_rate
+            gross = np.where(
+                amount <= exemptions,
+                amount / after_medical,
+                (amount - income_tax_rate * exemptions)
+                / (after_medical * (1 - income_tax_rate)),
+            )
+            gross = np.where(after_medical > 0, gross, np.nan)
+
+    return np.where(np.isfinite(gross) & (gross > 0), gross, np.nan)
+
+
+def calculate_inverse(
+    policy: TaxPolicy, rows: Sequence[SalaryInverseRequest]
+) -> list[dict[str, Any] | None]:
+    """
+    Find the gross salary for each target net salary or total salary.
+
+    The analytic solution is rounded to whole cents, and the neighbouring cents
+    are tried as well so that the rounded forward calculation reproduces the
+    rounded target whenever any gross salary does.
+
+    Args:
+        policy: Tax policy
+        rows: Inverse calculation parameters
+
+    Returns:
+        Forward calculation results with an `exact` flag per row, or None for
+        rows whose target cannot be reached
+    """
+    if not rows:
+        return []
+
+    rows, mapping = deduplicate(rows)
+    columns = build_columns(policy, rows, gross_salary=np.zeros(len(rows)))
+    targets = np.array([row.target for row in rows])
+    amounts = np.fromiter((row.amount for row in rows), np.float64, len(rows))
+    wanted = round_money(amounts)
+
+    is_total = targets == InverseTarget.total_salary
+    gross = np.where(
+        is_total,
+        solve_gross(columns, InverseTarget.total_salary, amounts),
+        solve_gross(columns, InverseTarget.net_salary, amounts),
+    )
+    solvable = ~np.isnan(gross)
+    base = round_money(np.where(solvable, gross, 0.0))
+
+    best: dict[str, FloatArray] | None = None
+    best_distance = np.full(len(rows), np.inf)
+    for offset in _CENT_OFFSETS:
+        candidate = round_money(base + offset)
+        results = calculate_columns(replace(columns, gross_salary=candidate))
+        achieved = np.where(is_total, results["total_salary"], results["net_salary"])
+        distance = np.where(candidate > 0, np.abs(achieved - wanted), np.inf)
+        better = distance < best_distance - 1e-9
+        if best is None:
+            best = results
+        else:
+            for field, values in results.items():
+                best[field] = np.where(better, values, best[field])
+        best_distance = np.where(better, distance, best_distance)
+
+    assert best is not None
+    exact = (best_distance < 0.005).tolist()
+    records = [
+        {**record, "exact": is_exact} if ok else None
+        for record, is_exact, ok in zip(to_records(best), exact, solvable.tolist())
+    ]
+    return [records[position] for position in mapping]
+
+
+def calculate_inverse_batch(
+    policy: TaxPolicy, items: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Find gross salaries for a list of target amounts.
+
+    Args:
+        policy: Tax policy
+        items: Raw inverse calculation parameters, validated one by one
+
+    Returns:
+        Per-item results in input order, each holding either a result or an error
+    """
+    indexes, rows, errors = validate_items(items, SalaryInverseRequest)
+
+    results: list[dict[str, Any]] = [
+        {"index": index, "error": error} for index, error in errors.items()
+    ]
+    for index, row, record in zip(indexes, rows, calculate_inverse(policy, rows)):
+        if record is None:
+            error = f"No gross salary yields {row.target} of {row.amount}"
+            results.append({"index": index, "error": error})
+        else:
+            results.append({"index": index, "result": record})
+    results.sort(key=itemgetter("index"))
+    return results
@@ -0,0 +1,105 @@
+from dataclasses import dataclass, fields
+
+import numpy as np
+from numpy.typing import NDArray
+
+FloatArray = NDArray[np.float64]
+
+RESULT_FIELDS = (
+    "gross_salary",
+    "social_fund",
+    "medical_insurance",
+    "income_tax",
+    "tax_exemptions",
+    "net_salary",
+    "total_salary",
+)
+
+
+@dataclass(slots=True)
+class SalaryColumns:
+    """
+    Resolved calculation inputs for many employees, one array element per employee.
+
+    Rates that are the same for every employee may be passed as plain floats.
+    """
+
+    gross_salary: FloatArray
+    social_fund_rate: FloatArray | float
+    medical_insurance_rate: FloatArray | float
+    income_tax_rate: FloatArray | float
+    tax_exemptions: FloatArray
+
+
+def repeat_columns(columns: SalaryColumns, repeats: int) -> SalaryColumns:
+    """
+    Repeat each employee of `columns` `repeats` times in a row.
+    """
+    values = {}
+    for field in fields(SalaryColumns):
+        value = getattr(columns, field.name)
+        values[field.name] = (
+            np.repeat(value, repeats) if isinstance(value, np.ndarray) else value
+        )
+    return SalaryColumns(**values)
+
+
+def round_money(values: FloatArray) -> FloatArray:
+    """
+    Round to 2 decimals with the same result as the builtin `round(value, 2)`.
+
+    `np.round` scales by 100 before rounding, which can land on the other side
+    of a half-cent tie than `round`, so values close to a tie are rounded with
+    the builtin instead.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    distance_to_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+    near_tie = np.flatnonzero(distance_to_tie <= 1e-9 + np.abs(scaled) * 1e-15)
+    for index in near_tie:
+        rounded.flat[index] = round(float(values.flat[index]), 2)
+    return rounded
+
+
+def calculate_columns(columns: SalaryColumns) -> dict[str, FloatArray]:
+    """
+    Calculate taxes and net salary for many employees at once.
+
+    Performs the same floating point operations in the same order as
+    `calculator.calculate`, so results are identical to the scalar path.
+
+    Args:
+        columns: Resolved calculation inputs
+
+    Returns:
+        Rounded result arrays by field name
+    """
+    gross_salary = columns.gross_salary
+
+    social_fund = gross_salary * columns.social_fund_rate
+    medical_insurance = gross_salary * columns.medical_insurance_rate
+
+    tax_exemptions = columns.tax_exemptions
+
+    taxable_income = np.maximum(0.0, gross_salary - medical_insurance - tax_exemptions)
+    income_tax = taxable_income * columns.income_tax_rate
+    net_salary = gross_salary - medical_insurance - income_tax
+    total_salary = gross_salary + social_fund
+
+    return {
+        "gross_salary": round_money(gross_salary),
+        "social_fund": round_money(social_fund),
+        "medical_insurance": round_money(medical_insurance),
+        "income_tax": round_money(income_tax),
+        "tax_exemptions": round_money(tax_exemptions),
+        "net_salary": round_money(net_salary),
+        "total_salary": round_money(total_salary),
+    }
+
+
+def to_records(results: dict[str, FloatArray]) -> list[dict[str, float]]:
+    """
+    Convert result arrays into one dict per employee.
+    """
+    columns = [results[field].tolist() for field in RESULT_FIELDS]
+    return [dict(zip(RESULT_FIELDS, values)) for values in zip(*columns)]
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from src.core.config import settings
+from src.core.tax_policy import TaxPolicy
+
+logger = logging.getLogger(__name__)
+
+BatchFunction = Callable[[TaxPolicy, list[dict[str, Any]]], list[dict[str, Any]]]
+
+# Policy of the worker process, replaced when a task brings a new version
+_worker_policy: TaxPolicy | None = None
+
+
+def _run_in_worker(
+    version: int, path: str, func: Callable[..., Any], *args: Any
+) -> Any:
+    global _worker_policy
+    if _worker_policy is None or _worker_policy.version != version:
+        with open(path, "rb") as file:
+            _worker_policy = pickle.load(file)
+    return func(_worker_policy, *args)
+
+
+class CalculationPool:
+    """
+    Process pool for CPU-heavy calculations, keeping them off the event loop.
+
+    The pool is started with the app and kept for its whole life. The tax
+    policy is pickled to a file once per policy version and every worker
+    loads it from there once per version, so tasks only carry the version
+    number and the path of the file. Files of older versions are removed once
+    no task needs them any more.
+    """
+
+    def __init__(self, workers: int, min_rows: int, min_chunk_rows: int):
+        self.workers = workers
+        self.min_rows = min_rows
+        self.min_chunk_rows = min_chunk_rows
+        self._executor: ProcessPoolExecutor | None = None
+        self._directory: str | None = None
+        # Policy file by version, the last one written being the current one
+        self._policy_files: dict[int, str] = {}
+        # Tasks in flight by policy version
+        self._tasks: Counter[int] = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("Started %d calculation workers.", self.workers)
+        return self._executor
+
+    def start(self) -> None:
+        """
+        Start the worker processes in the background, so that the first large
+        calculation doesn't wait for them.
+        """
+        if self.enabled:
+            executor = self._get_executor()
+            for _ in range(self.workers):
+                executor.submit(int)
+
+    def _get_policy_file(self, policy: TaxPolicy) -> str:
+        path = self._policy_files.get(policy.version)
+        if path is None:
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix="salary-policies-")
+            path = os.path.join(self._directory, f"policy-{policy.version}.pickle")
+            # Written under another name first, so workers never see half a file
+            with open(f"{path}.tmp", "wb") as file:
+                pickle.dump(policy, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{path}.tmp", path)
+            self._policy_files[policy.version] = path
+            self._remove_unused_policy_files()
+        return path
+
+    def _remove_unused_policy_files(self) -> None:
+        # All but the current version
+        for version in list(self._policy_files)[:-1]:
+            if not self._tasks[version]:
+                os.remove(self._policy_files.pop(version))
+                del self._tasks[version]
+
+    async def _submit(
+        self, policy: TaxPolicy, func: Callable[..., Any], *args: Any
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        path = self._get_policy_file(policy)
+        self._tasks[policy.version] += 1
+        try:
+            return await loop.run_in_executor(
+                self._get_executor(),
+                _run_in_worker,
+                policy.version,
+                path,
+                func,
+                *args,
+            )
+        finally:
+            self._tasks[policy.version] -= 1
+            self._remove_unused_policy_files()
+
+    def chunk_rows(self, rows: int) -> int:
+        """
+        Size chunks so that each worker gets a few of them, which evens out
+        the load without paying too much per-task overhead.
+        """
+        return max(self.min_chunk_rows, math.ceil(rows / (self.workers * 4)))
+
+    async def run(
+        self,
+        policy: TaxPolicy,
+        func: Callable[..., Any],
+        *args: Any,
+        rows: int | None = None,
+    ) -> Any:
+        """
+        Call `func(policy, *args)`, in a worker process if `rows` is large
+        enough, or whenever the pool has workers if `rows` is not given.
+        """
+        if not self.enabled or (rows is not None and rows < self.min_rows):
+            return func(policy, *args)
+
+        return await self._submit(policy, func, *args)
+
+    async def run_batch(
+        self, policy: TaxPolicy, func: BatchFunction, items: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Call a batch function over items, split into chunks calculated in worker
+        processes if there are enough items.
+
+        Args:
+            policy: Tax policy
+            func: Function returning one result per item, each with its `index`
+            items: Raw parameters
+
+        Returns:
+            Results of all chunks, with indexes relative to `items`
+        """
+        if not self.enabled or len(items) < self.min_rows:
+            return func(policy, items)
+
+        size = self.chunk_rows(len(items))
+        starts = range(0, len(items), size)
+        chunks = await asyncio.gather(
+            *(
+                self._submit(policy, func, items[start : start + size])
+                for start in starts
+            )
+        )
+
+        results: list[dict[str, Any]] = []
+        for start, chunk in zip(starts, chunks):
+            for result in chunk:
+                result["index"] += start
+            results.extend(chunk)
+        return results
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+            self._policy_files.clear()
+
+
+calculation_pool = CalculationPool(
+    workers=settings.salary.offload_workers,
+    min_rows=settings.salary.offload_min_rows,
+    min_chunk_rows=settings.salary.offload_min_chunk_rows,
+)
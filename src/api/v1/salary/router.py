@@ -1,18 +1,59 @@
+from datetime import date
+from functools import partial
 from typing import Annotated
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Request, status
 
-from src.api.v1.salary.schemas import SalaryCalculationResponse
-from src.api.v1.taxes.crud import get_tax_rate_by_code, get_tax_rate_by_id
-from src.api.v1.exemptions.crud import get_tax_exemption_by_code
-from src.api.v1.taxes.schemas import TaxRateType
-from src.core.database import DbSessionDep
+from src.api.v1.salary.annual import calculate_annual, calculate_annual_batch
+from src.api.v1.salary.cache import result_cache
+from src.api.v1.salary.calculator import (
+    batch_response,
+    calculate_batch,
+    calculate_cached,
+)
+from src.api.v1.salary.dependencies import TaxPolicyDep
+from src.api.v1.salary.inverse import calculate_inverse, calculate_inverse_batch
+from src.api.v1.salary.offload import calculation_pool
+from src.api.v1.salary.schemas import (
+    DEFAULT_ENGINE,
+    CalculationEngine,
+    ResultCacheStats,
+    SalaryAnnualBatchRequest,
+    SalaryAnnualBatchResponse,
+    SalaryAnnualRequest,
+    SalaryAnnualResponse,
+    SalaryBatchRequest,
+    SalaryBatchResponse,
+    SalaryCalculationRequest,
+    SalaryCalculationResponse,
+    SalaryInverseBatchRequest,
+    SalaryInverseBatchResponse,
+    SalaryInverseRequest,
+    SalaryInverseResponse,
+    SalarySweepRequest,
+    SalarySweepResponse,
+    SalaryWhatIfRequest,
+    SalaryWhatIfResponse,
+)
+from src.api.v1.salary.streaming import (
+    DuplexStreamingResponse,
+    PayrollFormat,
+    stream_payroll,
+)
+from src.api.v1.salary.sweep import calculate_sweep, sweep_cells
+from src.api.v1.salary.whatif import (
+    calculate_whatif_batch,
+    proposed_policy,
+    whatif_totals,
+)
+from src.core.config import settings
+from src.core.responses import TrustedJSONResponse
 
 router = APIRouter(prefix="/salary", tags=["salary"])
 
 
 @router.post("/calculate", response_model=SalaryCalculationResponse)
 async def calculate_salary(
-    session: DbSessionDep,
+    policy: TaxPolicyDep,
     gross_salary: Annotated[float, Query(gt=0)],
     social_rate_id: int | None = None,
     custom_medical_insurance_rate: int | None = Query(
@@ -31,6 +72,13 @@ async def calculate_salary(
     disabled_dependent_count: int = Query(
         0, ge=0, description="Number of dependents with disabilities"
     ),
+    as_of: date | None = Query(
+        None, description="Day whose tax rates and exemptions apply, today by default"
+    ),
+    engine: CalculationEngine = Query(
+        DEFAULT_ENGINE,
+        description="`cents` calculates in integer bani, rounding each amount",
+    ),
 ):
     """
     Calculate taxes and net salary based on gross salary.
@@ -43,108 +91,273 @@ async def calculate_salary(
     - **use_increased_spouse_exemption**: Whether to apply increased spouse exemption
     - **dependent_count**: Number of dependents without disabilities
     - **disabled_dependent_count**: Number of dependents with disabilities
+    - **as_of**: Day whose tax rates and exemptions apply (optional, today by default)
+    - **engine**: `float` or `cents` (integer bani, each amount rounded to the
+      ban with halves up, the taxable income using the rounded medical insurance)
 
     Returns calculated taxes and net salary.
     """
-    # Get medical insurance and income tax rates
-    income_tax_rate_obj = await get_tax_rate_by_code(session, TaxRateType.income_tax)
-
-    # Get social fund rate - either by ID if provided, or default
-    if social_rate_id is not None:
-        social_fund_rate_obj = await get_tax_rate_by_id(session, social_rate_id)
-        if (
-            social_fund_rate_obj is None
-            or social_fund_rate_obj.type != TaxRateType.social_fund
-        ):
-            # Fallback to default if specified ID is not found or not a social fund rate
-            social_fund_rate_obj = await get_tax_rate_by_code(
-                session, TaxRateType.social_fund
-            )
-    else:
-        social_fund_rate_obj = await get_tax_rate_by_code(
-            session, TaxRateType.social_fund
+    params = SalaryCalculationRequest.model_construct(
+        gross_salary=gross_salary,
+        social_rate_id=social_rate_id,
+        custom_medical_insurance_rate=custom_medical_insurance_rate,
+        use_personal_exemption=use_personal_exemption,
+        use_increased_personal_exemption=use_increased_personal_exemption,
+        use_increased_spouse_exemption=use_increased_spouse_exemption,
+        dependent_count=dependent_count,
+        disabled_dependent_count=disabled_dependent_count,
+        as_of=as_of,
+    )
+    try:
+        return TrustedJSONResponse(calculate_cached(policy, params, engine))
+    except OverflowError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
         )
 
-    # Extract rates from objects
-    social_fund_rate = (
-        social_fund_rate_obj.rate if social_fund_rate_obj is not None else 0
+
+@router.post("/calculate/batch", response_model=SalaryBatchResponse)
+async def calculate_salary_batch(
+    policy: TaxPolicyDep,
+    batch: SalaryBatchRequest,
+    engine: CalculationEngine = Query(
+        DEFAULT_ENGINE,
+        description="`cents` calculates in integer bani, rounding each amount",
+    ),
+):
+    """
+    Calculate taxes and net salary for many employees at once.
+
+    - **items**: List of employees, each with the same fields as the query
+      parameters of `/calculate` (**gross_salary** is required)
+    - **engine**: Calculation engine, as for `/calculate`
+
+    Rates and exemptions are loaded once for the whole batch, and large
+    batches are calculated in worker processes. Returns one result per item
+    in input order; items that fail validation, or whose gross salary is too
+    large for the `cents` engine, get an **error** instead of a **result**.
+    """
+    results = await calculation_pool.run_batch(
+        policy, partial(calculate_batch, engine=engine), batch.items
     )
+    return batch_response(results)
 
-    # Extract default rate
-    if custom_medical_insurance_rate is None:
-        medical_insurance_rate_obj = await get_tax_rate_by_code(
-            session, TaxRateType.medical_insurance
-        )
-        medical_insurance_rate = (
-            medical_insurance_rate_obj.rate
-            if medical_insurance_rate_obj is not None
-            else 0
+
+@router.post(
+    "/calculate/stream",
+    response_class=DuplexStreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                PayrollFormat.csv: {"schema": {"type": "string"}},
+                PayrollFormat.ndjson: {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def calculate_salary_stream(
+    request: Request,
+    policy: TaxPolicyDep,
+    engine: CalculationEngine = Query(
+        DEFAULT_ENGINE,
+        description="`cents` calculates in integer bani, rounding each amount",
+    ),
+):
+    """
+    Calculate a payroll file of any size while it is being uploaded.
+
+    - **Content-Type: text/csv**: Header row with the query parameters of
+      `/calculate` as column names, then one employee per record
+    - **Content-Type: application/x-ndjson**: One JSON object per line with the
+      same fields
+    - **engine**: Calculation engine, as for `/calculate`
+
+    Results are streamed back in the input format, in input order, each with
+    the row **index** and either the calculated values or an **error**.
+    """
+    payroll_format = PayrollFormat.from_content_type(
+        request.headers.get("content-type")
+    )
+    if payroll_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content type must be {PayrollFormat.csv} or {PayrollFormat.ndjson}",
         )
-    else:
-        medical_insurance_rate = custom_medical_insurance_rate / 100
-        print(medical_insurance_rate)
 
-    income_tax_rate = income_tax_rate_obj.rate if income_tax_rate_obj is not None else 0
+    return DuplexStreamingResponse(
+        stream_payroll(
+            policy,
+            request.stream(),
+            payroll_format,
+            chunk_size=settings.salary.stream_chunk_size,
+            engine=engine,
+        ),
+        media_type=payroll_format,
+    )
+
 
-    social_fund = gross_salary * social_fund_rate
-    medical_insurance = gross_salary * medical_insurance_rate
+@router.post("/inverse", response_model=SalaryInverseResponse)
+async def calculate_salary_inverse(
+    policy: TaxPolicyDep,
+    params: SalaryInverseRequest,
+):
+    """
+    Find the gross salary that yields a given net salary or total employer cost.
 
-    # Get tax exemptions
-    total_exemption_amount = 0.0
+    - **target**: `net_salary` (default) or `total_salary`
+    - **amount**: Target amount (required)
+    - Other fields are the same as the query parameters of `/calculate`
 
-    # Personal exemption (only one of personal or increased personal can be applied)
-    if use_increased_personal_exemption:
-        personal_exemption = await get_tax_exemption_by_code(
-            session, "personal_increased"
+    Returns the calculation for the gross salary found, with **exact** telling
+    whether it reproduces the target amount to the cent.
+    """
+    [result] = calculate_inverse(policy, [params])
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"No gross salary yields {params.target} of {params.amount}",
         )
-        if personal_exemption:
-            total_exemption_amount += personal_exemption.monthly_amount
-    elif use_personal_exemption:
-        personal_exemption = await get_tax_exemption_by_code(session, "personal")
-        if personal_exemption:
-            total_exemption_amount += personal_exemption.monthly_amount
-
-    # Spouse exemption
-    if use_increased_spouse_exemption:
-        spouse_exemption = await get_tax_exemption_by_code(session, "spouse_increased")
-        if spouse_exemption:
-            total_exemption_amount += spouse_exemption.monthly_amount
-
-    # Dependent exemptions
-    if dependent_count > 0:
-        dependent_exemption = await get_tax_exemption_by_code(session, "dependent")
-        if dependent_exemption:
-            total_exemption_amount += (
-                dependent_exemption.monthly_amount * dependent_count
-            )
-
-    if disabled_dependent_count > 0:
-        disabled_dependent_exemption = await get_tax_exemption_by_code(
-            session, "dependent_disabled"
+
+    return result
+
+
+@router.post("/inverse/batch", response_model=SalaryInverseBatchResponse)
+async def calculate_salary_inverse_batch(
+    policy: TaxPolicyDep,
+    batch: SalaryInverseBatchRequest,
+):
+    """
+    Find gross salaries for many target amounts at once.
+
+    - **items**: List of objects with the same fields as the body of `/inverse`
+
+    Returns one result per item in input order; items that fail validation or
+    whose target cannot be reached get an **error** instead of a **result**.
+    """
+    return {
+        "results": await calculation_pool.run_batch(
+            policy, calculate_inverse_batch, batch.items
         )
-        if disabled_dependent_exemption:
-            total_exemption_amount += (
-                disabled_dependent_exemption.monthly_amount * disabled_dependent_count
-            )
+    }
 
-    # Taxable income after deductions and exemptions
-    taxable_income = max(0.0, gross_salary - medical_insurance - total_exemption_amount)
 
-    # Calculate income tax
-    income_tax = taxable_income * income_tax_rate
+@router.post("/annual", response_model=SalaryAnnualResponse)
+async def calculate_salary_annual(
+    policy: TaxPolicyDep,
+    params: SalaryAnnualRequest,
+):
+    """
+    Calculate a year of salaries and reconcile the income tax against the
+    annual exemption amounts.
+
+    - **monthly_gross_salary**: Gross salary of each of the 12 months, `0` for
+      months without salary (required)
+    - **exemption_changes**: Exemption parameters in force from a given
+      **month** on, in increasing month order
+    - Other fields are the same as the query parameters of `/calculate`, the
+      exemption parameters being the ones in force from January
 
-    # Calculate net salary
-    net_salary = gross_salary - medical_insurance - income_tax
+    Returns the calculation of each month, with the income tax withheld, and the
+    annual totals with the income tax due for the year and the difference.
+    """
+    [result] = calculate_annual(policy, [params])
+    return result
 
-    # Calculate total salary
-    total_salary = gross_salary + social_fund
 
+@router.post("/annual/batch", response_model=SalaryAnnualBatchResponse)
+async def calculate_salary_annual_batch(
+    policy: TaxPolicyDep,
+    batch: SalaryAnnualBatchRequest,
+):
+    """
+    Calculate and reconcile a year of salaries for many employees at once.
+
+    - **items**: List of objects with the same fields as the body of `/annual`
+
+    Returns one result per item in input order; items that fail validation get
+    an **error** instead of a **result**.
+    """
     return {
-        "gross_salary": round(gross_salary, 2),
-        "social_fund": round(social_fund, 2),
-        "medical_insurance": round(medical_insurance, 2),
-        "income_tax": round(income_tax, 2),
-        "tax_exemptions": round(total_exemption_amount, 2),
-        "net_salary": round(net_salary, 2),
-        "total_salary": round(total_salary, 2),
+        "results": await calculation_pool.run_batch(
+            policy, calculate_annual_batch, batch.items
+        )
     }
+
+
+@router.post("/sweep", response_model=SalarySweepResponse)
+async def calculate_salary_sweep(
+    policy: TaxPolicyDep,
+    sweep: SalarySweepRequest,
+):
+    """
+    Calculate a grid of gross salaries times scenarios, e.g. for net-vs-gross charts.
+
+    - **gross_min**, **gross_max**, **gross_step**: Gross salary range (required)
+    - **social_rate_codes**: Social fund rate codes to compare (default: all)
+    - **custom_medical_insurance_rates**: Custom medical insurance rates, `null` for the default rate
+    - **personal_exemptions**: `none`, `personal` and/or `personal_increased`
+    - **use_increased_spouse_exemption**: Spouse exemption options
+    - **dependent_counts**: Numbers of dependents without disabilities
+    - **disabled_dependent_counts**: Numbers of dependents with disabilities
+
+    Returns the gross salary points and, for every combination of the scenario
+    values, one series per calculated amount.
+    """
+    try:
+        return await calculation_pool.run(
+            policy, calculate_sweep, sweep, rows=sweep_cells(policy, sweep)
+        )
+    except (ValueError, OverflowError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+
+
+@router.post("/whatif", response_model=SalaryWhatIfResponse)
+async def calculate_salary_whatif(
+    policy: TaxPolicyDep,
+    whatif: SalaryWhatIfRequest,
+    engine: CalculationEngine = Query(
+        DEFAULT_ENGINE,
+        description="`cents` calculates in integer bani, rounding each amount",
+    ),
+):
+    """
+    Compare a payroll under the current and under proposed tax rates and exemptions.
+
+    - **items**: List of employees, as for `/calculate/batch`
+    - **rate_overrides**: Proposed **rate** per tax rate **id**
+    - **exemption_overrides**: Proposed **annual_amount** and/or
+      **monthly_amount** per tax exemption **id**
+    - **engine**: Calculation engine, as for `/calculate`
+
+    Nothing is saved; the overrides only apply to this calculation. Returns the
+    current and proposed results and their difference per item, and their totals
+    over all calculated items; items that fail validation, or whose gross salary
+    is too large for the `cents` engine, get an **error** instead of a **result**.
+    """
+    try:
+        proposed = proposed_policy(policy, whatif)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+
+    results = await calculation_pool.run_batch(
+        policy,
+        partial(calculate_whatif_batch, proposed=proposed, engine=engine),
+        whatif.items,
+    )
+    return {"results": results, "totals": whatif_totals(results)}
+
+
+@router.get("/cache", response_model=ResultCacheStats)
+async def get_result_cache_stats():
+    """
+    Get statistics of the calculation result cache of this worker.
+
+    Returns the cache size and limit, hit, miss and eviction counters, and the
+    tax policy version of the cached results.
+    """
+    return result_cache.stats()
@@ -1,4 +1,35 @@
-from pydantic import BaseModel, ConfigDict
+from datetime import date
+from enum import StrEnum
+from typing import Annotated, Any
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from src.core.config import settings
+
+
+class CalculationEngine(StrEnum):
+    float = "float"
+    cents = "cents"
+
+
+DEFAULT_ENGINE = CalculationEngine(settings.salary.engine)
+
+
+class SalaryParameters(BaseModel):
+    social_rate_id: int | None = None
+    custom_medical_insurance_rate: int | None = None
+    use_personal_exemption: bool = False
+    use_increased_personal_exemption: bool = False
+    use_increased_spouse_exemption: bool = False
+    dependent_count: int = Field(0, ge=0)
+    disabled_dependent_count: int = Field(0, ge=0)
+    as_of: date | None = Field(
+        None, description="Day whose tax rates and exemptions apply, today by default"
+    )
+
+
+class SalaryCalculationRequest(SalaryParameters):
+    gross_salary: float = Field(..., gt=0)
 
 
 class SalaryCalculationResponse(BaseModel):
@@ -12,3 +43,235 @@ class SalaryCalculationResponse(BaseModel):
     gross_salary: float
     net_salary: float
     total_salary: float
+
+
+class SalaryBatchRequest(BaseModel):
+    # Items are validated one by one so that a single malformed row is
+    # reported in its own result instead of rejecting the whole batch.
+    items: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.salary.batch_max_items,
+        description="List of SalaryCalculationRequest objects",
+    )
+
+
+class SalaryBatchItemResult(BaseModel):
+    index: int
+    result: SalaryCalculationResponse | None = None
+    error: str | None = None
+
+
+class SalaryBatchResponse(BaseModel):
+    results: list[SalaryBatchItemResult]
+
+
+class InverseTarget(StrEnum):
+    net_salary = "net_salary"
+    total_salary = "total_salary"
+
+
+class SalaryInverseRequest(SalaryParameters):
+    target: InverseTarget = InverseTarget.net_salary
+    amount: float = Field(..., gt=0)
+
+
+class SalaryInverseResponse(SalaryCalculationResponse):
+    exact: bool = Field(
+        ..., description="Whether the result reproduces the target amount to the cent"
+    )
+
+
+class SalaryInverseBatchRequest(BaseModel):
+    items: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.salary.batch_max_items,
+        description="List of SalaryInverseRequest objects",
+    )
+
+
+class SalaryInverseBatchItemResult(BaseModel):
+    index: int
+    result: SalaryInverseResponse | None = None
+    error: str | None = None
+
+
+class SalaryInverseBatchResponse(BaseModel):
+    results: list[SalaryInverseBatchItemResult]
+
+
+class SalaryExemptionChange(BaseModel):
+    # Exemption parameters in force from `month` on, replacing the previous ones
+    month: int = Field(..., ge=2, le=12)
+    use_personal_exemption: bool = False
+    use_increased_personal_exemption: bool = False
+    use_increased_spouse_exemption: bool = False
+    dependent_count: int = Field(0, ge=0)
+    disabled_dependent_count: int = Field(0, ge=0)
+
+
+class SalaryAnnualRequest(SalaryParameters):
+    monthly_gross_salary: list[Annotated[float, Field(ge=0)]] = Field(
+        ...,
+        min_length=12,
+        max_length=12,
+        description="Gross salary of each month, 0 for months without salary",
+    )
+    exemption_changes: list[SalaryExemptionChange] = Field([], max_length=11)
+
+    @field_validator("exemption_changes")
+    @classmethod
+    def check_change_months(
+        cls, changes: list[SalaryExemptionChange]
+    ) -> list[SalaryExemptionChange]:
+        months = [change.month for change in changes]
+        if months != sorted(set(months)):
+            raise ValueError("Exemption changes must be in increasing month order")
+        return changes
+
+
+class SalaryAnnualMonth(SalaryCalculationResponse):
+    month: int
+
+
+class SalaryAnnualResponse(BaseModel):
+    months: list[SalaryAnnualMonth]
+
+    gross_salary: float
+    social_fund: float
+    medical_insurance: float
+    tax_exemptions: float
+    taxable_income: float
+    income_tax: float
+    income_tax_withheld: float
+    income_tax_difference: float = Field(
+        ..., description="Income tax still due, negative if too much was withheld"
+    )
+    net_salary: float
+    total_salary: float
+
+
+class SalaryAnnualBatchRequest(BaseModel):
+    items: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.salary.batch_max_items,
+        description="List of SalaryAnnualRequest objects",
+    )
+
+
+class SalaryAnnualBatchItemResult(BaseModel):
+    index: int
+    result: SalaryAnnualResponse | None = None
+    error: str | None = None
+
+
+class SalaryAnnualBatchResponse(BaseModel):
+    results: list[SalaryAnnualBatchItemResult]
+
+
+class TaxRateOverride(BaseModel):
+    id: int
+    rate: float = Field(..., gt=0, lt=1)
+
+
+class TaxExemptionOverride(BaseModel):
+    id: int
+    annual_amount: float | None = Field(None, ge=0)
+    monthly_amount: float | None = Field(None, ge=0)
+
+
+class SalaryWhatIfRequest(BaseModel):
+    items: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.salary.batch_max_items,
+        description="List of SalaryCalculationRequest objects",
+    )
+    rate_overrides: list[TaxRateOverride] = Field(
+        [], description="Proposed tax rates, as for `PUT /taxes/{id}`"
+    )
+    exemption_overrides: list[TaxExemptionOverride] = Field(
+        [], description="Proposed tax exemption amounts, as for `PUT /exemptions/{id}`"
+    )
+
+
+class SalaryWhatIfResult(BaseModel):
+    current: SalaryCalculationResponse
+    proposed: SalaryCalculationResponse
+    delta: SalaryCalculationResponse = Field(
+        ..., description="Proposed minus current amounts"
+    )
+
+
+class SalaryWhatIfItemResult(BaseModel):
+    index: int
+    result: SalaryWhatIfResult | None = None
+    error: str | None = None
+
+
+class SalaryWhatIfTotals(SalaryWhatIfResult):
+    count: int = Field(..., description="Number of items calculated")
+
+
+class SalaryWhatIfResponse(BaseModel):
+    results: list[SalaryWhatIfItemResult]
+    totals: SalaryWhatIfTotals
+
+
+class PersonalExemption(StrEnum):
+    none = "none"
+    personal = "personal"
+    personal_increased = "personal_increased"
+
+
+class SalarySweepRequest(BaseModel):
+    gross_min: float = Field(..., gt=0)
+    gross_max: float = Field(..., gt=0)
+    gross_step: float = Field(..., gt=0)
+    social_rate_codes: list[str] | None = Field(
+        None, min_length=1, description="Defaults to all social fund rates"
+    )
+    custom_medical_insurance_rates: list[int | None] = Field([None], min_length=1)
+    personal_exemptions: list[PersonalExemption] = Field(
+        [PersonalExemption.none], min_length=1
+    )
+    use_increased_spouse_exemption: list[bool] = Field([False], min_length=1)
+    dependent_counts: list[Annotated[int, Field(ge=0)]] = Field([0], min_length=1)
+    disabled_dependent_counts: list[Annotated[int, Field(ge=0)]] = Field(
+        [0], min_length=1
+    )
+    as_of: date | None = Field(
+        None, description="Day whose tax rates and exemptions apply, today by default"
+    )
+
+
+class SalarySweepScenario(BaseModel):
+    social_rate_code: str
+    custom_medical_insurance_rate: int | None
+    personal_exemption: PersonalExemption
+    use_increased_spouse_exemption: bool
+    dependent_count: int
+    disabled_dependent_count: int
+
+    social_fund: list[float]
+    medical_insurance: list[float]
+    income_tax: list[float]
+    tax_exemptions: list[float]
+    net_salary: list[float]
+    total_salary: list[float]
+
+
+class SalarySweepResponse(BaseModel):
+    gross_salary: list[float]
+    scenarios: list[SalarySweepScenario]
+
+
+class ResultCacheStats(BaseModel):
+    version: int | None
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
@@ -0,0 +1,230 @@
+import codecs
+import csv
+import io
+import json
+from enum import StrEnum
+from typing import Any, AsyncIterator
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.api.v1.salary.calculator import calculate_batch
+from src.api.v1.salary.kernel import RESULT_FIELDS
+from src.api.v1.salary.offload import calculation_pool
+from src.api.v1.salary.schemas import CalculationEngine
+from src.core.tax_policy import TaxPolicy
+
+
+class PayrollFormat(StrEnum):
+    csv = "text/csv"
+    ndjson = "application/x-ndjson"
+
+    @classmethod
+    def from_content_type(cls, content_type: str | None) -> "PayrollFormat | None":
+        media_type = (content_type or "").split(";", 1)[0].strip().lower()
+        if media_type == "application/jsonl":
+            return cls.ndjson
+        try:
+            return cls(media_type)
+        except ValueError:
+            return None
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response that may be sent while the request body is still being read.
+
+    `StreamingResponse` listens for client disconnects by consuming `receive`,
+    which would swallow request body chunks that the body iterator has not
+    read yet. Disconnects are still noticed here through the request stream.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_line_batches(
+    chunks: AsyncIterator[bytes], quoting: bool = False
+) -> AsyncIterator[list[str]]:
+    """
+    Split a stream of bytes into lines, yielding the complete lines of each chunk.
+
+    Args:
+        chunks: Byte chunks of UTF-8 text
+        quoting: Keep newlines inside double-quoted CSV fields in their line,
+            so that every line is a whole CSV record
+
+    Yields:
+        Lines without their newline
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    # Lines of a CSV record with a quoted field still open, and their quotes
+    record: list[str] = []
+    quotes = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        if quoting:
+            records: list[str] = []
+            for line in lines:
+                record.append(line)
+                # An escaped quote is doubled, so an odd count opens or closes a field
+                quotes += line.count('"')
+                if quotes % 2 == 0:
+                    records.append("\n".join(record))
+                    record.clear()
+                    quotes = 0
+            lines = records
+        if lines:
+            yield lines
+    pending += decoder.decode(b"", final=True)
+    if record or pending:
+        yield ["\n".join([*record, pending])]
+
+
+def _parse_ndjson(lines: list[str]) -> list[dict[str, Any] | str]:
+    items: list[dict[str, Any] | str] = []
+    for line in lines:
+        try:
+            item = json.loads(line)
+        except ValueError as exc:
+            items.append(f"Invalid JSON: {exc}")
+            continue
+        items.append(item if isinstance(item, dict) else "Expected a JSON object")
+    return items
+
+
+def _parse_csv(records: list[str], header: list[str]) -> list[dict[str, Any] | str]:
+    items: list[dict[str, Any] | str] = []
+    for record in records:
+        try:
+            values = next(csv.reader([record]))
+        except csv.Error as exc:
+            items.append(f"Invalid CSV: {exc}")
+            continue
+        # Empty cells are treated as missing values so that defaults apply
+        items.append({key: value for key, value in zip(header, values) if value})
+    return items
+
+
+def _calculate_chunk(
+    policy: TaxPolicy,
+    start: int,
+    items: list[dict[str, Any] | str],
+    engine: CalculationEngine,
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = [
+        {"index": start + index, "result": None, "error": item}
+        for index, item in enumerate(items)
+    ]
+    positions = [index for index, item in enumerate(items) if isinstance(item, dict)]
+    valid_items = [items[index] for index in positions]
+    for result in calculate_batch(policy, valid_items, engine):
+        position = positions[result["index"]]
+        results[position] = {
+            "index": start + position,
+            "result": result.get("result"),
+            "error": result.get("error"),
+        }
+    return results
+
+
+def _format_ndjson(results: list[dict[str, Any]]) -> str:
+    return "".join(json.dumps(result) + "\n" for result in results)
+
+
+def _format_csv(results: list[dict[str, Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for result in results:
+        values = result["result"] or {}
+        writer.writerow(
+            [result["index"], *(values.get(field, "") for field in RESULT_FIELDS)]
+            + [result["error"] or ""]
+        )
+    return buffer.getvalue()
+
+
+def _calculate_lines(
+    policy: TaxPolicy,
+    payroll_format: PayrollFormat,
+    header: list[str] | None,
+    start: int,
+    lines: list[str],
+    engine: CalculationEngine,
+) -> str:
+    if payroll_format == PayrollFormat.csv:
+        assert header is not None
+        items = _parse_csv(lines, header)
+        return _format_csv(_calculate_chunk(policy, start, items, engine))
+    items = _parse_ndjson(lines)
+    return _format_ndjson(_calculate_chunk(policy, start, items, engine))
+
+
+async def stream_payroll(
+    policy: TaxPolicy,
+    chunks: AsyncIterator[bytes],
+    payroll_format: PayrollFormat,
+    chunk_size: int,
+    engine: CalculationEngine = CalculationEngine.float,
+) -> AsyncIterator[str]:
+    """
+    Calculate a payroll file while it is being uploaded.
+
+    CSV input must have a header row with the fields of `SalaryCalculationRequest`
+    and one record per employee; quoted fields may span lines. NDJSON input must
+    have one JSON object per line. Rows are calculated `chunk_size` at a time,
+    in a worker process when the calculation pool has workers, and results are
+    written in the same format as the input, in input order.
+
+    Args:
+        policy: Tax policy
+        chunks: Request body chunks
+        payroll_format: Input and output format
+        chunk_size: Number of rows calculated at once
+        engine: Calculation engine
+
+    Yields:
+        Output chunks
+    """
+    if payroll_format == PayrollFormat.csv:
+        yield ",".join(["index", *RESULT_FIELDS, "error"]) + "\n"
+
+    header: list[str] | None = None
+    pending: list[str] = []
+    start = 0
+
+    async def flush() -> str:
+        nonlocal start
+        output = await calculation_pool.run(
+            policy,
+            _calculate_lines,
+            payroll_format,
+            header,
+            start,
+            list(pending),
+            engine,
+        )
+        start += len(pending)
+        pending.clear()
+        return output
+
+    quoting = payroll_format == PayrollFormat.csv
+    async for lines in iter_line_batches(chunks, quoting):
+        for line in lines:
+            line = line.rstrip("\r")
+            if not line.strip():
+                continue
+            if payroll_format == PayrollFormat.csv and header is None:
+                header = next(csv.reader([line]))
+                continue
+            pending.append(line)
+            if len(pending) >= chunk_size:
+                yield await flush()
+
+    if pending:
+        yield await flush()
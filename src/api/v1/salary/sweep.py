@@ -0,0 +1,169 @@
+import itertools
+import math
+from typing import Any
+
+import numpy as np
+
+from src.api.v1.salary.calculator import build_columns
+from src.api.v1.salary.kernel import calculate_columns, repeat_columns, round_money
+from src.api.v1.salary.schemas import (
+    PersonalExemption,
+    SalaryParameters,
+    SalarySweepRequest,
+)
+from src.core.config import settings
+from src.core.tax_policy import TaxPolicy
+
+
+def sweep_gross_points(gross_min: float, gross_max: float, gross_step: float) -> int:
+    """
+    Count gross salary points from `gross_min` to `gross_max` inclusive.
+
+    Raises:
+        ValueError: If the range holds too many steps to count
+    """
+    steps = (gross_max - gross_min) / gross_step
+    if not math.isfinite(steps):
+        raise ValueError("gross_step is too small for the range of gross salaries")
+    return math.floor(steps + 1e-9) + 1
+
+
+def sweep_cells(policy: TaxPolicy, request: SalarySweepRequest) -> int:
+    """
+    Count gross salaries times scenarios of a sweep.
+
+    Raises:
+        ValueError: If the range holds too many steps to count
+    """
+    policy = policy.at(request.as_of)
+    social_rate_codes = request.social_rate_codes or policy.social_fund_ids
+    scenario_count = len(social_rate_codes) * math.prod(
+        len(axis)
+        for axis in (
+            request.custom_medical_insurance_rates,
+            request.personal_exemptions,
+            request.use_increased_spouse_exemption,
+            request.dependent_counts,
+            request.disabled_dependent_counts,
+        )
+    )
+    points = sweep_gross_points(
+        request.gross_min, request.gross_max, request.gross_step
+    )
+    return scenario_count * points
+
+
+def calculate_sweep(policy: TaxPolicy, request: SalarySweepRequest) -> dict[str, Any]:
+    """
+    Calculate a grid of gross salaries times scenarios in a single kernel pass.
+
+    Scenarios are all combinations of the scenario axes in `request`.
+
+    Args:
+        policy: Tax policy
+        request: Gross salary range and scenario axes
+
+    Returns:
+        Gross salary points and per-scenario result series
+
+    Raises:
+        ValueError: If the request is inconsistent or the grid is too large
+    """
+    if request.gross_max < request.gross_min:
+        raise ValueError("gross_max must not be less than gross_min")
+
+    policy = policy.at(request.as_of)
+
+    if request.social_rate_codes is None:
+        social_rate_codes = sorted(policy.social_fund_ids)
+    else:
+        unknown = [
+            code
+            for code in request.social_rate_codes
+            if code not in policy.social_fund_ids
+        ]
+        if unknown:
+            raise ValueError(f"Unknown social fund rate codes: {', '.join(unknown)}")
+        social_rate_codes = request.social_rate_codes
+
+    values = (
+        social_rate_codes,
+        request.custom_medical_insurance_rates,
+        request.personal_exemptions,
+        request.use_increased_spouse_exemption,
+        request.dependent_counts,
+        request.disabled_dependent_counts,
+    )
+    scenario_count = math.prod(len(axis) for axis in values)
+    points = sweep_gross_points(
+        request.gross_min, request.gross_max, request.gross_step
+    )
+    if scenario_count * points > settings.salary.sweep_max_cells:
+        raise ValueError(
+            f"Sweep of {points} gross salaries times {scenario_count} scenarios "
+            f"exceeds {settings.salary.sweep_max_cells} cells"
+        )
+    axes = list(itertools.product(*values))
+
+    scenarios = [
+        SalaryParameters(
+            social_rate_id=policy.social_fund_ids[social_rate_code],
+            custom_medical_insurance_rate=custom_medical_insurance_rate,
+            use_personal_exemption=personal_exemption == PersonalExemption.personal,
+            use_increased_personal_exemption=(
+                personal_exemption == PersonalExemption.personal_increased
+            ),
+            use_increased_spouse_exemption=use_increased_spouse_exemption,
+            dependent_count=dependent_count,
+            disabled_dependent_count=disabled_dependent_count,
+        )
+        for (
+            social_rate_code,
+            custom_medical_insurance_rate,
+            personal_exemption,
+            use_increased_spouse_exemption,
+            dependent_count,
+            disabled_dependent_count,
+        ) in axes
+    ]
+    gross_salary = round_money(
+        request.gross_min + request.gross_step * np.arange(points, dtype=np.float64)
+    )
+
+    # Resolve each scenario once, then lay the grid out scenario by scenario
+    scenario_columns = build_columns(
+        policy, scenarios, gross_salary=np.zeros(len(scenarios))
+    )
+    grid = repeat_columns(scenario_columns, points)
+    grid.gross_salary = np.tile(gross_salary, len(scenarios))
+    results = {
+        field: values.reshape(len(scenarios), points).tolist()
+        for field, values in calculate_columns(grid).items()
+    }
+
+    return {
+        "gross_salary": gross_salary.tolist(),
+        "scenarios": [
+            {
+                "social_rate_code": social_rate_code,
+                "custom_medical_insurance_rate": custom_medical_insurance_rate,
+                "personal_exemption": personal_exemption,
+                "use_increased_spouse_exemption": use_increased_spouse_exemption,
+                "dependent_count": dependent_count,
+                "disabled_dependent_count": disabled_dependent_count,
+                **{
+                    field: series[position]
+                    for field, series in results.items()
+                    if field != "gross_salary"
+                },
+            }
+            for position, (
+                social_rate_code,
+                custom_medical_insurance_rate,
+                personal_exemption,
+                use_increased_spouse_exemption,
+                dependent_count,
+                disabled_dependent_count,
+            ) in enumerate(axes)
+        ],
+    }
@@ -0,0 +1,156 @@
+import math
+from dataclasses import fields
+from operator import itemgetter
+from typing import Any, Sequence
+
+import numpy as np
+
+from src.api.v1.salary.calculator import (
+    build_columns,
+    deduplicate,
+    engine_kernel,
+    reject_uncalculable,
+)
+from src.api.v1.salary.kernel import (
+    RESULT_FIELDS,
+    SalaryColumns,
+    round_money,
+    to_records,
+)
+from src.api.v1.salary.schemas import (
+    CalculationEngine,
+    SalaryCalculationRequest,
+    SalaryWhatIfRequest,
+)
+from src.core.tax_policy import TaxPolicy
+from src.core.validation import validate_items
+
+
+def proposed_policy(policy: TaxPolicy, request: SalaryWhatIfRequest) -> TaxPolicy:
+    """
+    Compile the policy with the overrides of a what-if request applied.
+
+    Raises:
+        ValueError: If an overridden tax rate or exemption does not exist
+    """
+    return policy.with_changes(
+        {override.id: {"rate": override.rate} for override in request.rate_overrides},
+        {
+            override.id: override.model_dump(exclude={"id"}, exclude_none=True)
+            for override in request.exemption_overrides
+        },
+    )
+
+
+def calculate_whatif(
+    current: TaxPolicy,
+    proposed: TaxPolicy,
+    rows: Sequence[SalaryCalculationRequest],
+    engine: CalculationEngine = CalculationEngine.float,
+) -> list[dict[str, Any]]:
+    """
+    Calculate taxes and net salary with the current and a proposed policy.
+
+    The columns of both policies are stacked into 2 x N matrices and
+    calculated in a single kernel pass.
+
+    Args:
+        current: Tax policy in force
+        proposed: Tax policy with the proposed changes
+        rows: Calculation parameters
+        engine: Calculation engine
+
+    Returns:
+        Current and proposed results and their difference per row
+    """
+    if not rows:
+        return []
+
+    rows, mapping = deduplicate(rows)
+    count = len(rows)
+    both = [build_columns(policy, rows) for policy in (current, proposed)]
+    columns = SalaryColumns(
+        **{
+            field.name: np.stack(
+                [np.broadcast_to(getattr(side, field.name), count) for side in both]
+            )
+            for field in fields(SalaryColumns)
+        }
+    )
+    results = engine_kernel(engine)(columns)
+
+    current_records = to_records(
+        {field: values[0] for field, values in results.items()}
+    )
+    proposed_records = to_records(
+        {field: values[1] for field, values in results.items()}
+    )
+    delta_records = to_records(
+        {field: round_money(values[1] - values[0]) for field, values in results.items()}
+    )
+    records = [
+        {"current": current_record, "proposed": proposed_record, "delta": delta}
+        for current_record, proposed_record, delta in zip(
+            current_records, proposed_records, delta_records
+        )
+    ]
+    return [records[position] for position in mapping]
+
+
+def calculate_whatif_batch(
+    policy: TaxPolicy,
+    items: list[dict[str, Any]],
+    proposed: TaxPolicy,
+    engine: CalculationEngine = CalculationEngine.float,
+) -> list[dict[str, Any]]:
+    """
+    Calculate a list of employees with the current and a proposed policy.
+
+    Args:
+        policy: Tax policy in force
+        items: Raw calculation parameters, validated one by one
+        proposed: Tax policy with the proposed changes
+        engine: Calculation engine
+
+    Returns:
+        Per-item results in input order, each holding either a result or an
+        error; items that fail validation or that `engine` cannot calculate get
+        an error
+    """
+    indexes, rows, errors = validate_items(items, SalaryCalculationRequest)
+    indexes, rows = reject_uncalculable(indexes, rows, errors, engine)
+
+    results: list[dict[str, Any]] = [
+        {"index": index, "error": error} for index, error in errors.items()
+    ]
+    results.extend(
+        {"index": index, "result": record}
+        for index, record in zip(
+            indexes, calculate_whatif(policy, proposed, rows, engine)
+        )
+    )
+    if errors:
+        results.sort(key=itemgetter("index"))
+    return results
+
+
+def whatif_totals(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Sum up the current and proposed results of a what-if batch.
+
+    Returns:
+        Number of calculated items, current and proposed totals and their
+        difference
+    """
+    calculated = [item["result"] for item in results if "result" in item]
+    totals: dict[str, Any] = {"count": len(calculated)}
+    for side in ("current", "proposed"):
+        totals[side] = {
+            field: round(math.fsum(result[side][field] for result in calculated), 2)
+            for field in RESULT_FIELDS
+        }
+    totals["delta"] = {
+        field: round(totals["proposed"][field] - totals["current"][field], 2)
+        for field in RESULT_FIELDS
+    }
+    return totals
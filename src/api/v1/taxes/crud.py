@@ -1,8 +1,29 @@
-from sqlalchemy import select
+from datetime import date
+from typing import Iterable, Sequence
+
+from sqlalchemy import Date, Select, bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.v1.taxes.schemas import TaxRateCreate, TaxRateUpdate, TaxRateType
+from src.core.config import settings
+from src.core.listing import keyset_query
+from src.core.models.mixins import PERIOD_FIELDS
 from src.core.models.tax_rate import TaxRate
+from src.core.tax_snapshot import tax_snapshot_cache
+from src.core.upsert import UpsertStatus, upsert_effective_dated
+
+# Lookups run on every request are built once; their compiled form is then
+# found in the engine's statement cache without rebuilding the construct
+_TAX_RATE_BY_ID = select(TaxRate).where(TaxRate.id == bindparam("tax_rate_id"))
+_TAX_RATE_BY_CODE = (
+    select(TaxRate)
+    .where(
+        TaxRate.code == bindparam("code"),
+        TaxRate.in_force(bindparam("as_of", type_=Date)),
+    )
+    .order_by(TaxRate.valid_from.desc())
+    .limit(1)
+)
 
 
 async def create_tax_rate(session: AsyncSession, tax_rate: TaxRateCreate) -> TaxRate:
@@ -19,28 +40,37 @@ async def create_tax_rate(session: AsyncSession, tax_rate: TaxRateCreate) -> Tax
     db_tax_rate = TaxRate(**tax_rate.model_dump())
     session.add(db_tax_rate)
     await session.commit()
+    tax_snapshot_cache.invalidate()
     await session.refresh(db_tax_rate)
     return db_tax_rate
 
 
-async def get_tax_rates(
-    session: AsyncSession, tax_type: TaxRateType | None
-) -> list[TaxRate]:
+def get_tax_rates_query(
+    tax_type: TaxRateType | None,
+    as_of: date | None = None,
+    fields: Iterable[str] | None = None,
+    after: int | None = None,
+    limit: int = settings.db.page_size,
+) -> Select:
     """
-    Get all tax rates.
+    Build the query of one page of tax rates, ordered by ID.
 
     Args:
-        session: Database session
         tax_type: Tax rate type
+        as_of: Only get the tax rates in force on this day
+        fields: Names of the columns to select, all by default
+        after: ID of the last tax rate of the previous page
+        limit: Maximum number of tax rates
 
     Returns:
-        list of tax rates
+        Query of the tax rate rows
     """
-    if tax_type is None:
-        result = await session.execute(select(TaxRate))
-    else:
-        result = await session.execute(select(TaxRate).where(TaxRate.type == tax_type))
-    return list(result.scalars().all())
+    query = keyset_query(TaxRate, fields, after, limit)
+    if tax_type is not None:
+        query = query.where(TaxRate.type == tax_type)
+    if as_of is not None:
+        query = query.where(TaxRate.in_force(as_of))
+    return query
 
 
 async def get_tax_rate_by_id(session: AsyncSession, tax_rate_id: int) -> TaxRate | None:
@@ -54,25 +84,94 @@ async def get_tax_rate_by_id(session: AsyncSession, tax_rate_id: int) -> TaxRate
     Returns:
         Tax rate if found, None otherwise
     """
-    result = await session.execute(select(TaxRate).where(TaxRate.id == tax_rate_id))
+    result = await session.execute(_TAX_RATE_BY_ID, {"tax_rate_id": tax_rate_id})
     return result.scalar_one_or_none()
 
 
-async def get_tax_rate_by_code(session: AsyncSession, code: str) -> TaxRate | None:
+async def get_tax_rate_by_code(
+    session: AsyncSession, code: str, as_of: date | None = None
+) -> TaxRate | None:
     """
     Get a tax rate by code.
 
     Args:
         session: Database session
         code: Tax rate code
+        as_of: Day the tax rate is in force, today by default
 
     Returns:
         Tax rate if found, None otherwise
     """
-    result = await session.execute(select(TaxRate).where(TaxRate.code == code))
+    result = await session.execute(
+        _TAX_RATE_BY_CODE, {"code": code, "as_of": as_of or date.today()}
+    )
     return result.scalar_one_or_none()
 
 
+async def get_overlapping_tax_rate(
+    session: AsyncSession,
+    code: str,
+    valid_from: date | None,
+    valid_to: date | None,
+    exclude_id: int | None = None,
+) -> TaxRate | None:
+    """
+    Get a tax rate with the given code whose validity period overlaps the given one.
+
+    Args:
+        session: Database session
+        code: Tax rate code
+        valid_from: Start of the validity period
+        valid_to: End of the validity period
+        exclude_id: ID of a tax rate to ignore
+
+    The rows of the code are locked until the transaction ends, so that
+    concurrent writes of the same code are checked one after the other.
+
+    Returns:
+        Overlapping tax rate if any, None otherwise
+    """
+    await session.execute(
+        select(TaxRate.id).where(TaxRate.code == code).with_for_update()
+    )
+    query = select(TaxRate).where(
+        TaxRate.code == code, TaxRate.overlapping(valid_from, valid_to)
+    )
+    if exclude_id is not None:
+        query = query.where(TaxRate.id != exclude_id)
+    result = await session.execute(query.limit(1))
+    return result.scalar_one_or_none()
+
+
+async def upsert_tax_rates(
+    session: AsyncSession, tax_rates: Sequence[tuple[int, TaxRateCreate]]
+) -> tuple[dict[int, tuple[UpsertStatus, TaxRate]], dict[int, str]]:
+    """
+    Create or update many tax rates in one transaction.
+
+    A tax rate updates the one with the same code and `valid_from`, and is
+    created otherwise.
+
+    Args:
+        session: Database session
+        tax_rates: Tax rate data by item index
+
+    Returns:
+        Status and tax rate by index of the applied items, and errors by
+        index of the others
+    """
+    applied, errors = await upsert_effective_dated(
+        session,
+        TaxRate,
+        [(index, tax_rate.model_dump()) for index, tax_rate in tax_rates],
+        "Tax rate",
+    )
+    await session.commit()
+    if applied:
+        tax_snapshot_cache.invalidate()
+    return applied, errors
+
+
 async def update_tax_rate(
     session: AsyncSession, tax_rate: TaxRate, tax_rate_update: TaxRateUpdate
 ) -> TaxRate | None:
@@ -87,10 +186,13 @@ async def update_tax_rate(
     Returns:
         Updated tax rate if found, None otherwise
     """
-    update_data = tax_rate_update.model_dump(
-        exclude_unset=True,
-        exclude_none=True,
-    )
+    # An explicit null clears a bound of the validity period, and is ignored
+    # for the other fields, which are required
+    update_data = {
+        key: value
+        for key, value in tax_rate_update.model_dump(exclude_unset=True).items()
+        if value is not None or key in PERIOD_FIELDS
+    }
 
     if not update_data:
         return tax_rate
@@ -98,6 +200,7 @@ async def update_tax_rate(
     for key, value in update_data.items():
         setattr(tax_rate, key, value)
     await session.commit()
+    tax_snapshot_cache.invalidate()
     await session.refresh(tax_rate)
 
     return tax_rate
@@ -116,3 +219,4 @@ async def delete_tax_rate(session: AsyncSession, tax_rate: TaxRate) -> None:
     """
     await session.delete(tax_rate)
     await session.commit()
+    tax_snapshot_cache.invalidate()
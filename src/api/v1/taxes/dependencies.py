@@ -1,14 +1,13 @@
 from fastapi import Depends, HTTPException, Path
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing_extensions import Annotated
 
 from src.api.v1.taxes import crud
-from src.core.database import DbSessionDep
+from src.core.database import DbReadSessionDep, DbSessionDep
 from src.core.models import TaxRate
 
 
-async def get_tax_by_id(
-    session: DbSessionDep, tax_rate_id: Annotated[int, Path]
-) -> TaxRate:
+async def _get_tax_by_id(session: AsyncSession, tax_rate_id: int) -> TaxRate:
     tax_rate = await crud.get_tax_rate_by_id(session, tax_rate_id)
 
     if tax_rate is None:
@@ -16,4 +15,17 @@ async def get_tax_by_id(
     return tax_rate
 
 
+async def get_tax_by_id(
+    session: DbSessionDep, tax_rate_id: Annotated[int, Path]
+) -> TaxRate:
+    return await _get_tax_by_id(session, tax_rate_id)
+
+
+# Loaded from a read replica; only for routes that don't write
+async def read_tax_by_id(
+    session: DbReadSessionDep, tax_rate_id: Annotated[int, Path]
+) -> TaxRate:
+    return await _get_tax_by_id(session, tax_rate_id)
+
+
 TaxByIdDep = Annotated[TaxRate, Depends(get_tax_by_id)]
@@ -1,18 +1,52 @@
-from fastapi import APIRouter, HTTPException, status
+from datetime import date
+from operator import itemgetter
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Path, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.v1.taxes import crud
-from src.api.v1.taxes.dependencies import TaxByIdDep
+from src.api.v1.taxes.dependencies import TaxByIdDep, read_tax_by_id
 from src.api.v1.taxes.schemas import (
     TaxRateCreate,
+    TaxRateBulkRequest,
+    TaxRateBulkResponse,
+    TaxRateField,
+    TaxRateListItem,
     TaxRateUpdate,
     TaxRateResponse,
     TaxRateType,
 )
-from src.core.database import DbSessionDep
+from src.core.config import settings
+from src.core.database import DbReadSessionDep, DbSessionDep
+from src.core.http_cache import TaxRatesCacheDep
+from src.core.validation import validate_items
 
 router = APIRouter(prefix="/taxes", tags=["taxes"])
 
 
+async def _check_validity_period(
+    session: AsyncSession,
+    code: str,
+    valid_from: date | None,
+    valid_to: date | None,
+    tax_rate_id: int | None = None,
+) -> None:
+    if valid_from is not None and valid_to is not None and valid_to < valid_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="valid_to must not be before valid_from",
+        )
+    overlapping_tax_rate = await crud.get_overlapping_tax_rate(
+        session, code, valid_from, valid_to, exclude_id=tax_rate_id
+    )
+    if overlapping_tax_rate:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tax rate with code '{code}' already exists for an overlapping period",
+        )
+
+
 @router.post("/", response_model=TaxRateResponse, status_code=status.HTTP_201_CREATED)
 async def create_tax_rate(
     tax_rate: TaxRateCreate,
@@ -25,36 +59,90 @@ async def create_tax_rate(
     - **code**: Unique tax rate code (required) ("social_fund", "medical_insurance", "income_tax")
     - **rate**: Tax rate value between 0 and 1 (required)
     - **description**: Optional description
+    - **valid_from**: First day the rate is in force (optional, ever since if unset)
+    - **valid_to**: Last day the rate is in force (optional, from then on if unset)
+
+    A code may have several rates as long as their validity periods don't overlap.
 
     Returns the created tax rate.
     """
-    # Check if tax rate with the same code already exists
-    existing_tax_rate = await crud.get_tax_rate_by_code(session, tax_rate.code)
-    if existing_tax_rate:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Tax rate with code '{tax_rate.code}' already exists",
-        )
+    await _check_validity_period(
+        session, tax_rate.code, tax_rate.valid_from, tax_rate.valid_to
+    )
 
     return await crud.create_tax_rate(session, tax_rate)
 
 
-@router.get("/", response_model=list[TaxRateResponse])
-async def get_tax_rates(
+@router.post("/bulk", response_model=TaxRateBulkResponse)
+async def upsert_tax_rates(
+    bulk: TaxRateBulkRequest,
     session: DbSessionDep,
-    tax_type: TaxRateType | None = None,
 ):
     """
-    Get all tax rates.
+    Create or update many tax rates at once.
+
+    - **items**: List of tax rates, each with the same fields as for `POST /`
 
-    Returns a list of tax rates.
+    A tax rate updates the one with the same **code** and **valid_from**, and
+    is created otherwise. All tax rates are written in one transaction, and
+    tax rates cached for calculations are reloaded once afterwards.
+
+    Returns one result per item in input order, with its **status**
+    (`created` or `updated`); items that fail validation or overlap another
+    period of their code get an **error** instead and are not saved.
+    """
+    indexes, tax_rates, errors = validate_items(bulk.items, TaxRateCreate)
+    applied, upsert_errors = await crud.upsert_tax_rates(
+        session, list(zip(indexes, tax_rates))
+    )
+    errors.update(upsert_errors)
+
+    results = [{"index": index, "error": error} for index, error in errors.items()]
+    results.extend(
+        {"index": index, "status": status, "result": tax_rate}
+        for index, (status, tax_rate) in applied.items()
+    )
+    results.sort(key=itemgetter("index"))
+    return {"results": results}
+
+
+@router.get("/", response_model=list[TaxRateListItem])
+async def get_tax_rates(
+    cache: TaxRatesCacheDep,
+    tax_type: TaxRateType | None = None,
+    as_of: date | None = None,
+    fields: Annotated[list[TaxRateField] | None, Query()] = None,
+    after: int | None = None,
+    limit: Annotated[int, Query(ge=1, le=settings.db.page_max_size)] = (
+        settings.db.page_size
+    ),
+):
+    """
+    Get a page of tax rates, ordered by ID.
+
+    - **as_of**: Only get the tax rates in force on this day (optional)
+    - **fields**: Only get these fields, and always the **id** (optional,
+      repeatable, all fields by default)
+    - **after**: ID of the last tax rate of the previous page (optional, from
+      the first tax rate by default)
+    - **limit**: Maximum number of tax rates (optional)
+
+    Returns a list of tax rates. Fewer than **limit** tax rates means there
+    are no more; otherwise request the next page with **after** set to the
+    **id** of the last one.
     """
-    return await crud.get_tax_rates(session, tax_type)
+    if (response := cache.cached_response()) is not None:
+        return response
+    return cache.streaming_response(
+        crud.get_tax_rates_query(tax_type, as_of, fields, after, limit)
+    )
 
 
 @router.get("/{tax_rate_id}", response_model=TaxRateResponse)
 async def get_tax_rate(
-    tax_rate: TaxByIdDep,
+    cache: TaxRatesCacheDep,
+    session: DbReadSessionDep,
+    tax_rate_id: Annotated[int, Path],
 ):
     """
     Get a tax rate by ID.
@@ -63,29 +151,44 @@ async def get_tax_rate(
 
     Returns the tax rate if found.
     """
-    return tax_rate
+    if (response := cache.cached_response()) is not None:
+        return response
+
+    async def read() -> TaxRateResponse:
+        tax_rate = await read_tax_by_id(session, tax_rate_id)
+        return TaxRateResponse.model_validate(tax_rate)
+
+    return await cache.json_response(session, read)
 
 
 @router.get("/code/{code}", response_model=TaxRateResponse)
 async def get_tax_rate_by_code(
+    cache: TaxRatesCacheDep,
     code: str,
-    session: DbSessionDep,
+    session: DbReadSessionDep,
+    as_of: date | None = None,
 ):
     """
     Get a tax rate by code.
 
     - **code**: Tax rate code (required)
+    - **as_of**: Day the tax rate is in force (optional, today by default)
 
     Returns the tax rate if found.
     """
-    tax_rate = await crud.get_tax_rate_by_code(session, code)
-    if not tax_rate:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Tax rate with code '{code}' not found",
-        )
+    if (response := cache.cached_response()) is not None:
+        return response
+
+    async def read() -> TaxRateResponse:
+        tax_rate = await crud.get_tax_rate_by_code(session, code, as_of)
+        if not tax_rate:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Tax rate with code '{code}' not found",
+            )
+        return TaxRateResponse.model_validate(tax_rate)
 
-    return tax_rate
+    return await cache.json_response(session, read)
 
 
 @router.put("/{tax_rate_id}", response_model=TaxRateResponse)
@@ -101,9 +204,25 @@ async def update_tax_rate(
     - **name**: New tax rate name (optional)
     - **rate**: New tax rate value between 0 and 1 (optional)
     - **description**: New description (optional)
+    - **valid_from**: New first day the rate is in force (optional, `null`
+      for ever since)
+    - **valid_to**: New last day the rate is in force (optional, `null` for
+      from then on)
 
     Returns the updated tax rate if found.
     """
+    await _check_validity_period(
+        session,
+        tax_rate_update.code or tax_rate.code,
+        # An explicit null clears a bound of the validity period
+        tax_rate_update.valid_from
+        if "valid_from" in tax_rate_update.model_fields_set
+        else tax_rate.valid_from,
+        tax_rate_update.valid_to
+        if "valid_to" in tax_rate_update.model_fields_set
+        else tax_rate.valid_to,
+        tax_rate.id,
+    )
     updated_tax_rate = await crud.update_tax_rate(session, tax_rate, tax_rate_update)
     return updated_tax_rate
 
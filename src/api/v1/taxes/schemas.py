@@ -1,7 +1,12 @@
 from enum import StrEnum
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any
+
 from pydantic import BaseModel, Field, ConfigDict
 
+from src.core.config import settings
+from src.core.upsert import UpsertStatus
+
 
 class TaxRateType(StrEnum):
     social_fund = "social_fund"
@@ -15,6 +20,8 @@ class TaxRateCreate(BaseModel):
     code: str = Field(..., min_length=1, max_length=100)
     rate: float = Field(..., gt=0, lt=1)
     description: str | None = Field(None, max_length=255)
+    valid_from: date | None = None
+    valid_to: date | None = None
 
 
 class TaxRateUpdate(BaseModel):
@@ -23,6 +30,8 @@ class TaxRateUpdate(BaseModel):
     code: str | None = Field(None, min_length=1, max_length=100)
     rate: float | None = Field(None, gt=0, lt=1)
     description: str | None = Field(None, max_length=255)
+    valid_from: date | None = None
+    valid_to: date | None = None
 
 
 class TaxRateResponse(BaseModel):
@@ -34,5 +43,49 @@ class TaxRateResponse(BaseModel):
     code: str = Field(..., min_length=1, max_length=100)
     rate: float = Field(..., gt=0, lt=1)
     description: str | None = Field(None, max_length=255)
+    valid_from: date | None = None
+    valid_to: date | None = None
     created_at: datetime
     updated_at: datetime
+
+
+class TaxRateListItem(BaseModel):
+    # A tax rate in a list, with only the fields selected with `fields`
+    id: int
+    name: str | None = None
+    type: TaxRateType | None = None
+    code: str | None = None
+    rate: float | None = None
+    description: str | None = None
+    valid_from: date | None = None
+    valid_to: date | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+# Fields that can be selected in lists of tax rates
+TaxRateField = StrEnum(
+    "TaxRateField", [(name, name) for name in TaxRateResponse.model_fields]
+)
+
+
+class TaxRateBulkRequest(BaseModel):
+    # Items are validated one by one so that a single malformed row is
+    # reported in its own result instead of rejecting the whole batch.
+    items: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.db.bulk_max_items,
+        description="List of TaxRateCreate objects",
+    )
+
+
+class TaxRateBulkItemResult(BaseModel):
+    index: int
+    status: UpsertStatus | None = None
+    result: TaxRateResponse | None = None
+    error: str | None = None
+
+
+class TaxRateBulkResponse(BaseModel):
+    results: list[TaxRateBulkItemResult]
@@ -1,21 +1,43 @@
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import RedirectResponse
-from starlette.staticfiles import StaticFiles
 
 from src.api import router as api_router
-from src.core.database import db
+from src.api.v1.jobs.manager import job_manager
+from src.api.v1.salary.offload import calculation_pool
+from src.core.assets import PrecompressedStaticFiles, static_directory
+from src.core.compression import CompressionMiddleware
+from src.core.config import settings
+from src.core.database import ReadYourWritesMiddleware, db
 from src.core.init_db import init_db
+from src.core.tax_snapshot import tax_snapshot_cache
+
+
+async def load_tax_snapshot() -> None:
+    async with db.read_session() as session:
+        await tax_snapshot_cache.get(session)
 
 
 @asynccontextmanager
-async def lifespan(_app: FastAPI) -> AsyncGenerator[None]:
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    app.state.ready = False
+    # Worker processes boot in the background while the database is prepared
+    calculation_pool.start()
     async with db.session_factory() as session:
         await init_db(session)
+    await asyncio.gather(
+        db.warm_up(settings.db.pool_prewarm),
+        load_tax_snapshot(),
+    )
+    app.state.ready = True
     yield
+    app.state.ready = False
+    await job_manager.shutdown()
+    calculation_pool.shutdown()
 
 
 app = FastAPI(
@@ -32,12 +54,24 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware, database=db)
+# Precompressed static files are sent as they are, since they already have a
+# Content-Encoding
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.http.gzip_min_size,
+    compresslevel=settings.http.gzip_level,
+)
 
 
 app.include_router(api_router)
 
 # Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount(
+    "/static",
+    PrecompressedStaticFiles(directory=static_directory()),
+    name="static",
+)
 
 
 @app.get("/", include_in_schema=False)
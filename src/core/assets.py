@@ -0,0 +1,186 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import re
+import shutil
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from src.core.compression import accepted_encodings, gzip_etag
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip variants are built without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Static files as written, and as built by `python -m src.core.assets`,
+# relative to the working directory like the app itself
+SOURCE_DIR = Path("static")
+BUILD_DIR = Path("build/static")
+
+# Fingerprinted names and encoded variants of the built files
+MANIFEST_NAME = "assets.json"
+
+# Pages keep their names, since they are what users open and bookmark
+UNFINGERPRINTED_SUFFIXES = {".html"}
+COMPRESSED_SUFFIXES = {".css", ".html", ".js", ".json", ".svg", ".txt"}
+
+# Encodings of the variants in order of preference, with their file suffix
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Local URLs in quoted attributes and `url(...)`, e.g. "/static/js/app.js"
+_STATIC_URL = r"(?<=[\"'(]){prefix}/([^\"'()?#]+)"
+
+
+def _fingerprinted_name(path: Path, content: bytes) -> Path:
+    digest = hashlib.blake2b(content, digest_size=6).hexdigest()
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}")
+
+
+def _compress(content: bytes) -> dict[str, bytes]:
+    variants = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(content, quality=11)
+    # A variant that isn't smaller isn't worth sending
+    return {
+        encoding: variant
+        for encoding, variant in variants.items()
+        if len(variant) < len(content)
+    }
+
+
+def build_assets(source: Path, target: Path, url_prefix: str = "/static") -> dict:
+    """
+    Build the static files for serving: name every file but the pages after
+    a hash of its content, point the pages at the new names, and write gzip
+    (and, if the `brotli` package is installed, brotli) variants of text
+    files next to them.
+
+    A fingerprinted file never changes under its name, so browsers may cache
+    it for good; a release that changes it changes its name in the pages.
+
+    Args:
+        source: Directory of the static files
+        target: Directory to build into, replaced entirely
+        url_prefix: URL path the files are served under
+
+    Returns:
+        Manifest of the build, also written to the target directory
+    """
+    files = sorted(path for path in source.rglob("*") if path.is_file())
+    contents = {path.relative_to(source): path.read_bytes() for path in files}
+
+    assets: dict[str, str] = {}
+    for path, content in contents.items():
+        if path.suffix not in UNFINGERPRINTED_SUFFIXES:
+            assets[path.as_posix()] = _fingerprinted_name(path, content).as_posix()
+
+    pattern = re.compile(_STATIC_URL.format(prefix=re.escape(url_prefix)))
+    shutil.rmtree(target, ignore_errors=True)
+    encodings: dict[str, list[str]] = {}
+    for path, content in contents.items():
+        name = assets.get(path.as_posix(), path.as_posix())
+        if path.suffix in UNFINGERPRINTED_SUFFIXES:
+            content = pattern.sub(
+                lambda match: f"{url_prefix}/{assets.get(match[1], match[1])}",
+                content.decode(),
+            ).encode()
+        output = target / name
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(content)
+        if path.suffix in COMPRESSED_SUFFIXES:
+            variants = _compress(content)
+            for encoding, variant in variants.items():
+                output.with_name(output.name + ENCODINGS[encoding]).write_bytes(variant)
+            if variants:
+                encodings[name] = [
+                    encoding for encoding in ENCODINGS if encoding in variants
+                ]
+
+    manifest = {"assets": assets, "encodings": encodings}
+    (target / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def static_directory() -> Path:
+    """
+    Get the directory to serve static files from: the built files if they
+    have been built, e.g. in the Docker image, and the sources otherwise.
+    """
+    return BUILD_DIR if (BUILD_DIR / MANIFEST_NAME).is_file() else SOURCE_DIR
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Static files that serve the precompressed variant of a built file the
+    client accepts, and let browsers cache fingerprinted files for good.
+
+    Files that weren't built, e.g. the sources in development, are served as
+    they are with `Cache-Control: no-cache`, so browsers revalidate them.
+    """
+
+    def __init__(self, *, directory: Path, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        manifest_path = directory / MANIFEST_NAME
+        manifest = (
+            json.loads(manifest_path.read_text()) if manifest_path.is_file() else {}
+        )
+        self.fingerprinted: set[str] = set(manifest.get("assets", {}).values())
+        self.encodings: dict[str, list[str]] = manifest.get("encodings", {})
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        variants = self.encodings.get(path, [])
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        encoding = next(
+            (encoding for encoding in variants if encoding in accepted), None
+        )
+
+        if encoding is None:
+            response = await super().get_response(path, scope)
+        else:
+            # The media type is guessed from the name without the suffix
+            response = await super().get_response(path + ENCODINGS[encoding], scope)
+            if response.status_code == 200:
+                response.headers["Content-Encoding"] = encoding
+        if variants:
+            response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = (
+            IMMUTABLE_CACHE_CONTROL if path in self.fingerprinted else "no-cache"
+        )
+        return response
+
+    def is_not_modified(
+        self, response_headers: Headers, request_headers: Headers
+    ) -> bool:
+        # Files gzipped by `CompressionMiddleware` are revalidated with the
+        # suffixed ETag
+        etag = response_headers.get("etag")
+        if_none_match = request_headers.get("if-none-match", "")
+        if etag is not None and gzip_etag(etag) in if_none_match:
+            return True
+        return super().is_not_modified(response_headers, request_headers)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build the static files.")
+    parser.add_argument("source", nargs="?", type=Path, default=SOURCE_DIR)
+    parser.add_argument("target", nargs="?", type=Path, default=BUILD_DIR)
+    arguments = parser.parse_args()
+    built = build_assets(arguments.source, arguments.target)
+    logger.info(
+        "Built %d fingerprinted and %d precompressed files into %s",
+        len(built["assets"]),
+        len(built["encodings"]),
+        arguments.target,
+    )
@@ -0,0 +1,92 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Content codings the application can send
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+# Appended to the strong ETag of a response gzipped on the fly
+GZIP_ETAG_SUFFIX = "-gzip"
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """
+    Get the content codings an `Accept-Encoding` header accepts, leaving out
+    those it rules out with `q=0`.
+    """
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = next((param[2:] for param in params if param.startswith("q=")), "1")
+        try:
+            if float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.lower())
+    if "*" in accepted:
+        accepted.update(SUPPORTED_ENCODINGS)
+    return accepted
+
+
+def gzip_etag(etag: str) -> str:
+    """
+    Get the ETag of the gzipped representation of a response with a strong
+    ETag, e.g. `"abc"` becomes `"abc-gzip"`.
+    """
+    return f'{etag[:-1]}{GZIP_ETAG_SUFFIX}"'
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Gzip responses of at least `minimum_size` bytes for clients that accept
+    gzip, like Starlette's `GZipMiddleware`, but honouring `q=0` in their
+    `Accept-Encoding`.
+
+    Responses that already have a `Content-Encoding`, e.g. precompressed
+    static files, are sent as they are.
+
+    A strong ETag identifies the exact bytes of a representation, so the
+    strong ETag of a response this gzips gets `GZIP_ETAG_SUFFIX`, and so does
+    that of a `304 Not Modified` answering that suffixed ETag. Whoever
+    compares ETags has to strip the suffix, as `http_cache` does.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        accept_encoding = request_headers.get("accept-encoding", "")
+        if_none_match = request_headers.get("if-none-match", "")
+        responder: IdentityResponder
+        if "gzip" in accepted_encodings(accept_encoding):
+            responder = GZipResponder(self.app, self.minimum_size, self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # The responder adds `Vary: Accept-Encoding` even if the app
+                # already did
+                headers = MutableHeaders(raw=message["headers"])
+                vary = headers.get("vary")
+                if vary is not None:
+                    values = (value.strip() for value in vary.split(","))
+                    headers["vary"] = ", ".join(dict.fromkeys(values))
+
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    gzipped = (
+                        headers.get("content-encoding") == "gzip"
+                        and not responder.content_encoding_set
+                    )
+                    revalidated = (
+                        message["status"] == 304 and gzip_etag(etag) in if_none_match
+                    )
+                    if gzipped or revalidated:
+                        headers["etag"] = gzip_etag(etag)
+            await send(message)
+
+        await responder(scope, receive, send_with_headers)
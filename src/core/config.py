@@ -2,7 +2,7 @@ import os
 from pathlib import Path
 
 from dotenv import load_dotenv
-from pydantic import BaseModel, MySQLDsn
+from pydantic import AnyUrl, BaseModel, MySQLDsn, UrlConstraints
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -16,12 +16,50 @@ def get_required_env(env_var_name: str) -> str:
     return env_var
 
 
+class SqliteDsn(AnyUrl):
+    """
+    Embedded SQLite database file, e.g. `sqlite+aiosqlite:///salary.db`
+    relative to the working directory, or `sqlite+aiosqlite:////data/salary.db`.
+    """
+
+    _constraints = UrlConstraints(allowed_schemes=["sqlite+aiosqlite"])
+
+
+def parse_db_url(url: str) -> MySQLDsn | SqliteDsn:
+    if url.startswith("sqlite"):
+        return SqliteDsn(url)
+    return MySQLDsn(url)
+
+
 class DbSettings(BaseModel):
-    url: MySQLDsn = MySQLDsn(get_required_env("DB_URL"))
+    url: MySQLDsn | SqliteDsn = parse_db_url(get_required_env("DB_URL"))
     echo: bool = False
     echo_pool: bool = False
-    pool_size: int = 50
-    max_overflow: int = 10
+    pool_size: int = int(os.getenv("DB_POOL_SIZE", "50"))
+    max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # Seconds a checkout waits for a connection before failing
+    pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Connections opened per pool on startup, before the first request
+    pool_prewarm: int = int(os.getenv("DB_POOL_PREWARM", "5"))
+    # Run pending migrations in `main.py` before the application starts
+    migrate_on_start: bool = os.getenv("DB_MIGRATE_ON_START", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    replica_urls: list[MySQLDsn] = [
+        MySQLDsn(url.strip())
+        for url in os.getenv("DB_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    # Seconds a client reads from the primary after it wrote, to cover
+    # replication lag
+    replica_lag: float = float(os.getenv("DB_REPLICA_LAG", "5"))
+    # Rows accepted by one bulk upsert of tax rates or exemptions
+    bulk_max_items: int = int(os.getenv("DB_BULK_MAX_ITEMS", "5000"))
+    # Rows per page of the tax rate and exemption lists, by default and at most
+    page_size: int = int(os.getenv("DB_PAGE_SIZE", "100"))
+    page_max_size: int = int(os.getenv("DB_PAGE_MAX_SIZE", "10000"))
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -31,9 +69,59 @@ class DbSettings(BaseModel):
     }
 
 
+class PolicyCacheSettings(BaseModel):
+    # Upper bound on how long a worker keeps serving a snapshot that another
+    # worker (or replica) may already have invalidated.
+    ttl: float = float(os.getenv("POLICY_CACHE_TTL", "60"))
+
+
+class HttpSettings(BaseModel):
+    # Cache-Control of tax rate and exemption responses; with `no-cache`,
+    # clients revalidate every time, which is cheap with their ETag
+    cache_control: str = os.getenv("HTTP_CACHE_CONTROL", "no-cache")
+    # Encoded bodies of tax rate and exemption responses kept by each worker
+    body_cache_size: int = int(os.getenv("HTTP_BODY_CACHE_SIZE", "1000"))
+    # Responses of at least `gzip_min_size` bytes are gzipped for clients that
+    # accept it; level 6 is nearly as small as 9 at a third of the CPU time
+    gzip_min_size: int = int(os.getenv("HTTP_GZIP_MIN_SIZE", "1024"))
+    gzip_level: int = int(os.getenv("HTTP_GZIP_LEVEL", "6"))
+
+
+class SalarySettings(BaseModel):
+    batch_max_items: int = int(os.getenv("SALARY_BATCH_MAX_ITEMS", "50000"))
+    stream_chunk_size: int = int(os.getenv("SALARY_STREAM_CHUNK_SIZE", "5000"))
+    result_cache_size: int = int(os.getenv("SALARY_RESULT_CACHE_SIZE", "10000"))
+    sweep_max_cells: int = int(os.getenv("SALARY_SWEEP_MAX_CELLS", "1000000"))
+    engine: str = os.getenv("SALARY_ENGINE", "float")
+    # Calculations of at least `offload_min_rows` rows, and every stream chunk,
+    # run in a pool of `offload_workers` processes; 0 workers calculates
+    # everything in-process.
+    offload_workers: int = int(
+        os.getenv("SALARY_OFFLOAD_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+    offload_min_rows: int = int(os.getenv("SALARY_OFFLOAD_MIN_ROWS", "20000"))
+    offload_min_chunk_rows: int = int(
+        os.getenv("SALARY_OFFLOAD_MIN_CHUNK_ROWS", "5000")
+    )
+
+
+class JobSettings(BaseModel):
+    max_concurrent: int = int(os.getenv("JOBS_MAX_CONCURRENT", "2"))
+    # Jobs each worker keeps waiting beyond the ones it runs, with their items
+    max_queued: int = int(os.getenv("JOBS_MAX_QUEUED", "8"))
+    max_items: int = int(os.getenv("JOBS_MAX_ITEMS", "1000000"))
+    chunk_size: int = int(os.getenv("JOBS_CHUNK_SIZE", "20000"))
+    # Seconds finished jobs and their results are kept for download
+    retention: float = float(os.getenv("JOBS_RETENTION", "3600"))
+
+
 class Settings(BaseModel):
     base_dir: Path = BASE_DIR
     db: DbSettings = DbSettings()
+    policy_cache: PolicyCacheSettings = PolicyCacheSettings()
+    http: HttpSettings = HttpSettings()
+    salary: SalarySettings = SalarySettings()
+    jobs: JobSettings = JobSettings()
 
 
 settings = Settings()
@@ -1,13 +1,84 @@
-from typing import Annotated, AsyncGenerator
+import asyncio
+import itertools
+import math
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Annotated, Any, AsyncGenerator, Sequence
 
 from fastapi import Depends
+from sqlalchemy import Connection, event
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     create_async_engine,
     async_sessionmaker,
     AsyncSession,
 )
 
 from src.core.config import settings
+from src.core.pool_monitor import MonitoredPool, PoolMonitor
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    # Write-ahead logging lets readers carry on while a write is in progress;
+    # with it, NORMAL sync is still safe against corruption
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+class ReadSession(AsyncSession):
+    """
+    Session that only reads, and gives its connection back to the pool as
+    soon as the results of each statement are loaded, instead of holding it
+    until the session is closed after the response has been sent.
+
+    `execute`, `scalars` and `scalar` buffer all rows, so the session can be
+    closed right after them. Objects they loaded are detached but keep their
+    loaded attributes, and the next statement starts a new transaction.
+    """
+
+    async def _release(self) -> None:
+        # Closing rolls back rather than commits, so it doesn't count as a
+        # write for `Database.read_session`
+        await self.close()
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:
+        result = await super().execute(*args, **kwargs)
+        await self._release()
+        return result
+
+    async def scalar(self, *args: Any, **kwargs: Any) -> Any:
+        result = await super().scalar(*args, **kwargs)
+        await self._release()
+        return result
+
+    async def scalars(self, *args: Any, **kwargs: Any) -> Any:
+        return (await self.execute(*args, **kwargs)).scalars()
+
+
+# Set on clients that wrote to the primary, for as long as replicas may lag
+# behind their writes
+READ_PRIMARY_COOKIE = "read_primary"
+
+
+@dataclass(slots=True)
+class _ClientWrites:
+    """
+    Whether the client of the current request reads from the primary: since
+    it wrote recently, or since this request wrote.
+    """
+
+    read_primary: bool = False
+    wrote: bool = False
+
+
+_client_writes: ContextVar[_ClientWrites | None] = ContextVar(
+    "client_writes", default=None
+)
 
 
 class Database:
@@ -18,26 +89,105 @@ class Database:
         echo_pool: bool = False,
         pool_size: int = 5,
         max_overflow: int = 10,
+        pool_timeout: float = 30,
+        replica_urls: Sequence[str] = (),
+        replica_lag: float = 5,
     ):
-        self.engine = create_async_engine(
-            url=url,
-            echo=echo,
-            echo_pool=echo_pool,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
-        )
-        self.session_factory = async_sessionmaker(
-            bind=self.engine,
-            autocommit=False,
-            autoflush=False,
-            expire_on_commit=False,
-        )
+        def create_engine(engine_url: str) -> AsyncEngine:
+            engine = create_async_engine(
+                url=engine_url,
+                echo=echo,
+                echo_pool=echo_pool,
+                poolclass=MonitoredPool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+            )
+            if engine.dialect.name == "sqlite":
+                event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+            return engine
 
+        def create_session_factory[SessionT: AsyncSession](
+            engine: AsyncEngine, session_class: type[SessionT]
+        ) -> async_sessionmaker[SessionT]:
+            return async_sessionmaker(
+                bind=engine,
+                class_=session_class,
+                autocommit=False,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+
+        self.engine = create_engine(url)
+        self.session_factory = create_session_factory(self.engine, AsyncSession)
+        self.read_session_factory = create_session_factory(self.engine, ReadSession)
+        self.pool_monitor = PoolMonitor(self.engine, max_overflow=max_overflow)
+
+        self.replica_engines = [
+            create_engine(replica_url) for replica_url in replica_urls
+        ]
+        self.replica_session_factories = [
+            create_session_factory(engine, ReadSession)
+            for engine in self.replica_engines
+        ]
+        self.replica_pool_monitors = [
+            PoolMonitor(engine, max_overflow=max_overflow)
+            for engine in self.replica_engines
+        ]
+        self._replicas = itertools.cycle(self.replica_session_factories)
+        self.replica_lag = replica_lag
+        event.listen(self.engine.sync_engine, "commit", self._on_commit)
+
+    async def warm_up(self, connections: int) -> None:
+        """
+        Open up to `connections` connections in the pool of the primary and
+        of every replica, so that the first requests don't wait for them.
+        """
+        for engine in (self.engine, *self.replica_engines):
+            pool = engine.sync_engine.pool
+            assert isinstance(pool, MonitoredPool)
+            # Connections are all checked out at once, or the pool would hand
+            # out the same one again
+            opened = await asyncio.gather(
+                *(engine.connect() for _ in range(min(connections, pool.size())))
+            )
+            await asyncio.gather(*(connection.close() for connection in opened))
+
+    def _on_commit(self, connection: Connection) -> None:
+        client = _client_writes.get()
+        if client is not None:
+            client.wrote = True
+
+    def read_session(self) -> AsyncSession:
+        """
+        Open a session for reading only, on the next read replica in turn.
+
+        Reads go to the primary when there are no replicas, and for clients
+        that committed to the primary in the last `replica_lag` seconds (see
+        `ReadYourWritesMiddleware`), so that they read their own writes
+        however far the replicas lag behind. Other clients keep reading from
+        the replicas.
+        """
+        client = _client_writes.get()
+        if not self.replica_session_factories or (
+            client is not None and (client.read_primary or client.wrote)
+        ):
+            return self.read_session_factory()
+        return next(self._replicas)()
+
+    # Sessions only check out a connection on their first statement, so
+    # requests answered from memory, such as calculations with a cached tax
+    # policy, never wait for the pool.
     async def session_dependency(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             yield session
             await session.close()
 
+    async def read_session_dependency(self) -> AsyncGenerator[AsyncSession, None]:
+        async with self.read_session() as session:
+            yield session
+            await session.close()
+
 
 db = Database(
     url=str(settings.db.url),
@@ -45,6 +195,50 @@ db = Database(
     echo_pool=settings.db.echo_pool,
     pool_size=settings.db.pool_size,
     max_overflow=settings.db.max_overflow,
+    pool_timeout=settings.db.pool_timeout,
+    replica_urls=[str(url) for url in settings.db.replica_urls],
+    replica_lag=settings.db.replica_lag,
 )
 
+
+class ReadYourWritesMiddleware:
+    """
+    Keep clients that wrote to the primary reading from it for
+    `Database.replica_lag` seconds, with a cookie that expires then, so that
+    any worker they reach next reads their writes. Clients that keep no
+    cookies read their own writes only within the request that made them.
+    """
+
+    def __init__(self, app: ASGIApp, database: Database):
+        self.app = app
+        self.database = database
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.database.replica_session_factories:
+            await self.app(scope, receive, send)
+            return
+
+        client = _ClientWrites(
+            read_primary=READ_PRIMARY_COOKIE in HTTPConnection(scope).cookies
+        )
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and client.wrote:
+                max_age = math.ceil(self.database.replica_lag)
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}=1; Max-Age={max_age}; Path=/; "
+                    "HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = _client_writes.set(client)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _client_writes.reset(token)
+
+
 DbSessionDep = Annotated[AsyncSession, Depends(db.session_dependency)]
+# Session on a read replica; only for routes that don't write
+DbReadSessionDep = Annotated[AsyncSession, Depends(db.read_session_dependency)]
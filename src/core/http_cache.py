@@ -0,0 +1,225 @@
+import hashlib
+from collections import OrderedDict
+from datetime import UTC, date
+from email.utils import format_datetime
+from typing import Annotated, Any, AsyncIterator, Awaitable, Callable
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response, StreamingResponse
+
+from src.core.compression import gzip_etag
+from src.core.config import settings
+from src.core.database import DbReadSessionDep, db
+from src.core.listing import json_rows
+from src.core.models import TaxExemption, TaxRate
+from src.core.responses import TrustedJSONResponse
+from src.core.tax_snapshot import (
+    TableVersion,
+    TaxSnapshot,
+    read_table_stamp,
+    tax_snapshot_cache,
+)
+
+# Streamed bodies larger than this are sent but not cached
+MAX_CACHED_BODY_SIZE = 1024 * 1024
+
+
+class BodyCache:
+    """
+    Bounded LRU cache of encoded response bodies by ETag.
+
+    An ETag changes with the data of the response, so a body cached under the
+    ETag of the data it was read from is never stale; bodies of data that has
+    changed are simply no longer asked for and eventually evicted.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    def get(self, etag: str) -> bytes | None:
+        body = self._entries.get(etag)
+        if body is not None:
+            self._entries.move_to_end(etag)
+        return body
+
+    def put(self, etag: str, body: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[etag] = body
+        self._entries.move_to_end(etag)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+body_cache = BodyCache(maxsize=settings.http.body_cache_size)
+
+
+class CachedResource:
+    """
+    Cache headers of a response, and its body if it was sent before.
+
+    The ETag comes from the tax snapshot, but bodies are read from the
+    database, possibly from a replica behind or ahead of the snapshot. A body
+    is only cached if its table had the number of rows and last modification
+    of the ETag's version both before and after it was read, in the same
+    session; replicas only move forward and every write changes one or the
+    other (see `read_table_stamp`), so the body was read at that version.
+    Both checks are a single aggregate query, so they don't grow with the
+    table the way reading it whole would.
+
+    `If-None-Match: *` matches any current representation, so it is only
+    answered with `304 Not Modified` once the resource is known to exist.
+    """
+
+    def __init__(
+        self,
+        headers: dict[str, str],
+        model: type[TaxRate] | type[TaxExemption],
+        version: TableVersion,
+        match_any: bool = False,
+    ):
+        self.headers = headers
+        self.etag = headers["ETag"]
+        self.model = model
+        self.version = version
+        self.match_any = match_any
+
+    def _not_modified(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+
+    async def _is_current(self, session: AsyncSession) -> bool:
+        if body_cache.maxsize <= 0:
+            return False
+        return await read_table_stamp(session, self.model) == self.version.stamp
+
+    def cached_response(self) -> Response | None:
+        """
+        Get the response from the cached body, if there is one.
+        """
+        body = body_cache.get(self.etag)
+        if body is None:
+            return None
+        if self.match_any:
+            return self._not_modified()
+        return Response(body, headers=self.headers, media_type="application/json")
+
+    async def json_response(
+        self, session: AsyncSession, read: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        """
+        Read the content with the session and encode it without validating
+        it, and cache the body if it was read at the version of the ETag.
+        `read` raises if the resource doesn't exist.
+        """
+        cacheable = await self._is_current(session)
+        content = await read()
+        if self.match_any:
+            return self._not_modified()
+        response = TrustedJSONResponse(content, headers=self.headers)
+        if cacheable and await self._is_current(session):
+            body_cache.put(self.etag, bytes(response.body))
+        return response
+
+    def streaming_response(self, query: Select) -> Response:
+        """
+        Stream the rows of a query as a JSON list, and cache the body once
+        complete if it was read at the version of the ETag and isn't too
+        large.
+        """
+        # A list exists even when it is empty
+        if self.match_any:
+            return self._not_modified()
+
+        async def stream() -> AsyncIterator[bytes]:
+            async with db.read_session() as session:
+                cacheable = await self._is_current(session)
+                captured: list[bytes] = []
+                size = 0
+                async for chunk in json_rows(session, query):
+                    size += len(chunk)
+                    if cacheable and size <= MAX_CACHED_BODY_SIZE:
+                        captured.append(chunk)
+                    yield chunk
+                if (
+                    cacheable
+                    and size <= MAX_CACHED_BODY_SIZE
+                    and await self._is_current(session)
+                ):
+                    body_cache.put(self.etag, b"".join(captured))
+
+        return StreamingResponse(
+            stream(), headers=self.headers, media_type="application/json"
+        )
+
+
+def _etag_tags(if_none_match: str) -> set[str]:
+    # If-None-Match uses the weak comparison, which ignores the W/ prefix
+    return {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def conditional_get(
+    model: type[TaxRate] | type[TaxExemption],
+    table_version: Callable[[TaxSnapshot], TableVersion],
+) -> Callable[..., object]:
+    """
+    Make a dependency that answers `304 Not Modified` when the client already
+    has the current response, and otherwise gets its cache headers and cached
+    body. `If-None-Match: *` is left to the route, which first finds out
+    whether the resource exists.
+
+    The ETag is derived from the version of the table, from the tax snapshot
+    held in memory, and from the URL, so a revalidation that matches doesn't
+    touch the database. Changes made by other processes are noticed once the
+    snapshot is reloaded, as for calculations.
+
+    Args:
+        model: Model of the table the responses are read from
+        table_version: Version of that table in a snapshot
+
+    Returns:
+        Dependency returning the cached resource, through which the route
+        responds
+    """
+
+    async def dependency(request: Request, session: DbReadSessionDep) -> CachedResource:
+        version = table_version(await tax_snapshot_cache.get(session))
+        tag = hashlib.blake2b(digest_size=16)
+        tag.update(version.digest.encode())
+        tag.update(request.url.path.encode())
+        tag.update(str(sorted(request.query_params.multi_items())).encode())
+        # Lookups by code default to the rates in force today
+        tag.update(date.today().isoformat().encode())
+        headers = {
+            # `CompressionMiddleware` suffixes it when it gzips the response
+            "ETag": f'"{tag.hexdigest()}"',
+            "Cache-Control": settings.http.cache_control,
+        }
+        if version.modified_at is not None:
+            headers["Last-Modified"] = format_datetime(
+                version.modified_at.replace(tzinfo=UTC), usegmt=True
+            )
+
+        tags = _etag_tags(request.headers.get("if-none-match", ""))
+        # The gzipped representation has the same data
+        if headers["ETag"] in tags or gzip_etag(headers["ETag"]) in tags:
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        return CachedResource(headers, model, version, match_any="*" in tags)
+
+    return dependency
+
+
+TaxRatesCacheDep = Annotated[
+    CachedResource,
+    Depends(conditional_get(TaxRate, lambda snapshot: snapshot.rates_version)),
+]
+TaxExemptionsCacheDep = Annotated[
+    CachedResource,
+    Depends(
+        conditional_get(TaxExemption, lambda snapshot: snapshot.exemptions_version)
+    ),
+]
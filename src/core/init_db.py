@@ -1,128 +1,219 @@
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.v1.taxes.schemas import TaxRateType
-from src.core.models import TaxRate, TaxExemption
+from src.core.models import SeedVersion, TaxRate, TaxExemption
 
 logger = logging.getLogger(__name__)
 
+# Bump when default tax rates or exemptions are added, and list the new ones
+# with the new version, to add them to databases seeded before on startup.
+# Changed defaults aren't applied, so they don't overwrite what users entered.
+SEED_VERSION = 1
 
-async def init_tax_rates(session: AsyncSession) -> None:
+# Version of the default data of databases seeded before the version was
+# recorded
+UNRECORDED_SEED_VERSION = 1
+
+
+async def init_tax_rates(session: AsyncSession, seeded_version: int = 0) -> None:
     """
-    Initialize tax rates in the database if they don't exist.
+    Add the default tax rates introduced after `seeded_version` to the
+    session, except those with codes that already have tax rates.
     """
-    existing_rates = (await session.scalars(select(TaxRate))).all()
-    if existing_rates:
-        return
-
+    # Version of the default data that introduced each tax rate
     tax_rates = [
-        TaxRate(
-            name="Social Fund (Private Sector, Higher Education, Medical Institutions)",
-            type=TaxRateType.social_fund,
-            code="social_fund",
-            rate=0.24,
-            description="Social fund contribution (24%) for private sector, higher education, and medical institutions",
+        (
+            1,
+            TaxRate(
+                name="Social Fund (Private Sector, Higher Education, Medical Institutions)",
+                type=TaxRateType.social_fund,
+                code="social_fund",
+                rate=0.24,
+                description="Social fund contribution (24%) for private sector, higher education, and medical institutions",
+            ),
         ),
-        TaxRate(
-            name="Social Fund (Public Institutions)",
-            type=TaxRateType.social_fund,
-            code="social_fund_29",
-            rate=0.29,
-            description="Social fund contribution (29%) for budgetary/public institutions",
+        (
+            1,
+            TaxRate(
+                name="Social Fund (Public Institutions)",
+                type=TaxRateType.social_fund,
+                code="social_fund_29",
+                rate=0.29,
+                description="Social fund contribution (29%) for budgetary/public institutions",
+            ),
         ),
-        TaxRate(
-            name="Special Conditions (Private Sector, Higher Education, Medical Institutions)",
-            type=TaxRateType.social_fund,
-            code="social_fund_32",
-            rate=0.32,
-            description="Social fund contribution (32%) for special conditions in private sector, higher education, and medical institutions",
+        (
+            1,
+            TaxRate(
+                name="Special Conditions (Private Sector, Higher Education, Medical Institutions)",
+                type=TaxRateType.social_fund,
+                code="social_fund_32",
+                rate=0.32,
+                description="Social fund contribution (32%) for special conditions in private sector, higher education, and medical institutions",
+            ),
         ),
-        TaxRate(
-            name="Special Conditions (Public Institutions)",
-            type=TaxRateType.social_fund,
-            code="social_fund_39",
-            rate=0.39,
-            description="Social fund contribution (39%) for special conditions in budgetary/public institutions",
+        (
+            1,
+            TaxRate(
+                name="Special Conditions (Public Institutions)",
+                type=TaxRateType.social_fund,
+                code="social_fund_39",
+                rate=0.39,
+                description="Social fund contribution (39%) for special conditions in budgetary/public institutions",
+            ),
         ),
-        TaxRate(
-            name="Medical Insurance",
-            type=TaxRateType.medical_insurance,
-            code="medical_insurance",
-            rate=0.09,
-            description="Medical insurance contribution (9%)",
+        (
+            1,
+            TaxRate(
+                name="Medical Insurance",
+                type=TaxRateType.medical_insurance,
+                code="medical_insurance",
+                rate=0.09,
+                description="Medical insurance contribution (9%)",
+            ),
         ),
-        TaxRate(
-            name="Income Tax",
-            type=TaxRateType.income_tax,
-            code="income_tax",
-            rate=0.12,
-            description="Income tax (12%)",
+        (
+            1,
+            TaxRate(
+                name="Income Tax",
+                type=TaxRateType.income_tax,
+                code="income_tax",
+                rate=0.12,
+                description="Income tax (12%)",
+            ),
         ),
     ]
 
-    session.add_all(tax_rates)
-    await session.commit()
-
-    logger.info("Default tax rates initialized.")
+    new = [tax_rate for since, tax_rate in tax_rates if since > seeded_version]
+    if not new:
+        return
+    existing_codes = set(
+        await session.scalars(
+            select(TaxRate.code).where(TaxRate.code.in_([rate.code for rate in new]))
+        )
+    )
+    missing = [tax_rate for tax_rate in new if tax_rate.code not in existing_codes]
+    session.add_all(missing)
+    if missing:
+        logger.info("%d default tax rates added.", len(missing))
 
 
-async def init_tax_exemptions(session: AsyncSession) -> None:
+async def init_tax_exemptions(session: AsyncSession, seeded_version: int = 0) -> None:
     """
-    Initialize tax exemptions in the database if they don't exist.
+    Add the default tax exemptions introduced after `seeded_version` to the
+    session, except those with codes that already have tax exemptions.
     """
-    existing_exemptions = (await session.scalars(select(TaxExemption))).all()
-    if existing_exemptions:
-        return
-
+    # Version of the default data that introduced each tax exemption
     tax_exemptions = [
-        TaxExemption(
-            name="Scutirea personala",
-            code="personal",
-            annual_amount=29700,
-            monthly_amount=2475,
-            description="Personal exemption",
+        (
+            1,
+            TaxExemption(
+                name="Scutirea personala",
+                code="personal",
+                annual_amount=29700,
+                monthly_amount=2475,
+                description="Personal exemption",
+            ),
         ),
-        TaxExemption(
-            name="Scutirea personala majorata",
-            code="personal_increased",
-            annual_amount=34620,
-            monthly_amount=2885,
-            description="Increased personal exemption",
+        (
+            1,
+            TaxExemption(
+                name="Scutirea personala majorata",
+                code="personal_increased",
+                annual_amount=34620,
+                monthly_amount=2885,
+                description="Increased personal exemption",
+            ),
         ),
-        TaxExemption(
-            name="Scutirea acordata sotiei (sotului) majorata",
-            code="spouse_increased",
-            annual_amount=21780,
-            monthly_amount=1815,
-            description="Increased spouse exemption",
+        (
+            1,
+            TaxExemption(
+                name="Scutirea acordata sotiei (sotului) majorata",
+                code="spouse_increased",
+                annual_amount=21780,
+                monthly_amount=1815,
+                description="Increased spouse exemption",
+            ),
         ),
-        TaxExemption(
-            name="Scutirea pentru pers. intretinute cu except. pers. cu dizabilitati",
-            code="dependent",
-            annual_amount=9900,
-            monthly_amount=825,
-            description="Exemption for dependents except those with disabilities",
+        (
+            1,
+            TaxExemption(
+                name="Scutirea pentru pers. intretinute cu except. pers. cu dizabilitati",
+                code="dependent",
+                annual_amount=9900,
+                monthly_amount=825,
+                description="Exemption for dependents except those with disabilities",
+            ),
         ),
-        TaxExemption(
-            name="Scutirea pentru pers. intretinute cu dizabilitati",
-            code="dependent_disabled",
-            annual_amount=21780,
-            monthly_amount=1815,
-            description="Exemption for dependents with disabilities from birth or childhood",
+        (
+            1,
+            TaxExemption(
+                name="Scutirea pentru pers. intretinute cu dizabilitati",
+                code="dependent_disabled",
+                annual_amount=21780,
+                monthly_amount=1815,
+                description="Exemption for dependents with disabilities from birth or childhood",
+            ),
         ),
     ]
 
-    session.add_all(tax_exemptions)
-    await session.commit()
-
-    logger.info("Default tax exemptions initialized.")
+    new = [
+        tax_exemption
+        for since, tax_exemption in tax_exemptions
+        if since > seeded_version
+    ]
+    if not new:
+        return
+    existing_codes = set(
+        await session.scalars(
+            select(TaxExemption.code).where(
+                TaxExemption.code.in_([exemption.code for exemption in new])
+            )
+        )
+    )
+    missing = [
+        tax_exemption
+        for tax_exemption in new
+        if tax_exemption.code not in existing_codes
+    ]
+    session.add_all(missing)
+    if missing:
+        logger.info("%d default tax exemptions added.", len(missing))
 
 
 async def init_db(db: AsyncSession):
     """
     Initialize the database with default data.
+
+    Once seeded, the database records `SEED_VERSION`, and later startups only
+    read that until `SEED_VERSION` is bumped; then only the defaults
+    introduced since are added. A database with tax rates or exemptions but
+    no recorded version was seeded before versions were recorded, with the
+    defaults of `UNRECORDED_SEED_VERSION`, so defaults its users deleted
+    aren't added again. The default data and the version are committed
+    together, so when instances start at the same time, only one of them
+    seeds.
     """
-    await init_tax_rates(db)
-    await init_tax_exemptions(db)
+    seeded_version = await db.scalar(select(func.max(SeedVersion.version)))
+    if seeded_version is not None and seeded_version >= SEED_VERSION:
+        return
+    if seeded_version is None and (
+        await db.scalar(select(TaxRate.id).limit(1)) is not None
+        or await db.scalar(select(TaxExemption.id).limit(1)) is not None
+    ):
+        seeded_version = UNRECORDED_SEED_VERSION
+
+    await init_tax_rates(db, seeded_version or 0)
+    await init_tax_exemptions(db, seeded_version or 0)
+    db.add(SeedVersion(version=SEED_VERSION))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        logger.info("Database was seeded by another instance.")
+        return
+    logger.info("Database seeded with version %d.", SEED_VERSION)
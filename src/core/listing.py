@@ -0,0 +1,60 @@
+from typing import AsyncIterator, Iterable
+
+from pydantic_core import to_json
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.models import TaxExemption, TaxRate
+
+# Rows fetched from the server-side cursor and encoded at a time
+STREAM_CHUNK_SIZE = 500
+
+
+def keyset_query(
+    model: type[TaxRate] | type[TaxExemption],
+    fields: Iterable[str] | None,
+    after: int | None,
+    limit: int,
+) -> Select:
+    """
+    Build the query of one page of rows ordered by ID.
+
+    Args:
+        model: Model of the rows
+        fields: Names of the columns to select, all by default; the ID is
+            always selected
+        after: ID of the last row of the previous page
+        limit: Maximum number of rows
+
+    Returns:
+        Query to which filters can still be added
+    """
+    names = ["id", *(name for name in fields if name != "id")] if fields else None
+    columns = (
+        [getattr(model, name) for name in names]
+        if names is not None
+        else list(model.__table__.columns)
+    )
+    query = select(*columns).order_by(model.id).limit(limit)
+    if after is not None:
+        query = query.where(model.id > after)
+    return query
+
+
+async def json_rows(session: AsyncSession, query: Select) -> AsyncIterator[bytes]:
+    """
+    Encode the rows of a query as a JSON list, chunk by chunk as they are
+    fetched from a server-side cursor.
+
+    Rows are encoded as they come from the database, without loading ORM
+    objects or validating them against a response model, so memory use does
+    not grow with the number of rows. The session has to stay open until the
+    last row has been sent, so it can't come from a dependency.
+    """
+    result = await session.stream(query)
+    separator = b"["
+    async for rows in result.mappings().partitions(STREAM_CHUNK_SIZE):
+        # Encoded as a list at once, without its brackets
+        yield separator + to_json([dict(row) for row in rows])[1:-1]
+        separator = b","
+    yield b"]" if separator == b"," else b"[]"
@@ -0,0 +1,43 @@
+import asyncio
+import logging
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import Connection, pool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _current_revisions(connection: Connection) -> set[str]:
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+async def _get_current_revisions() -> set[str]:
+    engine = create_async_engine(str(settings.db.url), poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            return await connection.run_sync(_current_revisions)
+    finally:
+        await engine.dispose()
+
+
+def upgrade_schema() -> None:
+    """
+    Migrate the database to the latest revision, unless it is already there.
+
+    Checking the revision only reads the migration scripts and the
+    `alembic_version` table, which is much cheaper than a full
+    `alembic upgrade head` run on every start.
+    """
+    config = Config(settings.base_dir / "alembic.ini")
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    if asyncio.run(_get_current_revisions()) == heads:
+        logger.info("Database schema is up to date.")
+        return
+    logger.info("Migrating the database schema...")
+    command.upgrade(config, "head")
@@ -1,5 +1,14 @@
 from .base import Base
 from .tax_rate import TaxRate
 from .tax_exemption import TaxExemption
+from .seed_version import SeedVersion
+from .payroll_job import PayrollJob, PayrollJobResult
 
-__all__ = ["Base", "TaxRate", "TaxExemption"]
+__all__ = [
+    "Base",
+    "TaxRate",
+    "TaxExemption",
+    "SeedVersion",
+    "PayrollJob",
+    "PayrollJobResult",
+]
@@ -0,0 +1,65 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import ColumnElement, Date, Dialect, TypeDecorator, and_, or_, true
+from sqlalchemy.orm import Mapped, mapped_column
+
+# Stored for an unset `valid_from`; the earliest day MySQL supports in DATE
+# columns
+EVER_SINCE = date(1000, 1, 1)
+
+# Fields of the validity period, which an update may set to None
+PERIOD_FIELDS = frozenset({"valid_from", "valid_to"})
+
+
+class PeriodStart(TypeDecorator[date]):
+    """
+    First day of a validity period, None for ever since.
+
+    Stored as `EVER_SINCE` rather than NULL, since unique indexes treat NULLs
+    as distinct and wouldn't keep a code from having two periods without a
+    start.
+    """
+
+    impl = Date
+    cache_ok = True
+
+    def process_bind_param(self, value: date | None, dialect: Dialect) -> date:
+        return EVER_SINCE if value is None else value
+
+    def process_result_value(self, value: date | None, dialect: Dialect) -> date | None:
+        return None if value == EVER_SINCE else value
+
+
+class EffectiveDatedMixin:
+    """
+    Validity period of a row: in force from `valid_from` through `valid_to`
+    inclusive, an unset end being open.
+    """
+
+    valid_from: Mapped[Optional[date]] = mapped_column(PeriodStart, nullable=False)
+    valid_to: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+
+    @classmethod
+    def in_force(cls, as_of: date | ColumnElement[date]) -> ColumnElement[bool]:
+        """
+        Filter for rows in force on `as_of`, a day or a bound parameter.
+        """
+        return and_(
+            cls.valid_from <= as_of,
+            or_(cls.valid_to.is_(None), cls.valid_to >= as_of),
+        )
+
+    @classmethod
+    def overlapping(
+        cls, valid_from: date | None, valid_to: date | None
+    ) -> ColumnElement[bool]:
+        """
+        Filter for rows whose validity period overlaps the given one.
+        """
+        conditions = []
+        if valid_to is not None:
+            conditions.append(cls.valid_from <= valid_to)
+        if valid_from is not None:
+            conditions.append(or_(cls.valid_to.is_(None), cls.valid_to >= valid_from))
+        return and_(true(), *conditions)
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import ForeignKey, LargeBinary, String, Text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.models import Base
+
+
+class PayrollJob(Base):
+    """
+    Payroll job submitted to `POST /api/v1/jobs/payroll`, stored so that
+    every worker can report on it, not only the one running it.
+
+    Times are in UTC.
+    """
+
+    __tablename__ = "payroll_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    state: Mapped[str] = mapped_column(String(16), nullable=False)
+    engine: Mapped[str] = mapped_column(String(16), nullable=False)
+    total: Mapped[int] = mapped_column(nullable=False)
+    processed: Mapped[int] = mapped_column(nullable=False, default=0)
+    # Set by a worker that isn't running the job, which stops after its
+    # current chunk
+    cancel_requested: Mapped[bool] = mapped_column(nullable=False, default=False)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    # Finished jobs and their results are deleted after this time
+    expires_at: Mapped[Optional[datetime]] = mapped_column(nullable=True, index=True)
+
+
+class PayrollJobResult(Base):
+    """
+    Results of one chunk of a payroll job, encoded as a JSON list.
+    """
+
+    __tablename__ = "payroll_job_results"
+
+    job_id: Mapped[str] = mapped_column(
+        ForeignKey("payroll_jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    chunk: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    data: Mapped[bytes] = mapped_column(
+        LargeBinary().with_variant(mysql.LONGBLOB(), "mysql", "mariadb"),
+        nullable=False,
+    )
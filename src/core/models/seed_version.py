@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.models import Base
+
+
+class SeedVersion(Base):
+    """
+    Version of the default data a database was seeded with, so that startup
+    knows whether to seed without scanning the seeded tables.
+    """
+
+    __tablename__ = "seed_versions"
+
+    version: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
@@ -1,20 +1,23 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Float, func
+from sqlalchemy import String, Float, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.core.models import Base
+from src.core.models.mixins import EffectiveDatedMixin
 
 
-class TaxExemption(Base):
+class TaxExemption(EffectiveDatedMixin, Base):
     __tablename__ = "tax_exemptions"
+    # A code has one row per period it is in force, see `valid_from`
+    __table_args__ = (
+        UniqueConstraint("code", "valid_from", name="uq_tax_exemptions_code"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
-    code: Mapped[str] = mapped_column(
-        String(50), nullable=False, unique=True, index=True
-    )
+    code: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
     annual_amount: Mapped[float] = mapped_column(Float, nullable=False)
     monthly_amount: Mapped[float] = mapped_column(Float, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
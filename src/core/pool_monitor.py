@@ -0,0 +1,152 @@
+import time
+from bisect import bisect_left
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+# Upper bounds of the histogram buckets, in seconds
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+HOLD_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 300.0)
+LIFETIME_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 3600.0, 14400.0, 86400.0)
+
+
+class Histogram:
+    """
+    Counts of observed durations per bucket, with a last bucket for
+    everything above the largest bound.
+    """
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": [
+                {"le": bound, "count": count}
+                for bound, count in zip((*self.bounds, None), self.counts)
+            ],
+        }
+
+
+class MonitoredPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that reports how long checkouts wait for a connection, and
+    checkouts that time out, to the `PoolMonitor` attached to it.
+
+    SQLAlchemy has no pool event before a checkout starts waiting, so this is
+    the one statistic that can't be fed by pool events alone.
+    """
+
+    monitor: "PoolMonitor | None" = None
+
+    def connect(self) -> PoolProxiedConnection:
+        if self.monitor is None:
+            return super().connect()
+        started_at = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.monitor.checkout_timeouts += 1
+            raise
+        self.monitor.checkout_wait.observe(time.perf_counter() - started_at)
+        return connection
+
+    def recreate(self) -> "MonitoredPool":
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+class PoolMonitor:
+    """
+    Statistics of the connection pool of one engine, fed by SQLAlchemy pool
+    events.
+
+    Counters and histograms cover the lifetime of the process; checked out
+    connections and overflow in use are read from the pool when asked.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_overflow: int):
+        self.engine = engine
+        self.max_overflow = max_overflow
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.max_checked_out = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.invalidations = 0
+        self.checkout_wait = Histogram(WAIT_BUCKETS)
+        self.checkout_hold = Histogram(HOLD_BUCKETS)
+        self.connection_lifetime = Histogram(LIFETIME_BUCKETS)
+
+        pool = engine.sync_engine.pool
+        if isinstance(pool, MonitoredPool):
+            pool.monitor = self
+        target = engine.sync_engine
+        event.listen(target, "connect", self._on_connect)
+        event.listen(target, "checkout", self._on_checkout)
+        event.listen(target, "checkin", self._on_checkin)
+        event.listen(target, "invalidate", self._on_invalidate)
+        event.listen(target, "close", self._on_close)
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.connections_opened += 1
+        connection_record.info["opened_at"] = time.monotonic()
+
+    def _on_checkout(
+        self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+    ) -> None:
+        self.checkouts += 1
+        self.max_checked_out = max(
+            self.max_checked_out, self.engine.sync_engine.pool.checkedout()
+        )
+        connection_record.info["checked_out_at"] = time.monotonic()
+
+    def _on_checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            self.checkout_hold.observe(time.monotonic() - checked_out_at)
+
+    def _on_invalidate(
+        self, dbapi_connection: Any, connection_record: Any, exception: Any
+    ) -> None:
+        self.invalidations += 1
+
+    def _on_close(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.connections_closed += 1
+        opened_at = connection_record.info.get("opened_at")
+        if opened_at is not None:
+            self.connection_lifetime.observe(time.monotonic() - opened_at)
+
+    def stats(self) -> dict[str, Any]:
+        pool = self.engine.sync_engine.pool
+        assert isinstance(pool, AsyncAdaptedQueuePool)
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": self.max_overflow,
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # Negative while fewer than `pool_size` connections are open
+            "overflow": max(0, pool.overflow()),
+            "max_checked_out": self.max_checked_out,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "connections_opened": self.connections_opened,
+            "connections_closed": self.connections_closed,
+            "invalidations": self.invalidations,
+            "checkout_wait": self.checkout_wait.stats(),
+            "checkout_hold": self.checkout_hold.stats(),
+            "connection_lifetime": self.connection_lifetime.stats(),
+        }
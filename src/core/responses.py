@@ -0,0 +1,18 @@
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+
+class TrustedJSONResponse(JSONResponse):
+    """
+    JSON response for content built by the application itself, encoded
+    straight to bytes by pydantic's serializer.
+
+    Routes opt in by returning it, which skips the validation of the content
+    against their `response_model`; the content must already have the shape
+    of that model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -0,0 +1,128 @@
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Protocol
+
+if TYPE_CHECKING:
+    from src.core.tax_snapshot import ExemptionEntry, RateEntry
+
+
+class EffectiveDated(Protocol):
+    code: str
+    valid_from: date | None
+    valid_to: date | None
+
+
+@dataclass(frozen=True, slots=True)
+class IntervalIndex[T: EffectiveDated]:
+    """
+    Versions of one code ordered by the date they take effect, for finding the
+    version in force on a given day by binary search.
+
+    A version is in force from `valid_from` (or ever since, if unset) through
+    `valid_to` inclusive (or from then on, if unset).
+    """
+
+    starts: tuple[date, ...]
+    versions: tuple[T, ...]
+
+    @classmethod
+    def build(cls, versions: Iterable[T]) -> "IntervalIndex[T]":
+        ordered = sorted(versions, key=lambda version: version.valid_from or date.min)
+        return cls(
+            starts=tuple(version.valid_from or date.min for version in ordered),
+            versions=tuple(ordered),
+        )
+
+    def at(self, day: date) -> T | None:
+        position = bisect_right(self.starts, day) - 1
+        if position < 0:
+            return None
+        version = self.versions[position]
+        if version.valid_to is not None and day > version.valid_to:
+            return None
+        return version
+
+
+def _index_by_code[T: EffectiveDated](
+    versions: Iterable[T],
+) -> dict[str, IntervalIndex[T]]:
+    by_code: dict[str, list[T]] = {}
+    for version in versions:
+        by_code.setdefault(version.code, []).append(version)
+    return {code: IntervalIndex.build(group) for code, group in by_code.items()}
+
+
+@dataclass(frozen=True, slots=True)
+class TaxHistory:
+    """
+    All versions of all tax rates and tax exemptions, indexed per code.
+    """
+
+    rates: dict[str, IntervalIndex["RateEntry"]]
+    exemptions: dict[str, IntervalIndex["ExemptionEntry"]]
+    # Code of every tax rate version, by ID
+    rate_codes: dict[int, str]
+
+    @classmethod
+    def build(
+        cls, rates: Iterable["RateEntry"], exemptions: Iterable["ExemptionEntry"]
+    ) -> "TaxHistory":
+        rates = list(rates)
+        return cls(
+            rates=_index_by_code(rates),
+            exemptions=_index_by_code(exemptions),
+            rate_codes={rate.id: rate.code for rate in rates},
+        )
+
+    def with_changes(
+        self,
+        rate_changes: Mapping[int, Mapping[str, Any]],
+        exemption_changes: Mapping[int, Mapping[str, Any]],
+    ) -> "TaxHistory":
+        """
+        Get a copy with some versions changed, e.g. `{rate_id: {"rate": 0.1}}`.
+
+        Raises:
+            ValueError: If a version to change does not exist
+        """
+        rates = [rate for index in self.rates.values() for rate in index.versions]
+        exemptions = [
+            exemption
+            for index in self.exemptions.values()
+            for exemption in index.versions
+        ]
+        unknown_rates = set(rate_changes) - {rate.id for rate in rates}
+        if unknown_rates:
+            raise ValueError(f"Unknown tax rate IDs: {sorted(unknown_rates)}")
+        unknown_exemptions = set(exemption_changes) - {
+            exemption.id for exemption in exemptions
+        }
+        if unknown_exemptions:
+            raise ValueError(f"Unknown tax exemption IDs: {sorted(unknown_exemptions)}")
+
+        return TaxHistory.build(
+            (replace(rate, **rate_changes.get(rate.id, {})) for rate in rates),
+            (
+                replace(exemption, **exemption_changes.get(exemption.id, {}))
+                for exemption in exemptions
+            ),
+        )
+
+    def rates_at(self, day: date) -> list["RateEntry"]:
+        """
+        Get the version of every tax rate in force on `day`.
+        """
+        return [
+            rate for index in self.rates.values() if (rate := index.at(day)) is not None
+        ]
+
+    def exemptions_at(self, day: date) -> list["ExemptionEntry"]:
+        """
+        Get the version of every tax exemption in force on `day`.
+        """
+        return [
+            exemption
+            for index in self.exemptions.values()
+            if (exemption := index.at(day)) is not None
+        ]
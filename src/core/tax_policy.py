@@ -0,0 +1,276 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from datetime import date
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+if TYPE_CHECKING:
+    from src.core.tax_history import TaxHistory
+    from src.core.tax_snapshot import ExemptionEntry, RateEntry
+
+
+@dataclass(frozen=True, slots=True)
+class ExemptionRule:
+    """
+    Binds a tax exemption to the calculation parameter that applies it.
+
+    The parameter is either a flag or a count; the exemption's monthly amount
+    is multiplied by its value. Of the rules sharing a `group`, only the first
+    one whose parameter is set applies.
+    """
+
+    code: str
+    parameter: str
+    group: str | None = None
+
+
+# Policies of other days kept by a policy, least recently used first out;
+# enough for the monthly `as_of` dates of a two-year audit
+AS_OF_CACHE_SIZE = 32
+
+# Amounts are summed in this order
+EXEMPTION_RULES: tuple[ExemptionRule, ...] = (
+    ExemptionRule("personal_increased", "use_increased_personal_exemption", "personal"),
+    ExemptionRule("personal", "use_personal_exemption", "personal"),
+    ExemptionRule("spouse_increased", "use_increased_spouse_exemption"),
+    ExemptionRule("dependent", "dependent_count"),
+    ExemptionRule("dependent_disabled", "disabled_dependent_count"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PolicyExemption:
+    code: str
+    parameter: str
+    monthly_amount: float
+    annual_amount: float
+
+
+@dataclass(frozen=True, slots=True)
+class TaxPolicy:
+    """
+    Tax rates and exemptions in force on one day, compiled for calculation.
+
+    Holds plain floats only, so calculations need neither ORM objects nor
+    database access and the policy can be pickled to other processes. A policy
+    compiled with the tax history also gives the policy of any other day.
+    """
+
+    version: int
+    income_tax_rate: float
+    medical_insurance_rate: float
+    default_social_fund_rate: float
+    social_fund_rates: dict[int, float]
+    social_fund_ids: dict[str, int]
+    # Groups of mutually exclusive exemptions, in rule order
+    exemptions: tuple[tuple[PolicyExemption, ...], ...]
+    as_of: date | None = None
+    history: "TaxHistory | None" = field(default=None, compare=False, repr=False)
+    # Policies of other days, compiled on first use
+    _policies: OrderedDict[date, "TaxPolicy"] = field(
+        default_factory=OrderedDict, compare=False, repr=False
+    )
+
+    def __getstate__(self) -> list[Any]:
+        # Policies of other days are compiled again where they are needed
+        # rather than pickled along, e.g. to worker processes
+        return [
+            OrderedDict() if item.name == "_policies" else getattr(self, item.name)
+            for item in fields(self)
+        ]
+
+    def __setstate__(self, state: list[Any]) -> None:
+        for item, value in zip(fields(self), state):
+            object.__setattr__(self, item.name, value)
+
+    @classmethod
+    def compile(
+        cls,
+        version: int,
+        rates: Iterable["RateEntry"],
+        exemptions: Iterable["ExemptionEntry"],
+        rules: Sequence[ExemptionRule] = EXEMPTION_RULES,
+        as_of: date | None = None,
+        history: "TaxHistory | None" = None,
+    ) -> "TaxPolicy":
+        """
+        Compile tax rates and exemptions into a policy.
+
+        Args:
+            version: Version of the data the policy is compiled from
+            rates: Tax rates, one version per code
+            exemptions: Tax exemptions, one version per code
+            rules: Exemption rules; exemptions without a rule are not applied
+            as_of: Day the rates and exemptions are in force
+            history: All versions of the rates and exemptions; social fund
+                rates are then found by the ID of any version of their code
+
+        Returns:
+            Tax policy
+        """
+        rates = list(rates)
+        rates_by_code = {rate.code: rate for rate in rates}
+        exemptions_by_code = {exemption.code: exemption for exemption in exemptions}
+
+        # The default rate of each tax rate type is the one coded as the type
+        def default_rate(rate_type: str) -> float:
+            rate = rates_by_code.get(rate_type)
+            return rate.rate if rate is not None else 0.0
+
+        groups: list[list[PolicyExemption]] = []
+        previous_group: str | None = None
+        for rule in rules:
+            exemption = exemptions_by_code.get(rule.code)
+            compiled = PolicyExemption(
+                code=rule.code,
+                parameter=rule.parameter,
+                # A missing exemption still takes its place in its group
+                monthly_amount=exemption.monthly_amount if exemption else 0.0,
+                annual_amount=exemption.annual_amount if exemption else 0.0,
+            )
+            if rule.group is not None and rule.group == previous_group:
+                groups[-1].append(compiled)
+            else:
+                groups.append([compiled])
+            previous_group = rule.group
+
+        social_fund = [rate for rate in rates if rate.type == "social_fund"]
+        social_fund_rates = {rate.id: rate.rate for rate in social_fund}
+        if history is not None:
+            social_fund_by_code = {rate.code: rate.rate for rate in social_fund}
+            social_fund_rates = {
+                rate_id: social_fund_by_code[code]
+                for rate_id, code in history.rate_codes.items()
+                if code in social_fund_by_code
+            }
+
+        return cls(
+            version=version,
+            income_tax_rate=default_rate("income_tax"),
+            medical_insurance_rate=default_rate("medical_insurance"),
+            default_social_fund_rate=default_rate("social_fund"),
+            social_fund_rates=social_fund_rates,
+            social_fund_ids={rate.code: rate.id for rate in social_fund},
+            exemptions=tuple(tuple(group) for group in groups),
+            as_of=as_of,
+            history=history,
+        )
+
+    def at(self, as_of: date | None) -> "TaxPolicy":
+        """
+        Get the policy in force on `as_of`; this policy if it is None or if
+        there is no tax history.
+
+        The last `AS_OF_CACHE_SIZE` policies asked for are kept, so that any
+        number of different days can't grow memory.
+        """
+        if as_of is None or as_of == self.as_of or self.history is None:
+            return self
+        policy = self._policies.get(as_of)
+        if policy is not None:
+            self._policies.move_to_end(as_of)
+            return policy
+        policy = self._policies[as_of] = TaxPolicy.compile(
+            self.version,
+            self.history.rates_at(as_of),
+            self.history.exemptions_at(as_of),
+            as_of=as_of,
+            history=self.history,
+        )
+        if len(self._policies) > AS_OF_CACHE_SIZE:
+            self._policies.popitem(last=False)
+        return policy
+
+    def with_changes(
+        self,
+        rate_changes: Mapping[int, Mapping[str, Any]],
+        exemption_changes: Mapping[int, Mapping[str, Any]],
+    ) -> "TaxPolicy":
+        """
+        Compile the policy as it would be with some tax rates and exemptions
+        changed, without changing this one.
+
+        The result keeps this policy's version, so it must not be used with
+        anything keyed by the version, such as the result cache.
+
+        Args:
+            rate_changes: Changed fields by tax rate ID
+            exemption_changes: Changed fields by tax exemption ID
+
+        Returns:
+            Tax policy with the changes applied
+
+        Raises:
+            ValueError: If the policy has no tax history, or a tax rate or
+                exemption to change does not exist
+        """
+        if self.history is None or self.as_of is None:
+            raise ValueError("Tax policy has no tax history to change")
+        history = self.history.with_changes(rate_changes, exemption_changes)
+        return TaxPolicy.compile(
+            self.version,
+            history.rates_at(self.as_of),
+            history.exemptions_at(self.as_of),
+            as_of=self.as_of,
+            history=history,
+        )
+
+    def social_fund_rate(self, social_rate_id: int | None) -> float:
+        """
+        Get a social fund rate by ID, falling back to the default social fund
+        rate if it is not found or is not a social fund rate.
+        """
+        if social_rate_id is None:
+            return self.default_social_fund_rate
+        return self.social_fund_rates.get(social_rate_id, self.default_social_fund_rate)
+
+    def medical_insurance(self, custom_medical_insurance_rate: int | None) -> float:
+        """
+        Get the medical insurance rate, preferring a custom rate in percent.
+        """
+        if custom_medical_insurance_rate is not None:
+            return custom_medical_insurance_rate / 100
+        return self.medical_insurance_rate
+
+    def exemption_amount(self, params: Any) -> float:
+        """
+        Sum up the monthly exemptions applied by calculation parameters.
+        """
+        total = 0.0
+        for group in self.exemptions:
+            for exemption in group:
+                value = getattr(params, exemption.parameter)
+                if value:
+                    total += exemption.monthly_amount * value
+                    break
+        return total
+
+    def exemption_amounts(
+        self, rows: Sequence[Any], annual: bool = False
+    ) -> NDArray[np.float64]:
+        """
+        Sum up the monthly exemptions of many calculation parameters at once.
+
+        Gives the same results as `exemption_amount` for every row, or sums up
+        the annual amounts instead if `annual` is set.
+        """
+        total = np.zeros(len(rows))
+        for group in self.exemptions:
+            amount = np.zeros(len(rows))
+            applied = np.zeros(len(rows), dtype=bool)
+            for exemption in group:
+                values = np.fromiter(
+                    (getattr(row, exemption.parameter) for row in rows),
+                    np.float64,
+                    len(rows),
+                )
+                applies = ~applied & (values != 0)
+                exemption_amount = (
+                    exemption.annual_amount if annual else exemption.monthly_amount
+                )
+                amount = np.where(applies, exemption_amount * values, amount)
+                applied |= applies
+            total = total + amount
+        return total
@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Any, Iterable
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.database import db
+from src.core.models import TaxRate, TaxExemption
+from src.core.tax_history import TaxHistory
+from src.core.tax_policy import TaxPolicy
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RateEntry:
+    id: int
+    type: str
+    code: str
+    rate: float
+    valid_from: date | None = None
+    valid_to: date | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ExemptionEntry:
+    id: int
+    code: str
+    annual_amount: float
+    monthly_amount: float
+    valid_from: date | None = None
+    valid_to: date | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class TableVersion:
+    """
+    Fingerprint of every column of every row of a table, its number of rows,
+    and the last time a row of it was created or updated.
+    """
+
+    digest: str
+    modified_at: datetime | None
+    rows: int
+
+    @property
+    def stamp(self) -> tuple[int, datetime | None]:
+        """
+        Number of rows and last modification, which `read_table_stamp` reads
+        without reading the rows.
+        """
+        return self.rows, self.modified_at
+
+
+# Rows are loaded as plain rows, skipping ORM object creation and the identity
+# map; all columns are needed for the fingerprint of the table
+_RATE_ROWS = select(*TaxRate.__table__.columns).order_by(TaxRate.id)
+_EXEMPTION_ROWS = select(*TaxExemption.__table__.columns).order_by(TaxExemption.id)
+
+
+def _load_entries[EntryT: (RateEntry, ExemptionEntry)](
+    rows: Iterable[Row[Any]], entry_type: type[EntryT]
+) -> tuple[list[EntryT], TableVersion]:
+    names = [field.name for field in fields(entry_type)]
+    digest = hashlib.blake2b(digest_size=16)
+    entries: list[EntryT] = []
+    modified_at: datetime | None = None
+    for row in rows:
+        digest.update(repr(tuple(row)).encode())
+        values = row._mapping
+        entries.append(entry_type(**{name: values[name] for name in names}))
+        updated_at = values["updated_at"]
+        if modified_at is None or updated_at > modified_at:
+            modified_at = updated_at
+    return entries, TableVersion(digest.hexdigest(), modified_at, len(entries))
+
+
+async def read_table_stamp(
+    session: AsyncSession, model: type[TaxRate] | type[TaxExemption]
+) -> tuple[int, datetime | None]:
+    """
+    Read the number of rows of a table and the last time one was created or
+    updated, as `TableVersion.stamp` of a snapshot loaded now would have
+    them, with one aggregate query.
+
+    Every write changes one or the other, except a second update within the
+    same second as the first, which `updated_at` can't tell apart.
+
+    Args:
+        session: Database session
+        model: Model of the table
+
+    Returns:
+        Number of rows and last modification
+    """
+    result = await session.execute(select(func.count(), func.max(model.updated_at)))
+    rows, modified_at = result.one()
+    return rows, modified_at
+
+
+@dataclass(frozen=True, slots=True)
+class TaxSnapshot:
+    """
+    Immutable in-memory copy of all versions of all tax rates and exemptions.
+
+    `policy` is the policy in force on the day the snapshot was loaded.
+    `rates_version` and `exemptions_version` change whenever anything in their
+    table does, names and descriptions included.
+    """
+
+    version: int
+    rates_by_id: dict[int, RateEntry]
+    exemptions_by_id: dict[int, ExemptionEntry]
+    rates_version: TableVersion
+    exemptions_version: TableVersion
+    history: TaxHistory
+    policy: TaxPolicy
+
+
+async def load_tax_snapshot(session: AsyncSession, version: int) -> TaxSnapshot:
+    """
+    Load all tax rates and tax exemptions into a snapshot.
+
+    Args:
+        session: Database session
+        version: Version number assigned to the snapshot
+
+    Returns:
+        Tax snapshot
+    """
+    rates, rates_version = _load_entries(await session.execute(_RATE_ROWS), RateEntry)
+    exemptions, exemptions_version = _load_entries(
+        await session.execute(_EXEMPTION_ROWS), ExemptionEntry
+    )
+    history = TaxHistory.build(rates, exemptions)
+    today = date.today()
+    return TaxSnapshot(
+        version=version,
+        rates_by_id={rate.id: rate for rate in rates},
+        exemptions_by_id={exemption.id: exemption for exemption in exemptions},
+        rates_version=rates_version,
+        exemptions_version=exemptions_version,
+        history=history,
+        policy=TaxPolicy.compile(
+            version,
+            history.rates_at(today),
+            history.exemptions_at(today),
+            as_of=today,
+            history=history,
+        ),
+    )
+
+
+class TaxSnapshotCache:
+    """
+    Per-process cache of the current tax snapshot.
+
+    The snapshot is dropped by `invalidate` whenever tax rates or exemptions
+    are changed through this process, and reloaded after `ttl` seconds to pick
+    up changes made by other processes. For `replica_lag` seconds after an
+    invalidation it is reloaded from the primary rather than with the given
+    session, which may be on a replica that hasn't caught up with the change.
+    """
+
+    def __init__(self, ttl: float, replica_lag: float):
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        self._primary_until = float("-inf")
+        self._snapshot: TaxSnapshot | None = None
+        # Last loaded snapshot, kept across invalidations
+        self._previous: TaxSnapshot | None = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    def _current(self) -> TaxSnapshot | None:
+        if self._snapshot is None:
+            return None
+        if time.monotonic() - self._loaded_at >= self.ttl:
+            return None
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._snapshot = None
+        self._primary_until = time.monotonic() + self.replica_lag
+
+    async def get(self, session: AsyncSession) -> TaxSnapshot:
+        snapshot = self._current()
+        if snapshot is not None:
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._current()
+            if snapshot is not None:
+                return snapshot
+
+            self._version += 1
+            version = self._version
+            if time.monotonic() < self._primary_until:
+                async with db.read_session_factory() as primary:
+                    snapshot = await load_tax_snapshot(primary, version)
+            else:
+                snapshot = await load_tax_snapshot(session, version)
+            # Unchanged data keeps its version, so that whatever is keyed by
+            # the version (result cache, calculation workers) stays valid
+            previous = self._previous
+            if (
+                previous is not None
+                and previous.policy.as_of == snapshot.policy.as_of
+                and previous.rates_version == snapshot.rates_version
+                and previous.exemptions_version == snapshot.exemptions_version
+            ):
+                snapshot = previous
+            # Don't keep a snapshot that was invalidated while it was loading
+            if version == self._version:
+                self._snapshot = snapshot
+                self._previous = snapshot
+                self._loaded_at = time.monotonic()
+                logger.debug("Tax snapshot v%d loaded.", snapshot.version)
+            return snapshot
+
+
+tax_snapshot_cache = TaxSnapshotCache(
+    ttl=settings.policy_cache.ttl, replica_lag=settings.db.replica_lag
+)
@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+from datetime import date
+from enum import StrEnum
+from itertools import batched
+from typing import Any, Sequence
+
+from sqlalchemy import Insert, func, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.models import TaxExemption, TaxRate
+
+# Rows per INSERT statement, to stay well below MySQL's max_allowed_packet
+INSERT_CHUNK_SIZE = 500
+
+# Columns that keep the value of the existing row when it is upserted
+_KEPT_COLUMNS = {"id", "created_at"}
+
+
+class UpsertStatus(StrEnum):
+    created = "created"
+    updated = "updated"
+
+
+@dataclass(slots=True)
+class _Period:
+    valid_from: date | None
+    valid_to: date | None
+    # ID of the stored row, None for rows created by this upsert
+    id: int | None
+    # Index of the item that set the period, None for stored rows
+    index: int | None
+
+
+def _overlap(first: _Period, second: _Period) -> bool:
+    return (
+        first.valid_from is None
+        or second.valid_to is None
+        or first.valid_from <= second.valid_to
+    ) and (
+        first.valid_to is None
+        or second.valid_from is None
+        or second.valid_from <= first.valid_to
+    )
+
+
+def _upsert_statement(
+    session: AsyncSession,
+    model: type[TaxRate] | type[TaxExemption],
+    rows: Sequence[dict[str, Any]],
+) -> Insert:
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        statement = sqlite.insert(model).values(rows)
+        updated = statement.excluded
+    else:
+        statement = mysql.insert(model).values(rows)
+        updated = statement.inserted
+    values = {
+        column.name: updated[column.name]
+        for column in model.__table__.columns
+        if column.name not in _KEPT_COLUMNS
+    }
+    values["updated_at"] = func.now()
+    if dialect == "sqlite":
+        return statement.on_conflict_do_update(index_elements=["id"], set_=values)
+    return statement.on_duplicate_key_update(values)
+
+
+async def upsert_effective_dated[ModelT: (TaxRate, TaxExemption)](
+    session: AsyncSession,
+    model: type[ModelT],
+    items: Sequence[tuple[int, dict[str, Any]]],
+    name: str,
+) -> tuple[dict[int, tuple[UpsertStatus, ModelT]], dict[int, str]]:
+    """
+    Create or update many effective-dated rows in the current transaction.
+
+    An item updates the row with the same code and `valid_from`, and creates a
+    new row otherwise. Items whose validity period is invalid or overlaps
+    another period of the same code, stored or given by an earlier item, are
+    not applied. All other items are written with multi-row
+    `INSERT ... ON DUPLICATE KEY UPDATE` statements keyed on the ID of the
+    updated rows.
+
+    The caller commits the transaction.
+
+    Args:
+        session: Database session
+        model: Model of the rows
+        items: Row values by item index
+        name: Name of the rows in error messages, e.g. "Tax rate"
+
+    Returns:
+        Status and row by index of the applied items, and errors by index of
+        the others
+    """
+    codes = {item["code"] for _, item in items}
+    periods: dict[str, list[_Period]] = {code: [] for code in codes}
+    # Locked until the transaction ends, so that concurrent writes of the same
+    # codes are checked one after the other
+    stored = await session.execute(
+        select(model.id, model.code, model.valid_from, model.valid_to)
+        .where(model.code.in_(codes))
+        .with_for_update()
+    )
+    for id_, code, valid_from, valid_to in stored:
+        periods[code].append(_Period(valid_from, valid_to, id_, None))
+
+    rows: list[dict[str, Any]] = []
+    statuses: dict[int, UpsertStatus] = {}
+    errors: dict[int, str] = {}
+    for index, item in items:
+        code = item["code"]
+        period = _Period(item.get("valid_from"), item.get("valid_to"), None, index)
+        if (
+            period.valid_from is not None
+            and period.valid_to is not None
+            and period.valid_to < period.valid_from
+        ):
+            errors[index] = "valid_to must not be before valid_from"
+            continue
+
+        replaced = next(
+            (
+                other
+                for other in periods[code]
+                if other.index is None and other.valid_from == period.valid_from
+            ),
+            None,
+        )
+        if any(
+            _overlap(period, other) for other in periods[code] if other is not replaced
+        ):
+            errors[index] = (
+                f"{name} with code '{code}' already exists for an overlapping period"
+            )
+            continue
+
+        if replaced is None:
+            statuses[index] = UpsertStatus.created
+        else:
+            periods[code].remove(replaced)
+            period.id = replaced.id
+            statuses[index] = UpsertStatus.updated
+        periods[code].append(period)
+        rows.append({**item, "id": period.id})
+
+    for chunk in batched(rows, INSERT_CHUNK_SIZE):
+        await session.execute(_upsert_statement(session, model, chunk))
+
+    # IDs of created rows aren't returned by multi-row inserts; every applied
+    # item is the only row of its code and `valid_from` now
+    by_period = {
+        (row.code, row.valid_from): row
+        for row in await session.scalars(
+            select(model)
+            .where(model.code.in_(codes))
+            .execution_options(populate_existing=True)
+        )
+    }
+    applied = {
+        index: (status, by_period[(item["code"], item.get("valid_from"))])
+        for index, item in items
+        if (status := statuses.get(index)) is not None
+    }
+    return applied, errors
@@ -0,0 +1,50 @@
+from functools import cache
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+@cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])  # type: ignore[valid-type]
+
+
+def validate_items[ModelT: BaseModel](
+    items: list[dict[str, Any]],
+    model: type[ModelT],
+) -> tuple[list[int], list[ModelT], dict[int, str]]:
+    """
+    Validate raw parameters one by one.
+
+    Args:
+        items: Raw parameters
+        model: Model to validate each item against
+
+    Returns:
+        Indexes of valid items, the valid items, and errors by index
+    """
+    # Validating the whole list at once is much faster; fall back to item by
+    # item validation only to find out which items are invalid.
+    try:
+        return list(range(len(items))), _list_adapter(model).validate_python(items), {}
+    except ValidationError:
+        pass
+
+    indexes: list[int] = []
+    rows: list[ModelT] = []
+    errors: dict[int, str] = {}
+    for index, item in enumerate(items):
+        try:
+            rows.append(model.model_validate(item))
+        except ValidationError as exc:
+            errors[index] = format_validation_error(exc)
+            continue
+        indexes.append(index)
+    return indexes, rows, errors
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import tempfile
+from typing import Any, Callable, Iterator
+
+# Settings are read when `src` is imported, so the test database and a
+# calculation pool without worker processes are set up first
+_directory = tempfile.mkdtemp(prefix="salary-tests-")
+os.environ["DB_URL"] = f"sqlite+aiosqlite:///{_directory}/test.db"
+os.environ["SALARY_OFFLOAD_WORKERS"] = "0"
+os.environ["DB_POOL_PREWARM"] = "1"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.app import app  # noqa: E402
+from src.core.database import db  # noqa: E402
+from src.core.http_cache import body_cache  # noqa: E402
+from src.core.models import Base  # noqa: E402
+from src.core.tax_policy import TaxPolicy  # noqa: E402
+from src.core.tax_snapshot import (  # noqa: E402
+    ExemptionEntry,
+    RateEntry,
+    tax_snapshot_cache,
+)
+
+# The default tax rates and exemptions, as seeded into an empty database
+RATES = [
+    RateEntry(1, "social_fund", "social_fund", 0.24),
+    RateEntry(2, "social_fund", "social_fund_29", 0.29),
+    RateEntry(3, "social_fund", "social_fund_32", 0.32),
+    RateEntry(4, "social_fund", "social_fund_39", 0.39),
+    RateEntry(5, "medical_insurance", "medical_insurance", 0.09),
+    RateEntry(6, "income_tax", "income_tax", 0.12),
+]
+EXEMPTIONS = [
+    ExemptionEntry(1, "personal", 29700, 2475),
+    ExemptionEntry(2, "personal_increased", 34620, 2885),
+    ExemptionEntry(3, "spouse_increased", 21780, 1815),
+    ExemptionEntry(4, "dependent", 9900, 825),
+    ExemptionEntry(5, "dependent_disabled", 21780, 1815),
+]
+
+
+async def _reset_database() -> None:
+    async with db.engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    # Pooled connections belong to the event loop that opened them
+    await db.engine.dispose()
+
+
+@pytest.fixture
+def policy() -> TaxPolicy:
+    """
+    Tax policy of the default tax rates and exemptions, without tax history.
+    """
+    return TaxPolicy.compile(1, RATES, EXEMPTIONS)
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    """
+    Client of the app on an empty database, which the app seeds with the
+    default tax rates and exemptions on startup.
+    """
+    asyncio.run(_reset_database())
+    tax_snapshot_cache.invalidate()
+    body_cache._entries.clear()
+    with TestClient(app) as client:
+        yield client
+        client.portal.call(db.engine.dispose)
+
+
+@pytest.fixture
+def run(client: TestClient) -> Callable[..., Any]:
+    """
+    Run a coroutine function in the event loop of the app, e.g. to change the
+    database behind its back.
+    """
+    return client.portal.call
@@ -0,0 +1,92 @@
+def rate(code: str, value: float, **fields) -> dict:
+    return {
+        "name": code.replace("_", " ").title(),
+        "type": "social_fund",
+        "code": code,
+        "rate": value,
+        **fields,
+    }
+
+
+def test_tax_rates_are_created_and_updated_per_item(client):
+    response = client.post(
+        "/api/v1/taxes/bulk",
+        json={
+            "items": [
+                {**rate("income_tax", 0.1), "type": "income_tax"},
+                rate("social_fund_45", 0.45),
+                rate("social_fund_bad", 2),
+                rate("social_fund_50", 0.5, valid_from="2030-01-01"),
+                rate("social_fund_50", 0.51, valid_from="2030-06-01"),
+                rate(
+                    "social_fund_60",
+                    0.6,
+                    valid_from="2030-02-01",
+                    valid_to="2030-01-01",
+                ),
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == list(range(6))
+    assert [result["status"] for result in results] == [
+        "updated",
+        "created",
+        None,
+        "created",
+        None,
+        None,
+    ]
+    assert results[0]["result"]["rate"] == 0.1
+    assert results[1]["result"]["id"] is not None
+    assert "rate" in results[2]["error"]
+    assert "overlapping period" in results[4]["error"]
+    assert results[5]["error"] == "valid_to must not be before valid_from"
+
+    codes = [tax_rate["code"] for tax_rate in client.get("/api/v1/taxes/").json()]
+    assert codes.count("social_fund_45") == 1
+    assert codes.count("social_fund_50") == 1
+    assert "social_fund_bad" not in codes and "social_fund_60" not in codes
+
+
+def test_bulk_updates_reach_calculations(client):
+    before = client.post(
+        "/api/v1/salary/calculate", params={"gross_salary": 10000}
+    ).json()
+    client.post(
+        "/api/v1/taxes/bulk",
+        json={"items": [{**rate("income_tax", 0.2), "type": "income_tax"}]},
+    )
+    after = client.post(
+        "/api/v1/salary/calculate", params={"gross_salary": 10000}
+    ).json()
+    assert after["income_tax"] > before["income_tax"]
+
+
+def test_tax_exemptions_are_upserted(client):
+    response = client.post(
+        "/api/v1/exemptions/bulk",
+        json={
+            "items": [
+                {
+                    "name": "Personal",
+                    "code": "personal",
+                    "annual_amount": 30000,
+                    "monthly_amount": 2500,
+                },
+                {
+                    "name": "Student",
+                    "code": "student",
+                    "annual_amount": 1200,
+                    "monthly_amount": 100,
+                },
+                {"name": "Broken", "code": "broken"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["updated", "created", None]
+    assert results[0]["result"]["monthly_amount"] == 2500
+    assert "annual_amount" in results[2]["error"]
@@ -0,0 +1,56 @@
+from src.core.compression import accepted_encodings, gzip_etag
+
+GZIP = {"Accept-Encoding": "gzip"}
+IDENTITY = {"Accept-Encoding": "identity"}
+# Long enough to be gzipped
+LIST_URL = "/api/v1/taxes/"
+
+
+def test_accepted_encodings_leave_out_refused_ones():
+    assert accepted_encodings("gzip, br;q=0.5") == {"gzip", "br"}
+    assert accepted_encodings("gzip;q=0, br") == {"br"}
+    assert accepted_encodings("GZIP;q=0.0") == set()
+    assert accepted_encodings("gzip;q=high") == set()
+    assert {"gzip", "br"} <= accepted_encodings("*")
+
+
+def test_gzip_etag_is_suffixed():
+    assert gzip_etag('"abc"') == '"abc-gzip"'
+
+
+def test_gzipped_response_gets_a_suffixed_etag(client):
+    plain = client.get(LIST_URL, headers=IDENTITY)
+    gzipped = client.get(LIST_URL, headers=GZIP)
+
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["ETag"] == gzip_etag(plain.headers["ETag"])
+    assert gzipped.headers["Vary"] == "Accept-Encoding"
+    assert gzipped.content == plain.content
+
+
+def test_refused_gzip_is_not_sent(client):
+    response = client.get(LIST_URL, headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in response.headers
+
+
+def test_either_etag_revalidates(client):
+    plain_etag = client.get(LIST_URL, headers=IDENTITY).headers["ETag"]
+    gzip_tag = gzip_etag(plain_etag)
+
+    revalidated = client.get(LIST_URL, headers={**GZIP, "If-None-Match": gzip_tag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == gzip_tag
+
+    revalidated = client.get(
+        LIST_URL, headers={**IDENTITY, "If-None-Match": plain_etag}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == plain_etag
+
+
+def test_small_responses_are_not_gzipped(client):
+    response = client.get("/api/v1/taxes/1", headers=GZIP)
+    assert len(response.content) < 1024
+    assert "content-encoding" not in response.headers
+    assert not response.headers["ETag"].endswith('-gzip"')
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.core.database import READ_PRIMARY_COOKIE, Database, ReadYourWritesMiddleware
+
+
+@pytest.fixture
+def database(tmp_path):
+    return Database(
+        url=f"sqlite+aiosqlite:///{tmp_path}/primary.db",
+        replica_urls=[f"sqlite+aiosqlite:///{tmp_path}/replica.db"],
+        replica_lag=5,
+    )
+
+
+@pytest.fixture
+def app(database):
+    def read_from() -> str:
+        session = database.read_session()
+        return "primary" if session.bind is database.engine else "replica"
+
+    async def read(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(read_from())
+
+    async def write(request: Request) -> PlainTextResponse:
+        async with database.session_factory() as session:
+            await session.execute(text("CREATE TABLE IF NOT EXISTS t (x INTEGER)"))
+            await session.commit()
+        return PlainTextResponse(read_from())
+
+    app = Starlette(routes=[Route("/read", read), Route("/write", write)])
+    app.add_middleware(ReadYourWritesMiddleware, database=database)
+    return app
+
+
+def test_reads_go_to_replicas(app):
+    with TestClient(app) as client:
+        response = client.get("/read")
+    assert response.text == "replica"
+    assert READ_PRIMARY_COOKIE not in response.cookies
+
+
+def test_writer_reads_its_writes_from_the_primary(app, database):
+    with TestClient(app) as client:
+        written = client.get("/write")
+        assert written.text == "primary"
+        assert "Max-Age=5" in written.headers["set-cookie"]
+        assert client.get("/read").text == "primary"
+        client.portal.call(database.engine.dispose)
+
+
+def test_other_clients_keep_reading_from_replicas(app, database):
+    with TestClient(app) as writer, TestClient(app) as reader:
+        writer.get("/write")
+        assert reader.get("/read").text == "replica"
+        writer.portal.call(database.engine.dispose)
+
+
+def test_reads_outside_requests_go_to_replicas(database):
+    session = database.read_session()
+    assert session.bind is not database.engine
+
+
+@pytest.mark.parametrize(
+    "method, rows", [("execute", [(1,)]), ("scalars", [1]), ("scalar", 1)]
+)
+def test_read_sessions_release_their_connection(database, method, rows):
+    async def read():
+        session = database.read_session_factory()
+        result = await getattr(session, method)(text("SELECT 1"))
+        checked_out = database.engine.pool.checkedout()
+        await database.engine.dispose()
+        return result, checked_out
+
+    result, checked_out = asyncio.run(read())
+    assert checked_out == 0
+    assert (result if method == "scalar" else result.all()) == rows
@@ -0,0 +1,81 @@
+import pytest
+
+INCOME_TAX = {"name": "Income Tax", "type": "income_tax", "code": "income_tax"}
+
+
+@pytest.fixture
+def income_tax_from_2030(client):
+    """
+    Raise the income tax rate from 12% to 20% from 2030 on.
+    """
+    current = client.get("/api/v1/taxes/code/income_tax").json()
+    ended = client.put(
+        f"/api/v1/taxes/{current['id']}", json={"valid_to": "2029-12-31"}
+    )
+    assert ended.status_code == 200
+    created = client.post(
+        "/api/v1/taxes/",
+        json={**INCOME_TAX, "rate": 0.2, "valid_from": "2030-01-01"},
+    )
+    assert created.status_code == 201
+    return current["id"], created.json()["id"]
+
+
+def calculate(client, **params) -> dict:
+    response = client.post(
+        "/api/v1/salary/calculate", params={"gross_salary": 10000, **params}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_rates_are_looked_up_by_day(client, income_tax_from_2030):
+    old_id, new_id = income_tax_from_2030
+    for as_of, expected_id in [("2029-12-31", old_id), ("2030-01-01", new_id)]:
+        response = client.get("/api/v1/taxes/code/income_tax", params={"as_of": as_of})
+        assert response.json()["id"] == expected_id
+
+    listed = client.get(
+        "/api/v1/taxes/", params={"as_of": "2031-01-01", "tax_type": "income_tax"}
+    )
+    assert [tax_rate["id"] for tax_rate in listed.json()] == [new_id]
+
+
+def test_calculations_use_the_rates_in_force_on_their_day(client, income_tax_from_2030):
+    before = calculate(client, as_of="2029-06-01")
+    after = calculate(client, as_of="2030-06-01")
+    assert after["income_tax"] == pytest.approx(before["income_tax"] / 0.12 * 0.2)
+
+    batch = client.post(
+        "/api/v1/salary/calculate/batch",
+        json={
+            "items": [
+                {"gross_salary": 10000, "as_of": "2029-06-01"},
+                {"gross_salary": 10000, "as_of": "2030-06-01"},
+            ]
+        },
+    )
+    assert [result["result"] for result in batch.json()["results"]] == [
+        before,
+        after,
+    ]
+
+
+def test_overlapping_periods_are_rejected(client, income_tax_from_2030):
+    response = client.post(
+        "/api/v1/taxes/",
+        json={**INCOME_TAX, "rate": 0.15, "valid_from": "2029-06-01"},
+    )
+    assert response.status_code == 400
+    assert "overlapping period" in response.json()["detail"]
+
+    response = client.post(
+        "/api/v1/taxes/",
+        json={
+            **INCOME_TAX,
+            "rate": 0.15,
+            "valid_from": "2040-02-01",
+            "valid_to": "2040-01-01",
+        },
+    )
+    assert response.status_code == 400
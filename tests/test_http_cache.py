@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from src.core.database import db
+from src.core.http_cache import body_cache
+from src.core.models import TaxRate
+from src.core.tax_snapshot import tax_snapshot_cache
+
+# Not gzipped, so that the ETag is the one bodies are cached under
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+def test_body_is_cached_under_its_etag(client):
+    first = client.get("/api/v1/taxes/1")
+    assert first.status_code == 200
+    assert body_cache.get(first.headers["ETag"]) == first.content
+
+    again = client.get("/api/v1/taxes/1")
+    assert again.content == first.content
+
+
+def test_body_read_past_the_snapshot_is_not_cached(client, run):
+    etag = client.get("/api/v1/taxes/", headers=IDENTITY).headers["ETag"]
+    body_cache._entries.clear()
+
+    async def change_behind_the_snapshot() -> None:
+        async with db.engine.begin() as connection:
+            await connection.execute(
+                update(TaxRate)
+                .where(TaxRate.id == 1)
+                .values(description="Changed", updated_at=datetime(2100, 1, 1))
+            )
+
+    run(change_behind_the_snapshot)
+    response = client.get("/api/v1/taxes/", headers=IDENTITY)
+    assert response.headers["ETag"] == etag
+    assert response.json()[0]["description"] == "Changed"
+    assert body_cache.get(etag) is None
+
+    tax_snapshot_cache.invalidate()
+    response = client.get("/api/v1/taxes/", headers=IDENTITY)
+    assert response.headers["ETag"] != etag
+    assert body_cache.get(response.headers["ETag"]) == response.content
+
+
+def test_matching_etag_is_not_modified(client):
+    etag = client.get("/api/v1/taxes/1").headers["ETag"]
+    response = client.get("/api/v1/taxes/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    weak = client.get("/api/v1/taxes/1", headers={"If-None-Match": f"W/{etag}"})
+    assert weak.status_code == 304
+
+
+def test_other_etag_gets_the_resource(client):
+    response = client.get("/api/v1/taxes/1", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.json()["id"] == 1
+
+
+def test_any_etag_matches_existing_resources(client):
+    for path in ("/api/v1/taxes/1", "/api/v1/taxes/", "/api/v1/exemptions/1"):
+        response = client.get(path, headers={"If-None-Match": "*"})
+        assert response.status_code == 304, path
+
+    # Also once the body is cached
+    client.get("/api/v1/taxes/1")
+    response = client.get("/api/v1/taxes/1", headers={"If-None-Match": "*"})
+    assert response.status_code == 304
+
+
+def test_any_etag_does_not_hide_missing_resources(client):
+    for path in (
+        "/api/v1/taxes/99999",
+        "/api/v1/taxes/code/missing",
+        "/api/v1/exemptions/99999",
+    ):
+        response = client.get(path, headers={"If-None-Match": "*"})
+        assert response.status_code == 404, path
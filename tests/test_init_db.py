@@ -0,0 +1,60 @@
+from sqlalchemy import delete, func, select
+
+from src.core import init_db as seeding
+from src.core.database import db
+from src.core.models import SeedVersion, TaxExemption, TaxRate
+
+
+async def _codes() -> set[str]:
+    async with db.session_factory() as session:
+        return set(await session.scalars(select(TaxRate.code)))
+
+
+async def _delete_income_tax(also_seed_versions: bool = False) -> None:
+    async with db.session_factory() as session:
+        await session.execute(delete(TaxRate).where(TaxRate.code == "income_tax"))
+        if also_seed_versions:
+            await session.execute(delete(SeedVersion))
+        await session.commit()
+
+
+async def _init_db() -> None:
+    async with db.session_factory() as session:
+        await seeding.init_db(session)
+
+
+async def _seeded_version() -> int | None:
+    async with db.session_factory() as session:
+        return await session.scalar(select(func.max(SeedVersion.version)))
+
+
+def test_first_start_seeds_defaults(client, run):
+    assert "income_tax" in run(_codes)
+    assert run(_seeded_version) == seeding.SEED_VERSION
+
+
+def test_database_seeded_before_versions_keeps_deleted_defaults(client, run):
+    run(_delete_income_tax, True)
+    run(_init_db)
+    assert "income_tax" not in run(_codes)
+    assert run(_seeded_version) == seeding.SEED_VERSION
+
+
+def test_bumped_version_adds_only_newer_defaults(client, run, monkeypatch):
+    run(_delete_income_tax)
+    monkeypatch.setattr(seeding, "SEED_VERSION", seeding.SEED_VERSION + 1)
+    run(_init_db)
+    assert "income_tax" not in run(_codes)
+    assert run(_seeded_version) == seeding.SEED_VERSION
+
+
+def test_empty_database_without_version_is_seeded(client, run):
+    async def empty() -> None:
+        async with db.session_factory() as session:
+            for model in (TaxRate, TaxExemption, SeedVersion):
+                await session.execute(delete(model))
+            await session.commit()
+
+    run(empty)
+    run(_init_db)
+    assert "income_tax" in run(_codes)
@@ -0,0 +1,63 @@
+import json
+
+from src.api.v1.jobs.manager import job_manager
+
+JOBS_URL = "/api/v1/jobs"
+ITEMS = [{"gross_salary": 4000 + index * 250} for index in range(5)] + [
+    {"gross_salary": "many"}
+]
+
+
+def follow(client, job_id: str) -> list[tuple[str, dict]]:
+    response = client.get(f"{JOBS_URL}/{job_id}/events")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for message in response.text.strip().split("\n\n"):
+        event, data = message.split("\n")
+        events.append(
+            (event.removeprefix("event: "), json.loads(data.removeprefix("data: ")))
+        )
+    return events
+
+
+def test_job_results_match_the_batch_endpoint(client, monkeypatch):
+    # Several chunks, the last one shorter
+    monkeypatch.setattr(job_manager, "chunk_size", 4)
+    submitted = client.post(f"{JOBS_URL}/payroll", json={"items": ITEMS})
+    assert submitted.status_code == 202
+    job = submitted.json()
+    assert job["total"] == len(ITEMS)
+
+    events = follow(client, job["id"])
+    state, status = events[-1]
+    assert state == "succeeded"
+    assert status["processed"] == len(ITEMS)
+    assert status["finished_at"] is not None
+
+    results = client.get(f"{JOBS_URL}/{job['id']}/results")
+    assert results.status_code == 200
+    batch = client.post("/api/v1/salary/calculate/batch", json={"items": ITEMS})
+    assert results.json() == batch.json()
+    assert [job["id"] for job in client.get(f"{JOBS_URL}/").json()] == [job["id"]]
+
+
+def test_discarded_jobs_are_gone(client):
+    job = client.post(f"{JOBS_URL}/payroll", json={"items": ITEMS}).json()
+    follow(client, job["id"])
+
+    deleted = client.delete(f"{JOBS_URL}/{job['id']}")
+    assert deleted.status_code == 200
+    assert client.get(f"{JOBS_URL}/{job['id']}").status_code == 404
+    assert client.get(f"{JOBS_URL}/{job['id']}/results").status_code == 404
+
+
+def test_full_queue_is_unavailable(client, monkeypatch):
+    monkeypatch.setattr(job_manager, "max_concurrent", 0)
+    monkeypatch.setattr(job_manager, "max_queued", 0)
+    response = client.post(f"{JOBS_URL}/payroll", json={"items": ITEMS})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "60"
+
+
+def test_missing_job_is_not_found(client):
+    assert client.get(f"{JOBS_URL}/missing").status_code == 404
@@ -0,0 +1,101 @@
+import pytest
+
+from src.api.v1.salary.cents import OVERFLOW_MESSAGE
+
+HUGE_GROSS_SALARY = 1e17
+
+
+@pytest.mark.parametrize("engine", ["float", "cents"])
+def test_batch_matches_single_calculations(client, engine):
+    items = [
+        {"gross_salary": 5000},
+        {"gross_salary": 12345.67, "dependent_count": 2},
+        {"gross_salary": 5000},
+    ]
+    response = client.post(
+        "/api/v1/salary/calculate/batch",
+        params={"engine": engine},
+        json={"items": items},
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    for item, result in zip(items, results):
+        single = client.post(
+            "/api/v1/salary/calculate", params={**item, "engine": engine}
+        )
+        assert result["result"] == single.json()
+        assert result["error"] is None
+
+
+def test_batch_reports_invalid_items_per_row(client):
+    response = client.post(
+        "/api/v1/salary/calculate/batch",
+        json={"items": [{"gross_salary": 5000}, {"gross_salary": -1}]},
+    )
+    assert response.status_code == 200
+    valid, invalid = response.json()["results"]
+    assert valid["result"] is not None
+    assert invalid["result"] is None
+    assert "gross_salary" in invalid["error"]
+
+
+def test_batch_reports_cents_overflow_per_row(client):
+    response = client.post(
+        "/api/v1/salary/calculate/batch",
+        params={"engine": "cents"},
+        json={
+            "items": [
+                {"gross_salary": 5000},
+                {"gross_salary": HUGE_GROSS_SALARY},
+                {"gross_salary": 6000},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[0]["result"]["gross_salary"] == 5000
+    assert results[1] == {"index": 1, "result": None, "error": OVERFLOW_MESSAGE}
+    assert results[2]["result"]["gross_salary"] == 6000
+
+
+def test_single_cents_overflow_is_rejected(client):
+    response = client.post(
+        "/api/v1/salary/calculate",
+        params={"gross_salary": HUGE_GROSS_SALARY, "engine": "cents"},
+    )
+    assert response.status_code == 422
+
+
+def test_whatif_reports_cents_overflow_per_row(client):
+    response = client.post(
+        "/api/v1/salary/whatif",
+        params={"engine": "cents"},
+        json={"items": [{"gross_salary": HUGE_GROSS_SALARY}, {"gross_salary": 5000}]},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    overflowing, calculated = body["results"]
+    assert overflowing["error"] == OVERFLOW_MESSAGE
+    assert overflowing["result"] is None
+    assert calculated["result"]["current"] == calculated["result"]["proposed"]
+    assert body["totals"]["count"] == 1
+
+
+def test_whatif_compares_proposed_rates(client):
+    rates = client.get("/api/v1/taxes").json()
+    income_tax = next(rate for rate in rates if rate["code"] == "income_tax")
+    response = client.post(
+        "/api/v1/salary/whatif",
+        json={
+            "items": [{"gross_salary": 10000}],
+            "rate_overrides": [
+                {"id": income_tax["id"], "rate": income_tax["rate"] + 0.01}
+            ],
+        },
+    )
+    assert response.status_code == 200
+    [result] = response.json()["results"]
+    assert result["result"]["delta"]["income_tax"] > 0
+    assert result["result"]["delta"]["net_salary"] < 0
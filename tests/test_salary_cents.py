@@ -0,0 +1,61 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pytest
+
+from src.api.v1.salary.calculator import build_columns, calculate_rows
+from src.api.v1.salary.cents import OVERFLOW_MESSAGE, calculate_cents, to_cents
+from src.api.v1.salary.schemas import CalculationEngine, SalaryCalculationRequest
+from tests.test_salary_kernel import random_rows
+
+
+def to_bani(amount: float) -> Decimal:
+    return Decimal(repr(amount)).scaleb(2).quantize(1, ROUND_HALF_UP)
+
+
+def apply_rate(bani: Decimal, rate: float) -> Decimal:
+    return (bani * Decimal(repr(rate))).quantize(1, ROUND_HALF_UP)
+
+
+def calculate_in_decimal(policy, params: SalaryCalculationRequest) -> dict:
+    gross_salary = to_bani(params.gross_salary)
+    social_fund = apply_rate(
+        gross_salary, policy.social_fund_rate(params.social_rate_id)
+    )
+    medical_insurance = apply_rate(
+        gross_salary, policy.medical_insurance(params.custom_medical_insurance_rate)
+    )
+    tax_exemptions = to_bani(policy.exemption_amount(params))
+    taxable_income = max(Decimal(0), gross_salary - medical_insurance - tax_exemptions)
+    income_tax = apply_rate(taxable_income, policy.income_tax_rate)
+    amounts = {
+        "gross_salary": gross_salary,
+        "social_fund": social_fund,
+        "medical_insurance": medical_insurance,
+        "income_tax": income_tax,
+        "tax_exemptions": tax_exemptions,
+        "net_salary": gross_salary - medical_insurance - income_tax,
+        "total_salary": gross_salary + social_fund,
+    }
+    return {field: float(amount.scaleb(-2)) for field, amount in amounts.items()}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_cents_engine_matches_decimal_arithmetic(policy, seed):
+    rows = random_rows(2000, seed)
+    assert calculate_rows(policy, rows, CalculationEngine.cents) == [
+        calculate_in_decimal(policy, row) for row in rows
+    ]
+
+
+def test_amounts_are_rounded_as_written():
+    amounts = [1.005, 2.675, 0.125, 1.0049999, 123456.785, 0.004]
+    assert to_cents(np.array(amounts)).tolist() == [
+        int(to_bani(amount)) for amount in amounts
+    ]
+
+
+def test_too_large_gross_salaries_overflow(policy):
+    rows = [SalaryCalculationRequest(gross_salary=1e17)]
+    with pytest.raises(OverflowError, match=OVERFLOW_MESSAGE):
+        calculate_cents(build_columns(policy, rows))
@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.api.v1.salary.calculator import calculate, calculate_rows
+from src.api.v1.salary.kernel import round_money
+from src.api.v1.salary.schemas import SalaryCalculationRequest
+
+
+def random_rows(count: int, seed: int) -> list[SalaryCalculationRequest]:
+    generator = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        gross_salary = generator.choice(
+            [
+                round(generator.uniform(1, 100_000), 2),
+                # Half-cent ties and values just around them
+                generator.randrange(1, 10_000_000) / 1000,
+                generator.uniform(0.01, 1e9),
+            ]
+        )
+        rows.append(
+            SalaryCalculationRequest(
+                gross_salary=gross_salary,
+                social_rate_id=generator.choice([None, 1, 2, 3, 4, 6, 99]),
+                custom_medical_insurance_rate=generator.choice([None, 0, 5, 12]),
+                use_personal_exemption=generator.random() < 0.5,
+                use_increased_personal_exemption=generator.random() < 0.2,
+                use_increased_spouse_exemption=generator.random() < 0.2,
+                dependent_count=generator.randrange(4),
+                disabled_dependent_count=generator.randrange(2),
+            )
+        )
+    return rows
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_kernel_matches_scalar_calculation(policy, seed):
+    rows = random_rows(2000, seed)
+    assert calculate_rows(policy, rows) == [calculate(policy, row) for row in rows]
+
+
+def test_repeated_rows_get_the_same_results(policy):
+    rows = random_rows(50, seed=10)
+    records = calculate_rows(policy, rows + rows[::-1])
+    assert records[:50] == records[50:][::-1]
+
+
+def test_round_money_matches_builtin_round():
+    generator = random.Random(0)
+    values = [generator.randrange(-(10**7), 10**7) / 1000 for _ in range(10_000)]
+    values += [generator.uniform(-1e12, 1e12) for _ in range(10_000)]
+    rounded = round_money(np.array(values)).tolist()
+    assert rounded == [round(value, 2) for value in values]
@@ -0,0 +1,59 @@
+import asyncio
+import os
+from dataclasses import replace
+
+import pytest
+
+from src.api.v1.salary.calculator import calculate_batch
+from src.api.v1.salary.offload import CalculationPool
+
+ITEMS = [{"gross_salary": 1000 + index * 10.5} for index in range(30)] + [
+    {"gross_salary": -1}
+]
+
+
+@pytest.fixture
+def pool():
+    pool = CalculationPool(workers=1, min_rows=10, min_chunk_rows=4)
+    yield pool
+    pool.shutdown()
+
+
+def test_chunks_give_each_worker_a_few():
+    pool = CalculationPool(workers=1, min_rows=10, min_chunk_rows=4)
+    assert pool.chunk_rows(10) == 4
+    assert pool.chunk_rows(800) == 200
+
+
+def test_offloaded_batches_match_in_process_ones(pool, policy):
+    results = asyncio.run(pool.run_batch(policy, calculate_batch, ITEMS))
+    assert pool._executor is not None
+    assert results == calculate_batch(policy, ITEMS)
+    assert [result["index"] for result in results] == list(range(len(ITEMS)))
+
+
+def test_small_batches_stay_in_process(pool, policy):
+    results = asyncio.run(pool.run_batch(policy, calculate_batch, ITEMS[:5]))
+    assert pool._executor is None
+    assert results == calculate_batch(policy, ITEMS[:5])
+
+
+def test_disabled_pool_calculates_in_process(policy):
+    pool = CalculationPool(workers=0, min_rows=1, min_chunk_rows=1)
+    assert asyncio.run(pool.run_batch(policy, calculate_batch, ITEMS))
+    assert pool._executor is None
+
+
+def test_policy_files_of_older_versions_are_removed(pool, policy):
+    newer = replace(policy, version=policy.version + 1)
+    asyncio.run(pool.run_batch(policy, calculate_batch, ITEMS))
+    older_file = pool._policy_files[policy.version]
+
+    results = asyncio.run(pool.run_batch(newer, calculate_batch, ITEMS))
+    assert results == calculate_batch(newer, ITEMS)
+    assert list(pool._policy_files) == [newer.version]
+    assert not os.path.exists(older_file)
+
+    directory = pool._directory
+    pool.shutdown()
+    assert not os.path.exists(directory)
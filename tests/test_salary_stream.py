@@ -0,0 +1,122 @@
+import asyncio
+import csv
+import io
+import json
+
+from src.api.v1.salary.cents import OVERFLOW_MESSAGE
+from src.api.v1.salary.offload import CalculationPool
+from src.api.v1.salary.streaming import iter_line_batches
+
+STREAM_URL = "/api/v1/salary/calculate/stream"
+
+
+def split_lines(chunks: list[bytes], quoting: bool) -> list[str]:
+    async def collect() -> list[str]:
+        async def iterate():
+            for chunk in chunks:
+                yield chunk
+
+        return [
+            line
+            async for lines in iter_line_batches(iterate(), quoting)
+            for line in lines
+        ]
+
+    return asyncio.run(collect())
+
+
+def read_csv(text: str) -> list[dict[str, str]]:
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def test_lines_are_split_across_chunks():
+    chunks = [b"\xef\xbb\xbfa,b\n1,", b"2\n3,4", b"\n5,6"]
+    assert split_lines(chunks, quoting=False) == ["a,b", "1,2", "3,4", "5,6"]
+
+
+def test_quoted_newlines_stay_in_their_record():
+    chunks = [b'name,gross\n"Doe,\n', b'Jane",5000\n"say ""hi""\n', b'there",6000\n']
+    assert split_lines(chunks, quoting=True) == [
+        "name,gross",
+        '"Doe,\nJane",5000',
+        '"say ""hi""\nthere",6000',
+    ]
+    assert split_lines(chunks, quoting=False)[1] == '"Doe,'
+
+
+def test_csv_stream(client):
+    body = 'name,gross_salary,dependent_count\n"Doe,\nJane",5000,\n\nSmith,6000,2\n'
+    response = client.post(
+        STREAM_URL, content=body.encode(), headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    rows = read_csv(response.text)
+    assert [row["index"] for row in rows] == ["0", "1"]
+    assert [row["gross_salary"] for row in rows] == ["5000.0", "6000.0"]
+    assert all(row["error"] == "" for row in rows)
+
+    single = client.post(
+        "/api/v1/salary/calculate",
+        params={"gross_salary": 6000, "dependent_count": 2},
+    ).json()
+    assert float(rows[1]["net_salary"]) == single["net_salary"]
+
+
+def test_ndjson_stream_reports_errors_per_row(client):
+    body = "\n".join(
+        ['{"gross_salary": 5000}', "not json", "[1]", '{"gross_salary": -1}']
+    )
+    response = client.post(
+        STREAM_URL,
+        content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert results[0]["result"]["gross_salary"] == 5000
+    assert results[1]["error"].startswith("Invalid JSON")
+    assert results[2]["error"] == "Expected a JSON object"
+    assert "gross_salary" in results[3]["error"]
+
+
+def test_stream_reports_cents_overflow_per_row(client):
+    body = "gross_salary\n5000\n1e17\n6000\n"
+    response = client.post(
+        STREAM_URL,
+        params={"engine": "cents"},
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    rows = read_csv(response.text)
+    assert [row["error"] for row in rows] == ["", OVERFLOW_MESSAGE, ""]
+    assert rows[1]["net_salary"] == ""
+    assert rows[2]["gross_salary"] == "6000.0"
+
+
+def test_stream_rejects_other_content_types(client):
+    response = client.post(
+        STREAM_URL, content=b"{}", headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 415
+
+
+def test_pool_offloads_calls_without_a_row_count(monkeypatch):
+    pool = CalculationPool(workers=1, min_rows=100, min_chunk_rows=10)
+    submitted = []
+
+    async def submit(policy, func, *args):
+        submitted.append(args)
+        return func(policy, *args)
+
+    monkeypatch.setattr(pool, "_submit", submit)
+
+    def add(policy, value):
+        return policy + value
+
+    assert asyncio.run(pool.run(1, add, 2, rows=10)) == 3
+    assert submitted == []
+    assert asyncio.run(pool.run(1, add, 3, rows=100)) == 4
+    assert asyncio.run(pool.run(1, add, 4)) == 5
+    assert submitted == [(3,), (4,)]
@@ -0,0 +1,37 @@
+import pytest
+
+from src.api.v1.salary.sweep import sweep_gross_points
+
+
+def test_gross_points_include_both_ends():
+    assert sweep_gross_points(1000, 2000, 250) == 5
+    assert sweep_gross_points(1000, 1000, 250) == 1
+
+
+def test_gross_points_of_an_uncountable_range_raise():
+    with pytest.raises(ValueError):
+        sweep_gross_points(1, 1e308, 1e-10)
+
+
+def test_sweep(client):
+    response = client.post(
+        "/api/v1/salary/sweep",
+        json={"gross_min": 5000, "gross_max": 6000, "gross_step": 500},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["gross_salary"] == [5000, 5500, 6000]
+    assert all(len(scenario["net_salary"]) == 3 for scenario in body["scenarios"])
+
+
+@pytest.mark.parametrize(
+    "sweep",
+    [
+        {"gross_min": 1, "gross_max": 1e308, "gross_step": 1e-10},
+        {"gross_min": 1, "gross_max": 1e12, "gross_step": 1},
+        {"gross_min": 2000, "gross_max": 1000, "gross_step": 100},
+    ],
+)
+def test_invalid_sweeps_are_rejected(client, sweep):
+    response = client.post("/api/v1/salary/sweep", json=sweep)
+    assert response.status_code == 422